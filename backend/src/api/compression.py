@@ -0,0 +1,152 @@
+import io
+from functools import partial
+from typing import Set
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.negotiation import quality
+
+UNCOMPRESSED_MEDIA_TYPES = ('text/event-stream',)
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Content codings the client accepts, leaving out the ones with a zero quality.
+
+    Args:
+        accept_encoding: Accept-Encoding header
+
+    Returns:
+        Set: Names of the codings
+    """
+    codings = set()
+    for coding in accept_encoding.split(','):
+        name, *attributes = coding.split(';')
+        if quality(attributes) > 0:
+            codings.add(name.strip().lower())
+    return codings
+
+
+class BrotliFile:
+    """Writable file compressing the written bytes with Brotli into a buffer."""
+
+    def __init__(self, buffer: io.BytesIO, quality: int):
+        """Initialize the compressor.
+
+        Args:
+            buffer: Buffer of compressed bytes
+            quality: Compression quality from 0 to 11
+        """
+        self.buffer = buffer
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def write(self, chunk: bytes):
+        """Compress a chunk of bytes.
+
+        Args:
+            chunk: Uncompressed bytes
+        """
+        self.buffer.write(self.compressor.process(chunk))
+
+    def close(self):
+        """Write the end of the compressed stream."""
+        self.buffer.write(self.compressor.finish())
+
+
+class StreamingGZipResponder(GZipResponder):
+    """GZip responder leaving event streams uncompressed, since the compressor would hold back the events."""
+
+    async def send_with_gzip(self, message: Message):
+        """Send the response as is if it is an event stream, otherwise compress it.
+
+        Args:
+            message: ASGI message
+        """
+        await super().send_with_gzip(message)
+        if message['type'] == 'http.response.start':
+            content_type = Headers(raw=message['headers']).get('Content-Type', '')
+            if content_type.startswith(UNCOMPRESSED_MEDIA_TYPES):
+                self.content_encoding_set = True
+
+
+class BrotliResponder(StreamingGZipResponder):
+    """Responder compressing large and streaming responses with Brotli, as the GZip responder does with gzip."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        """Initialize the responder with a Brotli compressor instead of the gzip file.
+
+        Args:
+            app: ASGI application
+            minimum_size: Minimum size of compressed bodies in bytes
+            quality: Compression quality from 0 to 11
+        """
+        super().__init__(app, minimum_size)
+        self.gzip_buffer = io.BytesIO()
+        self.gzip_file = BrotliFile(self.gzip_buffer, quality)  # type: ignore
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Run the application, marking compressed responses with the Brotli coding.
+
+        Args:
+            scope: Connection scope
+            receive: Function receiving messages from the client
+            send: Function sending messages to the client
+        """
+        await super().__call__(scope, receive, partial(self.send_brotli, send))
+
+    async def send_brotli(self, send: Send, message: Message):
+        """Replace the gzip coding set by the GZip responder.
+
+        Args:
+            send: Function sending messages to the client
+            message: ASGI message
+        """
+        if message['type'] == 'http.response.start' and not self.content_encoding_set:
+            headers = MutableHeaders(raw=message['headers'])
+            if 'content-encoding' in headers:
+                headers['Content-Encoding'] = 'br'
+        await send(message)
+
+
+class CompressionMiddleware:
+    """Middleware compressing response bodies larger than the minimum size with Brotli or gzip.
+
+    Brotli is preferred when the client accepts both. Small bodies are sent
+    as is, since compressing them costs more than it saves, and responses
+    that already have a content coding or stream events are left alone.
+    """
+
+    def __init__(self, app: ASGIApp, minimum: int, level: int, quality: int):
+        """Initialize the middleware with the compression settings.
+
+        Args:
+            app: ASGI application
+            minimum: Minimum size of compressed bodies in bytes
+            level: Compression level of gzip from 1 to 9
+            quality: Compression quality of Brotli from 0 to 11
+        """
+        self.app = app
+        self.minimum = minimum
+        self.level = level
+        self.quality = quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Compress the response with the best coding the client accepts.
+
+        Args:
+            scope: Connection scope
+            receive: Function receiving messages from the client
+            send: Function sending messages to the client
+        """
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        codings = accepted_encodings(Headers(scope=scope).get('Accept-Encoding', ''))
+        if 'br' in codings:
+            await BrotliResponder(self.app, self.minimum, quality=self.quality)(scope, receive, send)
+        elif 'gzip' in codings:
+            await StreamingGZipResponder(self.app, self.minimum, compresslevel=self.level)(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
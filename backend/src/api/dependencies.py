@@ -1,12 +1,15 @@
+import math
 from http import HTTPStatus
 from uuid import UUID
 
 from fastapi import Depends
 
+from services.admission import TokenBuckets, get_write_buckets
+from services.auth import AuthService
 from services.crud import CRUDService, get_crud_service
 from core.config import CONFIG
 from core.enums import MongoCollections
-from core.exceptions import NotFoundFilmError, NotFoundReviewError
+from core.exceptions import NotFoundFilmError, NotFoundReviewError, TooManyWritesError
 
 
 async def check_film_exists(film_id: UUID, mongo: CRUDService = Depends(get_crud_service)):
@@ -36,3 +39,18 @@ async def check_review_exists(review_id: UUID, mongo: CRUDService = Depends(get_
     """
     if not (await mongo.retrieve(MongoCollections.reviews, review_id)):
         raise NotFoundReviewError(status_code=HTTPStatus.NOT_FOUND)
+
+
+async def limit_user_writes(auth: AuthService = Depends(), buckets: TokenBuckets = Depends(get_write_buckets)):
+    """Check that the user has not exceeded the rate limit of changes, for dependency injection.
+
+    Args:
+        auth: Service for user authentication
+        buckets: Rate limits of writes by user
+
+    Raises:
+        TooManyWritesError: 429 error if the user makes changes too often
+    """
+    wait = buckets.take(auth.user_id)
+    if wait:
+        raise TooManyWritesError(status_code=HTTPStatus.TOO_MANY_REQUESTS, retry_after=math.ceil(wait))
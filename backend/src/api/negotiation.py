@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Any, Iterable, Type
+from uuid import UUID
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+MSGPACK_MEDIA_TYPES = frozenset(('application/msgpack', 'application/x-msgpack'))
+
+
+def msgpack_default(unsupported: Any) -> Any:
+    """Convert values that MessagePack has no type for as ORJSON does.
+
+    Args:
+        unsupported: UUID or datetime value
+
+    Raises:
+        TypeError: An error if the value cannot be converted
+
+    Returns:
+        Any: String value
+    """
+    if isinstance(unsupported, UUID):
+        return str(unsupported)
+    if isinstance(unsupported, datetime):
+        return unsupported.isoformat()
+    raise TypeError('Type is not MessagePack serializable: {0}'.format(type(unsupported).__name__))
+
+
+class MsgPackResponse(Response):
+    """Response with MessagePack content, which internal consumers decode faster than JSON."""
+
+    media_type = 'application/msgpack'
+
+    def render(self, document: Any) -> bytes:
+        """Encode the content.
+
+        Args:
+            document: JSON-compatible content
+
+        Returns:
+            bytes: Encoded content
+        """
+        return msgpack.packb(document, default=msgpack_default)
+
+
+def quality(attributes: Iterable[str]) -> float:
+    """Relative quality of a media range in the Accept header, 1 by default.
+
+    Args:
+        attributes: Parameters of the media range
+
+    Returns:
+        float: Quality value, 0 if it is malformed
+    """
+    for attribute in attributes:
+        name, _, weight = attribute.partition('=')
+        if name.strip() == 'q':
+            try:
+                return float(weight)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """Check if the Accept header asks for MessagePack.
+
+    Args:
+        accept: Accept header
+
+    Returns:
+        bool: MessagePack is among the acceptable media types
+    """
+    for media_range in accept.split(','):
+        media_type, *attributes = media_range.split(';')
+        if media_type.strip() in MSGPACK_MEDIA_TYPES and quality(attributes) > 0:
+            return True
+    return False
+
+
+def response_class(request: Request) -> Type[Response]:
+    """Choose the response class by the media types the client accepts, JSON by default.
+
+    Args:
+        request: HTTP request
+
+    Returns:
+        Type[Response]: MessagePack or ORJSON response class
+    """
+    if accepts_msgpack(request.headers.get('Accept', '')):
+        return MsgPackResponse
+    return ORJSONResponse
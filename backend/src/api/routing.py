@@ -0,0 +1,114 @@
+import inspect
+from functools import partial, wraps
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from api.negotiation import MsgPackResponse, response_class
+from core.config import CONFIG
+from models.encoders import ResponseEncoder
+
+
+RESPONSE_PARAM = 'fastpath_response'
+REQUEST_PARAM = 'fastpath_request'
+
+Handler = Callable[[Request], Coroutine[Any, Any, Response]]
+
+
+def fast_endpoint(endpoint: Callable[..., Any], encoder: ResponseEncoder) -> Callable[..., Any]:
+    """Wrap the endpoint to return an ORJSON or MessagePack response with the encoded result.
+
+    The wrapper also takes the response that dependencies set headers on, and
+    copies them to the encoded response, as FastAPI does for serialized results.
+    Endpoints that are already wrapped, e.g. when a router is included, are
+    returned as is.
+
+    Args:
+        endpoint: Route endpoint
+        encoder: Encoder of the response model
+
+    Returns:
+        Callable: Endpoint with the same signature and the response parameter
+    """
+    signature = inspect.signature(endpoint)
+    if RESPONSE_PARAM in signature.parameters:
+        return endpoint
+    response_param = inspect.Parameter(RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+    request_param = inspect.Parameter(REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+
+    @wraps(endpoint)
+    async def wrapper(**kwargs: Any) -> Response:
+        sub_response = kwargs.pop(RESPONSE_PARAM)
+        request = kwargs.pop(REQUEST_PARAM)
+        result = await endpoint(**kwargs)
+        if isinstance(result, Response):
+            return result
+        response = response_class(request)(encoder.encode(result))
+        if sub_response.status_code:
+            response.status_code = sub_response.status_code
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    wrapper.__signature__ = signature.replace(  # type: ignore
+        parameters=[*signature.parameters.values(), response_param, request_param],
+    )
+    return wrapper
+
+
+class FastPathRoute(APIRoute):
+    """API route that can serialize endpoint results straight to ORJSON or MessagePack bytes.
+
+    With the fast path enabled in the settings, documents returned by the
+    endpoint are encoded by a precompiled encoder of the response model instead
+    of being validated by it. The response model is still declared on the route,
+    so the OpenAPI schema stays the same. Results are encoded as MessagePack
+    if the client accepts it and as JSON otherwise.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        """Initialize the route, wrapping the endpoint into the fast path if it is enabled.
+
+        Args:
+            path: Route path
+            endpoint: Route endpoint
+            kwargs: Other route parameters
+        """
+        if CONFIG.fastapi.fastpath and kwargs.get('response_model') is not None:
+            endpoint = fast_endpoint(endpoint, ResponseEncoder(
+                response_model=kwargs['response_model'],
+                by_alias=kwargs.get('response_model_by_alias', True),
+                exclude_none=kwargs.get('response_model_exclude_none', False),
+            ))
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Handler:
+        """Build request handlers for JSON and MessagePack responses, to be chosen by the Accept header.
+
+        Returns:
+            Handler: Request handler
+        """
+        json_handler = super().get_route_handler()
+        default_class = self.response_class
+        self.response_class = MsgPackResponse
+        msgpack_handler = super().get_route_handler()
+        self.response_class = default_class
+        return partial(self.negotiate, json_handler, msgpack_handler)
+
+    async def negotiate(self, json_handler: Handler, msgpack_handler: Handler, request: Request) -> Response:
+        """Handle the request with the handler of the accepted media type.
+
+        Args:
+            json_handler: Handler encoding results as JSON
+            msgpack_handler: Handler encoding results as MessagePack
+            request: HTTP request
+
+        Returns:
+            Response: HTTP response varying by the Accept header
+        """
+        if response_class(request) is MsgPackResponse:
+            response = await msgpack_handler(request)
+        else:
+            response = await json_handler(request)
+        response.headers.add_vary_header('Accept')
+        return response
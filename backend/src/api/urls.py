@@ -1,16 +1,29 @@
+from http import HTTPStatus
 from typing import List
 
 from fastapi import Depends
-from fastapi.routing import APIRoute
+from fastapi.responses import StreamingResponse
 
-from api.dependencies import check_film_exists, check_review_exists
-from api.v1 import bookmarks, ratings, reviews
-from models.responses import BookmarkResponse, RatingResponse, ReviewResponse
+from api.dependencies import check_film_exists, check_review_exists, limit_user_writes
+from api.routing import FastPathRoute
+from api.v1.base import NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
+from api.v1 import bookmarks, leaderboard, ratings, reviews, trending, votes
+from models.responses import (
+    BookmarkResponse,
+    LeaderboardResponse,
+    RatingResponse,
+    ReviewResponse,
+    TrendingFilmResponse,
+)
+from models.vote_responses import FilmVoteResponse, ReviewVoteResponse
+
+film_exists = Depends(check_film_exists)
+write_limit = Depends(limit_user_writes)
 
 routes = [
-    APIRoute(
+    FastPathRoute(
         path='/bookmarks',
-        methods=['GET'],
+        methods=['GET'],  # noqa: WPS204 every route lists its methods
         summary='View list of bookmarks',
         response_description='User bookmarks (movies saved for later)',
         endpoint=bookmarks.get_user_bookmarks,
@@ -18,7 +31,7 @@ routes = [
         response_model_by_alias=False,
         tags=['bookmarks'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/bookmarks',
         methods=['POST'],
         summary='Add a movie to bookmarks',
@@ -26,10 +39,10 @@ routes = [
         endpoint=bookmarks.bookmark_film,
         response_model=List[BookmarkResponse],
         response_model_by_alias=False,
-        dependencies=[Depends(check_film_exists)],
+        dependencies=[write_limit, film_exists],
         tags=['bookmarks'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/bookmarks',
         methods=['DELETE'],
         summary='Remove a movie from bookmarks',
@@ -37,10 +50,50 @@ routes = [
         endpoint=bookmarks.unbookmark_film,
         response_model=List[BookmarkResponse],
         response_model_by_alias=False,
-        dependencies=[Depends(check_film_exists)],
+        dependencies=[write_limit, film_exists],
         tags=['bookmarks'],
     ),
-    APIRoute(
+    FastPathRoute(
+        path='/films/leaderboard',
+        methods=['GET'],
+        summary='View top-rated movies',
+        response_description='Movies ranked by their Bayesian average ratings',
+        endpoint=leaderboard.get_leaderboard,
+        response_model=List[LeaderboardResponse],
+        response_model_by_alias=False,
+        tags=['film_rating'],
+    ),
+    FastPathRoute(
+        path='/films/trending',
+        methods=['GET'],
+        summary='View trending movies',
+        response_description='Movies ranked by their recent rating and bookmark activity',
+        endpoint=trending.get_trending_films,
+        response_model=List[TrendingFilmResponse],
+        response_model_by_alias=False,
+        tags=['trending'],
+    ),
+    FastPathRoute(
+        path='/ratings/films',
+        methods=['GET'],
+        summary='View own movie ratings',
+        response_description='Votes of the user on movies',
+        endpoint=votes.get_user_film_ratings,
+        response_model=List[FilmVoteResponse],
+        response_model_by_alias=False,
+        tags=['film_rating'],
+    ),
+    FastPathRoute(
+        path='/ratings/reviews',
+        methods=['GET'],
+        summary='View own review ratings',
+        response_description='Votes of the user on reviews',
+        endpoint=votes.get_user_review_ratings,
+        response_model=List[ReviewVoteResponse],
+        response_model_by_alias=False,
+        tags=['review_rating'],
+    ),
+    FastPathRoute(
         path='/films/{film_id}/ratings',
         methods=['GET'],
         summary='View movie ratings',
@@ -50,7 +103,17 @@ routes = [
         response_model_by_alias=False,
         tags=['film_rating'],
     ),
-    APIRoute(
+    FastPathRoute(
+        path='/films/{film_id}/ratings/live',
+        methods=['GET'],
+        summary='Stream live movie ratings',
+        response_description='Movie ratings as server-sent events, sent again whenever they change',
+        endpoint=ratings.stream_film_rating,
+        response_class=StreamingResponse,
+        responses={HTTPStatus.OK.value: {'content': {SSE_MEDIA_TYPE: {}}}},
+        tags=['film_rating'],
+    ),
+    FastPathRoute(
         path='/films/{film_id}/ratings',
         methods=['POST'],
         summary='Add a rating to a movie',
@@ -58,9 +121,10 @@ routes = [
         endpoint=ratings.rate_film,
         response_model=RatingResponse,
         response_model_by_alias=False,
+        dependencies=[write_limit],
         tags=['film_rating'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/ratings',
         methods=['DELETE'],
         summary='Remove a rating from a movie',
@@ -68,9 +132,10 @@ routes = [
         endpoint=ratings.unrate_film,
         response_model=RatingResponse,
         response_model_by_alias=False,
+        dependencies=[write_limit],
         tags=['film_rating'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/reviews',
         methods=['GET'],
         summary='View a list of reviews',
@@ -80,7 +145,28 @@ routes = [
         response_model_by_alias=False,
         tags=['reviews'],
     ),
-    APIRoute(
+    FastPathRoute(
+        path='/reviews/search',
+        methods=['GET'],
+        summary='Search reviews by text',
+        response_description='List of movie reviews matching the text',
+        endpoint=reviews.search_reviews,
+        response_model=List[ReviewResponse],
+        response_model_by_alias=False,
+        tags=['reviews'],
+    ),
+    FastPathRoute(
+        path='/films/{film_id}/reviews/export',
+        methods=['GET'],
+        summary='Export all reviews of a movie',
+        response_description='Movie reviews as newline-delimited JSON',
+        endpoint=reviews.export_film_reviews,
+        response_class=StreamingResponse,
+        responses={HTTPStatus.OK.value: {'content': {NDJSON_MEDIA_TYPE: {}}}},
+        dependencies=[film_exists],
+        tags=['reviews'],
+    ),
+    FastPathRoute(
         path='/films/{film_id}/reviews',
         methods=['POST'],
         summary='Add a review to a movie',
@@ -89,19 +175,19 @@ routes = [
         response_model=ReviewResponse,
         response_model_by_alias=False,
         response_model_exclude_none=True,
-        dependencies=[Depends(check_film_exists)],
+        dependencies=[write_limit, film_exists],
         tags=['reviews'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/reviews/{review_id}',
         methods=['DELETE'],
         summary='Remove a review from a movie',
         response_description='Movie review',
         endpoint=reviews.delete_film_review,
-        dependencies=[Depends(check_film_exists), Depends(check_review_exists)],
+        dependencies=[write_limit, film_exists, Depends(check_review_exists)],
         tags=['reviews'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/reviews/{review_id}/ratings',
         methods=['GET'],
         summary='View review ratings',
@@ -109,10 +195,10 @@ routes = [
         endpoint=ratings.get_review_rating,
         response_model=RatingResponse,
         response_model_by_alias=False,
-        dependencies=[Depends(check_film_exists)],
+        dependencies=[film_exists],
         tags=['review_rating'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/reviews/{review_id}/ratings',
         methods=['POST'],
         summary='Add a rating to a review',
@@ -120,10 +206,10 @@ routes = [
         endpoint=ratings.rate_review,
         response_model=RatingResponse,
         response_model_by_alias=False,
-        dependencies=[Depends(check_film_exists)],
+        dependencies=[write_limit, film_exists],
         tags=['review_rating'],
     ),
-    APIRoute(
+    FastPathRoute(
         path='/films/{film_id}/reviews/{review_id}/ratings',
         methods=['DELETE'],
         summary='Remove a rating from a review',
@@ -131,7 +217,7 @@ routes = [
         endpoint=ratings.unrate_review,
         response_model=RatingResponse,
         response_model_by_alias=False,
-        dependencies=[Depends(check_film_exists)],
+        dependencies=[write_limit, film_exists],
         tags=['review_rating'],
     ),
 ]
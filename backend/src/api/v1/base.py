@@ -1,4 +1,38 @@
-from fastapi import Query
+import hashlib
+from http import HTTPStatus
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional
+
+import orjson
+from fastapi import Query, Request, Response
+
+from api.negotiation import response_class
+from core.config import CONFIG
+from models.encoders import ResponseEncoder
+
+ETAG_SIZE = 16
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+SSE_MEDIA_TYPE = 'text/event-stream'
+
+
+async def ndjson_chunks(docs: AsyncIterable[Dict], encoder: ResponseEncoder, size: int) -> AsyncIterator[bytes]:
+    """Encode documents as newline-delimited JSON, a chunk of lines at a time.
+
+    Args:
+        docs: Raw documents
+        encoder: Encoder of the response model
+        size: Number of lines in a chunk
+
+    Yields:
+        bytes: Chunk of JSON lines
+    """
+    lines = []
+    async for doc in docs:
+        lines.append(orjson.dumps(encoder.encode_doc(doc), option=orjson.OPT_APPEND_NEWLINE))
+        if len(lines) >= size:
+            yield b''.join(lines)
+            lines = []
+    if lines:
+        yield b''.join(lines)
 
 
 class Paginator:
@@ -27,3 +61,71 @@ class Paginator:
             slice: List slice
         """
         return slice(self.offset, self.offset + self.limit)
+
+
+class ConditionalRequest:
+    """Class for answering conditional requests with entity tags of document versions."""
+
+    def __init__(self, request: Request, response: Response):
+        """
+        Initialize the class with the client request and the response to be tagged.
+
+        Args:
+            request: Client request
+            response: Response for setting headers
+        """
+        self.request = request
+        self.response = response
+        self.headers: Dict[str, str] = {}
+
+    @property
+    def requested(self) -> bool:
+        """Whether the client sent entity tags of the representations it has.
+
+        Returns:
+            bool: The request is conditional
+        """
+        return 'if-none-match' in self.request.headers
+
+    def tag(self, *versions: Any, private: bool = False):
+        """Tag the response with a weak entity tag of the document versions and caching hints.
+
+        The tag also depends on the path and query of the request and on the
+        negotiated media type, since they choose the representation of the
+        documents. It is weak because the compressed bodies of a
+        representation differ byte by byte between content codings.
+
+        Args:
+            versions: Versions of the documents in the response
+            private: The response depends on the user and must not be cached by proxies
+        """
+        digest = hashlib.blake2b(digest_size=ETAG_SIZE)
+        digest.update('{0}?{1}'.format(self.request.url.path, self.request.url.query).encode())
+        digest.update(response_class(self.request).media_type.encode())
+        digest.update(repr(versions).encode())
+        self.headers['ETag'] = 'W/"{0}"'.format(digest.hexdigest())
+        if private:
+            self.headers['Cache-Control'] = 'private, no-cache'
+            self.headers['Vary'] = 'Authorization'
+        else:
+            self.headers['Cache-Control'] = 'public, max-age={0}'.format(CONFIG.cache.maxage)
+        self.response.headers.update(self.headers)
+
+    def not_modified(self, *versions: Any, private: bool = False) -> Optional[Response]:
+        """Tag the response and check whether the client already has this representation.
+
+        Args:
+            versions: Versions of the documents in the response
+            private: The response depends on the user and must not be cached by proxies
+
+        Returns:
+            Optional[Response]: HTTP response with status code 304 if the entity tag weakly matches
+        """
+        self.tag(*versions, private=private)
+        etags = {
+            etag.strip().replace('W/', '', 1)
+            for etag in self.request.headers.get('if-none-match', '').split(',')
+        }
+        if self.headers['ETag'].replace('W/', '', 1) in etags or '*' in etags:
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=self.headers)
+        return None
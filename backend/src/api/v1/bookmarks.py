@@ -1,10 +1,12 @@
+from typing import Union
 from uuid import UUID
 
-from fastapi import Depends, Path
+from fastapi import Depends, Path, Response
 
-from api.v1.base import Paginator
+from api.v1.base import ConditionalRequest, Paginator
 from services.auth import AuthService
 from services.crud import CRUDService, get_crud_service
+from services.trending import TrendingService, get_trending_service
 from core.enums import MongoCollections
 from models.queries import AddBookmark, RemoveBookmark
 from models.responses import BookmarkResponse
@@ -14,13 +16,15 @@ async def bookmark_film(
     auth: AuthService = Depends(),
     film_id: UUID = Path(title='Film ID'),
     mongo: CRUDService = Depends(get_crud_service),
+    trending: TrendingService = Depends(get_trending_service),
 ) -> BookmarkResponse:
-    """Add a movie to the user's bookmarks.
+    """Add a movie to the user's bookmarks and count it in the film activity.
 
     Args:
         auth: User authentication
         film_id: Film ID
         mongo: Object for performing MongoDB queries
+        trending: Service for the trending films
 
     Returns:
         BookmarkResponse: A list of movies bookmarked by the user.
@@ -29,6 +33,7 @@ async def bookmark_film(
         collection=MongoCollections.users,
         query=AddBookmark(user_id=auth.user_id, film_id=film_id),
     )
+    trending.record(film_id)
     return user.get('bookmarks', [])
 
 
@@ -57,17 +62,24 @@ async def unbookmark_film(
 async def get_user_bookmarks(
     auth: AuthService = Depends(),
     page: Paginator = Depends(),
+    conditional: ConditionalRequest = Depends(),
     mongo: CRUDService = Depends(get_crud_service),
-) -> BookmarkResponse:
+) -> Union[BookmarkResponse, Response]:
     """Get the user's bookmarks.
 
     Args:
         auth: User authentication
         page: Page parameters
+        conditional: Conditional request handling
         mongo: Object for performing MongoDB queries
 
     Returns:
-        BookmarkResponse: A list of movies bookmarked by the user.
+        Union[BookmarkResponse, Response]: A list of bookmarked movies or HTTP response with status code 304
     """
+    if conditional.requested:
+        version = await mongo.version(collection=MongoCollections.users, doc_id=auth.user_id)
+        if version is not None and (not_modified := conditional.not_modified(version, private=True)):
+            return not_modified
     user = await mongo.retrieve(collection=MongoCollections.users, doc_id=auth.user_id)
+    conditional.tag(user.get('version', 0), private=True)
     return user.get('bookmarks', [])[page.slice]
@@ -0,0 +1,23 @@
+from typing import List
+
+from fastapi import Depends
+
+from api.v1.base import Paginator
+from services.leaderboard import LeaderboardService, get_leaderboard_service
+from models.responses import LeaderboardResponse
+
+
+async def get_leaderboard(
+    page: Paginator = Depends(),
+    leaderboard: LeaderboardService = Depends(get_leaderboard_service),
+) -> List[LeaderboardResponse]:
+    """Get a page of the top-rated films, ranked by their Bayesian average scores.
+
+    Args:
+        page: Page parameters
+        leaderboard: Service for the leaderboard of top-rated films
+
+    Returns:
+        List[LeaderboardResponse]: Ranked films with their scores and numbers of votes
+    """
+    return await leaderboard.search(offset=page.offset, limit=page.limit)
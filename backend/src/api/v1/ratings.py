@@ -1,10 +1,19 @@
 from http import HTTPStatus
+from typing import Union
 from uuid import UUID
 
-from fastapi import Body, Depends, Path
+from fastapi import Body, Depends, Path, Response
+from fastapi.responses import StreamingResponse
 
+from api.v1.base import SSE_MEDIA_TYPE, ConditionalRequest
 from services.auth import AuthService
 from services.crud import CRUDService, get_crud_service
+from services.leaderboard import LeaderboardService, get_leaderboard_service
+from services.live import LiveRatingsService, get_live_ratings_service
+from services.sharding import ShardedVotesService, get_sharded_votes_service
+from services.snapshot import RatingSnapshotService, get_rating_snapshot_service
+from services.top_reviews import TopReviewsService, get_top_reviews_service
+from services.trending import TrendingService, get_trending_service
 from core.enums import MongoCollections
 from core.exceptions import NotFoundFilmError, NotFoundReviewError
 from models.base import VotesChoices
@@ -12,19 +21,27 @@ from models.queries import AddRating, RemoveRating
 from models.responses import RatingResponse
 
 
-async def rate_film(
+async def rate_film(  # noqa: WPS211 FastAPI injects the services as arguments
     auth: AuthService = Depends(),
     film_id: UUID = Path(title='Film ID'),
     score: VotesChoices = Body(embed=True),
-    mongo: CRUDService = Depends(get_crud_service),
+    votes: ShardedVotesService = Depends(get_sharded_votes_service),
+    trending: TrendingService = Depends(get_trending_service),
+    leaderboard: LeaderboardService = Depends(get_leaderboard_service),
+    live: LiveRatingsService = Depends(get_live_ratings_service),
+    snapshot: RatingSnapshotService = Depends(get_rating_snapshot_service),
 ) -> RatingResponse:
-    """Set the user's rating for a film.
+    """Set the user's rating for a film, count it in the film activity and update the leaderboard and live ratings.
 
     Args:
         auth: User authentication
         film_id: Film ID
         score: User's rating
-        mongo: Object for MongoDB queries
+        votes: Service for the votes of films, spread over shards while they are hot
+        trending: Service for the trending films
+        leaderboard: Service for the leaderboard of top-rated films
+        live: Service for live rating updates
+        snapshot: Snapshot of film ratings shared by the workers
 
     Raises:
         NotFoundFilmError: 404 error if the film is not found
@@ -32,26 +49,33 @@ async def rate_film(
     Returns:
         RatingResponse: Film rating
     """
-    film = await mongo.update(
-        collection=MongoCollections.films,
-        query=AddRating(user_id=auth.user_id, source_id=film_id, score=score),
-    )
+    film = await votes.rate(user_id=auth.user_id, film_id=film_id, score=score)
+    snapshot.invalidate(film_id)
     if not film:
         raise NotFoundFilmError(status_code=HTTPStatus.NOT_FOUND)
+    trending.record(film_id)
+    await leaderboard.save(film)
+    live.notify(MongoCollections.films, film_id)
     return film.get('rating', {})
 
 
-async def unrate_film(
+async def unrate_film(  # noqa: WPS211 FastAPI injects the services as arguments
     auth: AuthService = Depends(),
     film_id: UUID = Path(title='Film ID'),
-    mongo: CRUDService = Depends(get_crud_service),
+    votes: ShardedVotesService = Depends(get_sharded_votes_service),
+    leaderboard: LeaderboardService = Depends(get_leaderboard_service),
+    live: LiveRatingsService = Depends(get_live_ratings_service),
+    snapshot: RatingSnapshotService = Depends(get_rating_snapshot_service),
 ) -> RatingResponse:
-    """Remove the user's rating for a film.
+    """Remove the user's rating for a film and update the leaderboard and live ratings.
 
     Args:
         auth: User authentication
         film_id: Film ID
-        mongo: Object for MongoDB queries
+        votes: Service for the votes of films, spread over shards while they are hot
+        leaderboard: Service for the leaderboard of top-rated films
+        live: Service for live rating updates
+        snapshot: Snapshot of film ratings shared by the workers
 
     Raises:
         NotFoundFilmError: 404 error if the film is not found
@@ -59,43 +83,88 @@ async def unrate_film(
     Returns:
         RatingResponse: Film rating
     """
-    film = await mongo.update(
-        collection=MongoCollections.films,
-        query=RemoveRating(user_id=auth.user_id, source_id=film_id),
-    )
+    film = await votes.unrate(user_id=auth.user_id, film_id=film_id)
+    snapshot.invalidate(film_id)
     if not film:
         raise NotFoundFilmError(status_code=HTTPStatus.NOT_FOUND)
+    await leaderboard.save(film)
+    live.notify(MongoCollections.films, film_id)
     return film.get('rating', {})
 
 
 async def get_film_rating(
     film_id: UUID = Path(title='Film ID'),
-    mongo: CRUDService = Depends(get_crud_service),
-) -> RatingResponse:
-    """Get the rating for a film.
+    conditional: ConditionalRequest = Depends(),
+    votes: ShardedVotesService = Depends(get_sharded_votes_service),
+    snapshot: RatingSnapshotService = Depends(get_rating_snapshot_service),
+) -> Union[RatingResponse, Response]:
+    """Get the rating for a film, from the snapshot shared by the workers while it is fresh enough.
 
     Args:
         film_id: Film ID
-        mongo: Object for MongoDB queries
+        conditional: Conditional request handling
+        votes: Service for the votes of films, spread over shards while they are hot
+        snapshot: Snapshot of film ratings shared by the workers
 
     Raises:
         NotFoundFilmError: 404 error if the film is not found
 
     Returns:
-        RatingResponse: Film rating
+        Union[RatingResponse, Response]: Film rating or HTTP response with status code 304
     """
-    film = await mongo.retrieve(collection=MongoCollections.films, doc_id=film_id)
+    if (found := snapshot.lookup(film_id)) is not None:
+        version, rating = found
+        if conditional.requested and (not_modified := conditional.not_modified(version)):
+            return not_modified
+        conditional.tag(version)
+        return rating
+    if conditional.requested:
+        version = await votes.version(film_id)
+        if version is not None and (not_modified := conditional.not_modified(version)):
+            return not_modified
+    film = await votes.retrieve(film_id)
     if not film:
         raise NotFoundFilmError(status_code=HTTPStatus.NOT_FOUND)
+    conditional.tag(film.get('version', 0))
     return film.get('rating', {})
 
 
-async def rate_review(
+async def stream_film_rating(
+    film_id: UUID = Path(title='Film ID'),
+    votes: ShardedVotesService = Depends(get_sharded_votes_service),
+    live: LiveRatingsService = Depends(get_live_ratings_service),
+) -> StreamingResponse:
+    """Stream the rating of a film and its updates as server-sent events, instead of polling it.
+
+    Args:
+        film_id: Film ID
+        votes: Service for the votes of films, spread over shards while they are hot
+        live: Service for live rating updates
+
+    Raises:
+        NotFoundFilmError: 404 error if the film is not found
+
+    Returns:
+        StreamingResponse: Film rating events
+    """
+    live.admit()
+    film = await votes.retrieve(film_id)
+    if not film:
+        raise NotFoundFilmError(status_code=HTTPStatus.NOT_FOUND)
+    return StreamingResponse(
+        live.subscribe(film),
+        media_type=SSE_MEDIA_TYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+async def rate_review(  # noqa: WPS211 FastAPI injects the services as arguments
     auth: AuthService = Depends(),
     film_id: UUID = Path(title='Film ID'),
     review_id: UUID = Path(title='Review ID'),
     score: VotesChoices = Body(embed=True),
     mongo: CRUDService = Depends(get_crud_service),
+    top: TopReviewsService = Depends(get_top_reviews_service),
 ) -> RatingResponse:
     """Set the user's rating for a film review.
 
@@ -105,6 +174,7 @@ async def rate_review(
         review_id: Review ID
         score: User's rating
         mongo: Object for MongoDB queries
+        top: Top reviews of films
 
     Raises:
         NotFoundReviewError: 404 error if the review is not found
@@ -118,6 +188,7 @@ async def rate_review(
     )
     if not review:
         raise NotFoundReviewError(status_code=HTTPStatus.NOT_FOUND)
+    await top.save(review)
     return review.get('rating', {})
 
 
@@ -126,6 +197,7 @@ async def unrate_review(
     film_id: UUID = Path(title='Film ID'),
     review_id: UUID = Path(title='Review ID'),
     mongo: CRUDService = Depends(get_crud_service),
+    top: TopReviewsService = Depends(get_top_reviews_service),
 ) -> RatingResponse:
     """Remove the user's rating for a film review.
 
@@ -134,6 +206,7 @@ async def unrate_review(
         film_id: Film ID
         review_id: Review ID
         mongo: Object for MongoDB queries
+        top: Top reviews of films
 
     Raises:
         NotFoundReviewError: 404 error if the review is not found
@@ -147,28 +220,36 @@ async def unrate_review(
     )
     if not review:
         raise NotFoundReviewError(status_code=HTTPStatus.NOT_FOUND)
+    await top.save(review)
     return review.get('rating', {})
 
 
 async def get_review_rating(
     film_id: UUID = Path(title='Film ID'),
     review_id: UUID = Path(title='Review ID'),
+    conditional: ConditionalRequest = Depends(),
     mongo: CRUDService = Depends(get_crud_service),
-) -> RatingResponse:
+) -> Union[RatingResponse, Response]:
     """Get the rating for a film review.
 
     Args:
         film_id: Film ID
         review_id: Review ID
+        conditional: Conditional request handling
         mongo: Object for MongoDB queries
 
     Raises:
         NotFoundReviewError: 404 error if the review is not found
 
     Returns:
-        RatingResponse: Rating for the film review
+        Union[RatingResponse, Response]: Rating for the film review or HTTP response with status code 304
     """
+    if conditional.requested:
+        version = await mongo.version(collection=MongoCollections.reviews, doc_id=review_id)
+        if version is not None and (not_modified := conditional.not_modified(version)):
+            return not_modified
     review = await mongo.retrieve(collection=MongoCollections.reviews, doc_id=review_id)
     if not review:
         raise NotFoundReviewError(status_code=HTTPStatus.NOT_FOUND)
+    conditional.tag(review.get('version', 0))
     return review.get('rating', {})
@@ -1,32 +1,48 @@
+import asyncio
 from http import HTTPStatus
+from typing import List, Optional, Union
 from uuid import UUID
 
 from fastapi import Body, Depends, Path, Query, Response
+from fastapi.responses import StreamingResponse
 from pymongo.errors import DuplicateKeyError
 
-from api.v1.base import Paginator
+from api.v1.base import NDJSON_MEDIA_TYPE, ConditionalRequest, Paginator, ndjson_chunks
+from services.archive import VoteArchiveService, get_vote_archive_service
 from services.auth import AuthService
 from services.crud import CRUDService, get_crud_service
+from services.top_reviews import TopReviewsService, get_top_reviews_service
+from core.config import CONFIG
 from core.enums import MongoCollections
 from core.exceptions import NotAuthorContentError, UniqueFilmReviewError
 from models.base import SortChoices
-from models.queries import CreateReview, DestroyReview, ListReview
+from models.encoders import ResponseEncoder
 from models.responses import ReviewResponse
+from models.review_queries import CreateReview, DestroyReview, ExportReviews, ListReview, SearchReviews
 
+export_encoder = ResponseEncoder(ReviewResponse, by_alias=False)
 
-async def create_film_review(
+
+async def create_film_review(  # noqa: WPS211 FastAPI injects the services as arguments
     auth: AuthService = Depends(),
     film_id: UUID = Path(title='Film ID'),
     text: str = Body(embed=True),
     mongo: CRUDService = Depends(get_crud_service),
+    top: TopReviewsService = Depends(get_top_reviews_service),
+    archive: VoteArchiveService = Depends(get_vote_archive_service),
 ) -> ReviewResponse:
     """Create a movie review by a user.
 
+    The archived vote of the author on the film is put back into the film,
+    so that the review shows it as the film score of the author.
+
     Args:
         auth: User authentication
         film_id: Film ID
         text: Review text
         mongo: Object for performing MongoDB queries
+        top: Top reviews of films
+        archive: Archive of old votes of films
 
     Raises:
         UniqueFilmReviewError: 403 error if the user already has a review for the given film
@@ -34,6 +50,7 @@ async def create_film_review(
     Returns:
         ReviewResponse: Movie review
     """
+    await archive.restore(film_id, auth.user_id)
     try:
         review = await mongo.create(
             collection=MongoCollections.reviews,
@@ -41,6 +58,7 @@ async def create_film_review(
         )
     except DuplicateKeyError:
         raise UniqueFilmReviewError(status_code=HTTPStatus.FORBIDDEN)
+    await top.save(review)
     return review
 
 
@@ -49,6 +67,7 @@ async def delete_film_review(
     film_id: UUID = Path(title='Film ID'),
     review_id: UUID = Path(title='Review ID'),
     mongo: CRUDService = Depends(get_crud_service),
+    top: TopReviewsService = Depends(get_top_reviews_service),
 ) -> Response:
     """Delete a movie review by a user.
 
@@ -57,6 +76,7 @@ async def delete_film_review(
         film_id: Film ID
         review_id: Review ID
         mongo: Object for performing MongoDB queries
+        top: Top reviews of films
 
     Raises:
         NotAuthorContentError: 403 error if the user is not the author of the review
@@ -70,28 +90,96 @@ async def delete_film_review(
     )
     if not review:
         raise NotAuthorContentError(status_code=HTTPStatus.FORBIDDEN)
+    await top.remove(review)
     return Response(status_code=HTTPStatus.NO_CONTENT)
 
 
-async def get_film_reviews(
+async def get_film_reviews(  # noqa: WPS211 FastAPI injects the services as arguments
     film_id: UUID = Path(title='Film ID'),
     sort: SortChoices = Query(default=SortChoices.top),
     page: Paginator = Depends(),
+    conditional: ConditionalRequest = Depends(),
     mongo: CRUDService = Depends(get_crud_service),
-) -> ReviewResponse:
+    top: TopReviewsService = Depends(get_top_reviews_service),
+) -> Union[ReviewResponse, Response]:
     """Retrieve a list of movie reviews for a film.
 
+    The entity tag of the list depends on the versions of the film, rated by
+    the review authors, and of its list of top reviews, which changes with any
+    of its reviews. The versions are read from the data storage only for
+    conditional requests, other responses are tagged if the versions are cached.
+
     Args:
         film_id: Film ID
         sort: Sorting parameter
         page: Page parameters
+        conditional: Conditional request handling
         mongo: Object for performing MongoDB queries
+        top: Top reviews of films
 
     Returns:
-        ReviewResponse: List of movie reviews
+        Union[ReviewResponse, Response]: List of movie reviews or HTTP response with status code 304
     """
+    versions = await asyncio.gather(
+        mongo.version(collection=MongoCollections.films, doc_id=film_id, read=conditional.requested),
+        top.version(film_id, read=conditional.requested),
+    )
+    if conditional.requested or None not in versions:
+        if not_modified := conditional.not_modified(*versions):
+            return not_modified
+    if sort == SortChoices.top:
+        return await top.search(film_id=film_id, offset=page.offset, limit=page.limit)
     reviews = await mongo.search(
         collection=MongoCollections.reviews,
         query=ListReview(film_id=film_id, sort=sort, offset=page.offset, limit=page.limit),
     )
     return reviews
+
+
+async def search_reviews(
+    text: str = Query(min_length=1, description='Searched words'),
+    film_id: Optional[UUID] = Query(default=None, description='Film ID'),
+    page: Paginator = Depends(),
+    mongo: CRUDService = Depends(get_crud_service),
+) -> List[ReviewResponse]:
+    """Search for reviews by their text with the full-text index, best matches first.
+
+    Args:
+        text: Searched words
+        film_id: Film ID to search only its reviews
+        page: Page parameters
+        mongo: Object for performing MongoDB queries
+
+    Returns:
+        List[ReviewResponse]: List of movie reviews
+    """
+    return await mongo.search(
+        collection=MongoCollections.reviews,
+        query=SearchReviews(text=text, film_id=film_id, offset=page.offset, limit=page.limit),
+    )
+
+
+async def export_film_reviews(
+    film_id: UUID = Path(title='Film ID'),
+    mongo: CRUDService = Depends(get_crud_service),
+) -> StreamingResponse:
+    """Stream all reviews of a film as newline-delimited JSON.
+
+    Reviews are read from the cursor and written to the response in batches,
+    so the memory used does not depend on the number of reviews.
+
+    Args:
+        film_id: Film ID
+        mongo: Object for performing MongoDB queries
+
+    Returns:
+        StreamingResponse: Movie reviews, one JSON document per line
+    """
+    reviews = mongo.stream(
+        collection=MongoCollections.reviews,
+        query=ExportReviews(film_id=film_id, batch=CONFIG.export.batch),
+    )
+    return StreamingResponse(
+        ndjson_chunks(reviews, export_encoder, size=CONFIG.export.batch),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
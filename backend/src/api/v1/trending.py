@@ -0,0 +1,23 @@
+from typing import List
+
+from fastapi import Depends
+
+from api.v1.base import Paginator
+from services.trending import TrendingService, get_trending_service
+from models.responses import TrendingFilmResponse
+
+
+async def get_trending_films(
+    page: Paginator = Depends(),
+    trending: TrendingService = Depends(get_trending_service),
+) -> List[TrendingFilmResponse]:
+    """Get the films with the most rating and bookmark activity, recent events weighing the most.
+
+    Args:
+        page: Page parameters
+        trending: Service for the trending films
+
+    Returns:
+        List[TrendingFilmResponse]: Film IDs with their trending scores
+    """
+    return await trending.search(offset=page.offset, limit=page.limit)
@@ -0,0 +1,70 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import Depends, Query
+
+from api.v1.base import Paginator
+from services.auth import AuthService
+from services.crud import CRUDService, get_crud_service
+from core.enums import MongoCollections
+from models.vote_queries import ListVotes
+from models.vote_responses import FilmVoteResponse, ReviewVoteResponse
+
+
+async def get_user_film_ratings(
+    auth: AuthService = Depends(),
+    film_ids: Optional[List[UUID]] = Query(default=None, alias='film_id', description='Film IDs to look up'),
+    page: Paginator = Depends(),
+    mongo: CRUDService = Depends(get_crud_service),
+) -> List[FilmVoteResponse]:
+    """Get the user's votes on films, either a page of all of them or the ones on the given films.
+
+    The votes moved to the archive are listed along with the others.
+
+    Args:
+        auth: User authentication
+        film_ids: Film IDs to look up instead of listing all the votes
+        page: Page parameters
+        mongo: Object for MongoDB queries
+
+    Returns:
+        List[FilmVoteResponse]: Votes of the user
+    """
+    return await mongo.search(
+        collection=MongoCollections.films,
+        query=ListVotes(
+            user_id=auth.user_id,
+            source_ids=film_ids,
+            offset=0 if film_ids else page.offset,
+            limit=len(film_ids) if film_ids else page.limit,
+            archived=True,
+        ),
+    )
+
+
+async def get_user_review_ratings(
+    auth: AuthService = Depends(),
+    review_ids: Optional[List[UUID]] = Query(default=None, alias='review_id', description='Review IDs to look up'),
+    page: Paginator = Depends(),
+    mongo: CRUDService = Depends(get_crud_service),
+) -> List[ReviewVoteResponse]:
+    """Get the user's votes on reviews, either a page of all of them or the ones on the given reviews.
+
+    Args:
+        auth: User authentication
+        review_ids: Review IDs to look up instead of listing all the votes
+        page: Page parameters
+        mongo: Object for MongoDB queries
+
+    Returns:
+        List[ReviewVoteResponse]: Votes of the user
+    """
+    return await mongo.search(
+        collection=MongoCollections.reviews,
+        query=ListVotes(
+            user_id=auth.user_id,
+            source_ids=review_ids,
+            offset=0 if review_ids else page.offset,
+            limit=len(review_ids) if review_ids else page.limit,
+        ),
+    )
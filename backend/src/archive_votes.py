@@ -0,0 +1,81 @@
+"""Compaction of the old votes of films into archive buckets.
+
+Streams all films and moves their votes older than the archive age into
+buckets of a fixed size, counting them in the archived likes and dislikes of
+the films, in concurrent batches. A film changed during its compaction and a
+film whose votes are spread over shards are left for the next run, so the
+compaction can run while films are rated.
+
+Usage:
+    python archive_votes.py --age 90 --batch 500
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from services.crud import get_crud_service
+from services.sharding import ShardedVotesService, get_sharded_votes_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from db import storage
+from models.export_queries import ExportFilms
+
+
+async def compact_films(votes: ShardedVotesService, films: List[Dict], before: datetime) -> int:
+    """Compact the films concurrently.
+
+    Args:
+        votes: Service for the votes of films
+        films: Film documents
+        before: Votes older than the time in UTC are archived
+
+    Returns:
+        int: Number of archived votes
+    """
+    return sum(await asyncio.gather(*(votes.compact(film, before) for film in films)))
+
+
+async def archive_votes(age: int, size: int) -> int:
+    """Connect to the data storage chosen in the settings and compact all films.
+
+    Args:
+        age: Age of the archived votes in days
+        size: Number of films read and compacted at once
+
+    Returns:
+        int: Number of archived votes
+    """
+    await storage.start()
+    votes = get_sharded_votes_service(crud=get_crud_service(storage=storage.storage))
+    before = datetime.utcnow() - timedelta(days=age)
+    total = 0
+    films = []
+    async for film in storage.storage.stream(MongoCollections.films, ExportFilms(batch=size)):
+        films.append(film)
+        if len(films) >= size:
+            total += await compact_films(votes, films, before)
+            films = []
+    total += await compact_films(votes, films, before)
+    await storage.stop()
+    return total
+
+
+def main():
+    """Parse the command line and run the compaction."""
+    parser = argparse.ArgumentParser(description='Move the old votes of films into archive buckets.')
+    parser.add_argument(
+        '--age', type=int, default=CONFIG.archive.age, help='age of the archived votes in days',
+    )
+    parser.add_argument(
+        '--batch', type=int, default=CONFIG.export.batch, help='number of films read and compacted at once',
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logging.info('votes: %d', asyncio.run(archive_votes(args.age, args.batch)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
+import socket
 from functools import lru_cache
 
 from pydantic import BaseModel, BaseSettings, Field
 
+from core.enums import StorageBackends
+
 
 class MongoConfig(BaseModel):
     """Configuration class for MongoDB connection settings."""
@@ -11,10 +14,150 @@ class MongoConfig(BaseModel):
     db: str = 'default'
 
 
+class SQLiteConfig(BaseModel):
+    """Configuration class for the embedded SQLite database settings."""
+
+    path: str = 'ugc.sqlite3'
+    timeout: float = 5
+
+
+class StorageConfig(BaseModel):
+    """Configuration class for choosing the data storage backend."""
+
+    backend: StorageBackends = StorageBackends.mongo
+
+
+class CacheConfig(BaseModel):
+    """Configuration class for caching settings."""
+
+    ttl: float = 1
+    size: int = 100000
+    maxage: int = 1
+    coalesce: bool = True
+
+
+class BatchConfig(BaseModel):
+    """Configuration class for micro-batching of document reads by ID."""
+
+    enabled: bool = False
+    window: float = 0.002
+    size: int = 100
+
+
+class TopConfig(BaseModel):
+    """Configuration class for the materialized lists of the top reviews of films."""
+
+    enabled: bool = True
+    size: int = 100
+
+
+class StreamConfig(BaseModel):
+    """Configuration class for the change stream keeping caches coherent."""
+
+    enabled: bool = True
+    interval: float = 1
+    name: str = Field(default_factory=socket.gethostname)
+
+
+class LimitsConfig(BaseModel):
+    """Configuration class for admission control and rate limits."""
+
+    reads: int = 64
+    writes: int = 32
+    queue: int = 128
+    timeout: float = 0.5
+    retry: int = 1
+    rate: float = 5
+    burst: int = 20
+    size: int = 100000
+
+
+class DeadlinesConfig(BaseModel):
+    """Configuration class for the deadlines of data storage operations in seconds."""
+
+    read: float = 1
+    search: float = 5
+    write: float = 2
+
+
+class BreakerConfig(BaseModel):
+    """Configuration class for the circuit breaker of the data storage."""
+
+    failures: int = 5
+    reset: float = 5
+
+
+class ExportConfig(BaseModel):
+    """Configuration class for streaming exports."""
+
+    batch: int = 500
+    lag: float = 60
+
+
+class TrendingConfig(BaseModel):
+    """Configuration class for the trending films ranked by recent activity."""
+
+    bucket: int = 60
+    window: int = 86400
+    halflife: float = 3600
+    interval: float = 5
+
+
+class LeaderboardConfig(BaseModel):
+    """Configuration class for the leaderboard of top-rated films."""
+
+    mean: float = 5
+    weight: float = 10
+
+
+class ShardingConfig(BaseModel):
+    """Configuration class for spreading the votes of hot films over shards."""
+
+    enabled: bool = False
+    shards: int = 8
+    promote: float = 50
+    demote: float = 5
+    interval: float = 10
+    ttl: float = 0.5
+
+
+class ArchiveConfig(BaseModel):
+    """Configuration class for moving the votes of films older than the age in days into archive buckets."""
+
+    age: int = 90
+    size: int = 1000
+
+
+class SnapshotConfig(BaseModel):
+    """Configuration class for the snapshot of film ratings shared by the workers of a node."""
+
+    enabled: bool = False
+    path: str = '/dev/shm/ugc_ratings'
+    interval: float = 5
+    staleness: float = 15
+
+
+class LiveConfig(BaseModel):
+    """Configuration class for the live rating updates."""
+
+    interval: float = 1
+    keepalive: float = 15
+    capacity: int = 1000
+
+
+class CompressionConfig(BaseModel):
+    """Configuration class for the compression of large responses."""
+
+    enabled: bool = True
+    minimum: int = 1000
+    gzip: int = 6
+    brotli: int = 4
+
+
 class LogstashConfig(BaseModel):
-    """Configuration class for Logstash connection settings."""
+    """Configuration class for Logstash connection settings, disabled without a host."""
 
-    host: str = 'localhost'
+    host: str = ''
     port: int = 5044
 
 
@@ -30,6 +173,7 @@ class FastApiConfig(BaseModel):
     host: str = '0.0.0.0'
     port: int = 8000
     debug: bool = False
+    fastpath: bool = False
     docs: str = 'openapi'
     secret_key: str = 'secret_key'
     title: str = 'API for monitoring user-generated content'
@@ -40,6 +184,23 @@ class MainSettings(BaseSettings):
 
     fastapi: FastApiConfig = Field(default_factory=FastApiConfig)
     mongo: MongoConfig = Field(default_factory=MongoConfig)
+    sqlite: SQLiteConfig = Field(default_factory=SQLiteConfig)
+    storage: StorageConfig = Field(default_factory=StorageConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    batch: BatchConfig = Field(default_factory=BatchConfig)
+    top: TopConfig = Field(default_factory=TopConfig)
+    stream: StreamConfig = Field(default_factory=StreamConfig)
+    limits: LimitsConfig = Field(default_factory=LimitsConfig)
+    deadlines: DeadlinesConfig = Field(default_factory=DeadlinesConfig)
+    breaker: BreakerConfig = Field(default_factory=BreakerConfig)
+    export: ExportConfig = Field(default_factory=ExportConfig)
+    trending: TrendingConfig = Field(default_factory=TrendingConfig)
+    leaderboard: LeaderboardConfig = Field(default_factory=LeaderboardConfig)
+    sharding: ShardingConfig = Field(default_factory=ShardingConfig)
+    compression: CompressionConfig = Field(default_factory=CompressionConfig)
+    live: LiveConfig = Field(default_factory=LiveConfig)
+    archive: ArchiveConfig = Field(default_factory=ArchiveConfig)
+    snapshot: SnapshotConfig = Field(default_factory=SnapshotConfig)
     sentry: SentryConfig = Field(default_factory=SentryConfig)
     logstash: LogstashConfig = Field(default_factory=LogstashConfig)
 
@@ -8,8 +8,30 @@ class MongoCollections(Enum):
     - users
     - films
     - reviews
+    - top_reviews (materialized lists of the top reviews of films)
+    - activity (time-bucketed counters of rating and bookmark events of films)
+    - leaderboard (Bayesian-adjusted scores of films)
+    - shards (votes of hot films spread over several documents)
+    - archive (buckets of old votes of films moved out of the film documents)
     """
 
     users = 'users'
     films = 'films'
     reviews = 'reviews'
+    top_reviews = 'top_reviews'
+    activity = 'activity'
+    leaderboard = 'leaderboard'
+    shards = 'shards'
+    archive = 'archive'
+
+
+class StorageBackends(str, Enum):
+    """Enumeration of data storage backends.
+
+    Provides names for the following backends:
+    - mongo (MongoDB server)
+    - sqlite (embedded SQLite database)
+    """
+
+    mongo = 'mongo'
+    sqlite = 'sqlite'
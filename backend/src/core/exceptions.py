@@ -9,13 +9,15 @@ class UGCException(HTTPException):
 
     message: Optional[str] = None
 
-    def __init__(self, status_code: int):
+    def __init__(self, status_code: int, retry_after: Optional[int] = None):
         """Initialize the exception with an HTTP error code.
 
         Args:
             status_code: Error code
+            retry_after: Seconds after which the client can retry the request
         """
-        super().__init__(status_code, detail=self.message)
+        headers = None if retry_after is None else {'Retry-After': str(retry_after)}
+        super().__init__(status_code, detail=self.message, headers=headers)
 
     @staticmethod
     def handler(request: Request, exc: HTTPException) -> JSONResponse:
@@ -28,7 +30,7 @@ class UGCException(HTTPException):
         Returns:
             JSONResponse: Server response
         """
-        return JSONResponse(content={'message': exc.detail}, status_code=exc.status_code)
+        return JSONResponse(content={'message': exc.detail}, status_code=exc.status_code, headers=exc.headers)
 
 
 class NotFoundFilmError(UGCException):
@@ -55,4 +57,28 @@ class NotAuthorContentError(UGCException):
     message: str = 'Modifying someone else content is prohibited!'
 
 
+class OverloadedError(UGCException):
+    """Error due to the data storage having no capacity for the request."""
+
+    message: str = 'The service is overloaded, please retry later!'
+
+
+class TooManyWritesError(UGCException):
+    """Error due to exceeding the rate limit of changes made by a user."""
+
+    message: str = 'Too many changes, please retry later!'
+
+
+class StorageUnavailableError(UGCException):
+    """Error due to the data storage being unreachable or unhealthy."""
+
+    message: str = 'The data storage is unavailable, please retry later!'
+
+
+class StorageTimeoutError(UGCException):
+    """Error due to a data storage operation exceeding its deadline."""
+
+    message: str = 'The data storage did not respond in time!'
+
+
 exception_handlers = {exc: exc.handler for exc in UGCException.__subclasses__()}
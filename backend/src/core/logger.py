@@ -32,6 +32,7 @@ class RequestIdFilter(logging.Filter):
 
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_DEFAULT_HANDLERS = ['console']
+LOGSTASH_HANDLERS = ['logstash'] if CONFIG.logstash.host else []
 
 LOGGING = {
     'version': 1,
@@ -66,24 +67,24 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'stream': 'ext://sys.stdout',
         },
-        'logstash': {
+        **({'logstash': {
             'class': 'logstash.LogstashHandler',
             'level': 'INFO',
             'host': CONFIG.logstash.host,
             'port': CONFIG.logstash.port,
-        },
+        }} if CONFIG.logstash.host else {}),
     },
     'loggers': {
         'app': {
-            'handlers': ['logstash', 'console'],
+            'handlers': [*LOGSTASH_HANDLERS, 'console'],
             'level': 'INFO',
         },
         'uvicorn.error': {
             'level': 'INFO',
-            'handlers': ['logstash'],
+            'handlers': LOGSTASH_HANDLERS,
         },
         'uvicorn.access': {
-            'handlers': ['access', 'logstash'],
+            'handlers': ['access', *LOGSTASH_HANDLERS],
             'level': 'INFO',
             'propagate': False,
         },
@@ -95,4 +96,17 @@ LOGGING = {
     },
 }
 
-logging_config.dictConfig(LOGGING)
+
+def setup_logging():
+    """Configure logging, with the Logstash handler and its package only if Logstash is configured."""
+    logging_config.dictConfig(LOGGING)
+
+
+def setup_sentry():
+    """Initialize error monitoring, importing the Sentry SDK only if Sentry is configured."""
+    if not CONFIG.sentry.dsn:
+        return
+    import sentry_sdk  # noqa: WPS433
+    from sentry_sdk.integrations.fastapi import FastApiIntegration  # noqa: WPS433
+
+    sentry_sdk.init(CONFIG.sentry.dsn, integrations=[FastApiIntegration()])
@@ -0,0 +1,127 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from core.enums import MongoCollections
+from models.base import MongoQuery
+
+
+class UnsupportedQueryError(TypeError):
+    """Error due to a query model that the data storage cannot execute."""
+
+
+class Storage(ABC):  # noqa: WPS214 one method per storage operation
+    """Abstract data storage executing the queries of the API models.
+
+    MongoDB executes the parameters of any query model, while other backends
+    reproduce each query model they support and raise UnsupportedQueryError
+    for the others, as listed in their documentation.
+    """
+
+    @abstractmethod
+    async def create(self, collection: MongoCollections, query: MongoQuery) -> Dict:
+        """Create a document in the collection.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            Dict: New document
+        """
+
+    @abstractmethod
+    async def create_many(self, collection: MongoCollections, queries: List[MongoQuery]) -> List[int]:
+        """Create documents in the collection, skipping the ones that violate a uniqueness constraint.
+
+        Args:
+            collection: Collection with documents
+            queries: Query models
+
+        Returns:
+            List: Indexes of the queries whose documents are duplicates
+        """
+
+    @abstractmethod
+    async def retrieve(self, collection: MongoCollections, doc_id: UUID) -> Optional[Dict]:
+        """Read a document by ID from the collection.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+
+        Returns:
+            Optional[Dict]: Document by ID
+        """
+
+    @abstractmethod
+    async def retrieve_many(self, collection: MongoCollections, doc_ids: List[UUID]) -> List[Dict]:
+        """Read documents by a list of IDs from the collection.
+
+        Args:
+            collection: Collection with documents
+            doc_ids: Document IDs
+
+        Returns:
+            List: Found documents in any order
+        """
+
+    @abstractmethod
+    async def versions(self, collection: MongoCollections, filtering: Dict) -> Dict[UUID, int]:
+        """Read only the versions of the documents matching the filter.
+
+        Args:
+            collection: Collection with documents
+            filtering: Filter by document fields
+
+        Returns:
+            Dict: Document versions by ID
+        """
+
+    @abstractmethod
+    async def search(self, collection: MongoCollections, query: MongoQuery) -> List[Dict]:
+        """Search for documents in the collection.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            List: List of documents
+        """
+
+    @abstractmethod
+    def stream(self, collection: MongoCollections, query: MongoQuery) -> AsyncIterator[Dict]:
+        """Iterate over the found documents, reading them from the collection in batches.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            AsyncIterator: Asynchronous iterator of documents
+        """
+
+    @abstractmethod
+    async def update(self, collection: MongoCollections, query: MongoQuery) -> Optional[Dict]:
+        """Update a document in the collection.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            Optional[Dict]: Document after the update
+        """
+
+    @abstractmethod
+    async def delete(self, collection: MongoCollections, query: MongoQuery) -> Optional[Dict]:
+        """Delete a document from the collection.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            Optional[Dict]: Deleted document
+        """
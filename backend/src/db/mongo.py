@@ -1,117 +1,19 @@
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo.errors import CollectionInvalid
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from core.config import CONFIG
 from core.enums import MongoCollections
+from db.base import Storage
+from db.mongo_schema import create_collections
+from models.base import MongoQuery
 
-mongo: Optional[AsyncIOMotorDatabase] = None
-
+DUPLICATE_KEY = 11000
 
-async def create_users_collection():
-    """Create a collection for users."""
-    try:
-        await mongo.create_collection(
-            name=MongoCollections.users.name,
-            validator={
-                '$jsonSchema': {
-                    'bsonType': 'object',
-                    'required': ['_id', 'bookmarks'],
-                    'properties': {
-                        '_id': {'bsonType': 'binData'},
-                        'bookmarks': {
-                            'bsonType': 'array',
-                            'items': {
-                                'bsonType': 'object',
-                                'required': ['film_id'],
-                                'properties': {
-                                    'film_id': {'bsonType': 'binData'},
-                                },
-                            },
-                        },
-                    },
-                },
-            },
-        )
-    except CollectionInvalid:
-        pass
-
-
-async def create_films_collection():
-    """Create a collection for films."""
-    try:
-        await mongo.create_collection(
-            name=MongoCollections.films.name,
-            validator={
-                '$jsonSchema': {
-                    'bsonType': 'object',
-                    'required': ['_id', 'rating'],
-                    'properties': {
-                        '_id': {'bsonType': 'binData'},
-                        'rating': {
-                            'bsonType': 'object',
-                            'required': ['votes'],
-                            'properties': {
-                                'votes': {
-                                    'bsonType': 'array',
-                                    'items': {
-                                        'bsonType': 'object',
-                                        'required': ['user_id', 'score'],
-                                        'properties': {
-                                            'user_id': {'bsonType': 'binData'},
-                                            'score': {'bsonType': 'number'},
-                                        },
-                                    },
-                                },
-                            },
-                        },
-                    },
-                },
-            },
-        )
-    except CollectionInvalid:
-        pass
-
-
-async def create_reviews_collection():
-    """Create a collection for reviews."""
-    try:
-        await mongo.create_collection(
-            name=MongoCollections.reviews.name,
-            validator={
-                '$jsonSchema': {
-                    'bsonType': 'object',
-                    'required': ['_id', 'rating'],
-                    'properties': {
-                        '_id': {'bsonType': 'binData'},
-                        'author': {'bsonType': 'binData'},
-                        'film_id': {'bsonType': 'binData'},
-                        'pub_date': {'bsonType': 'date'},
-                        'rating': {
-                            'bsonType': 'object',
-                            'required': ['votes'],
-                            'properties': {
-                                'votes': {
-                                    'bsonType': 'array',
-                                    'items': {
-                                        'bsonType': 'object',
-                                        'required': ['user_id', 'score'],
-                                        'properties': {
-                                            'user_id': {'bsonType': 'binData'},
-                                            'score': {'bsonType': 'number'},
-                                        },
-                                    },
-                                },
-                            },
-                        },
-                    },
-                },
-            },
-        )
-    except CollectionInvalid:
-        pass
-    await mongo[MongoCollections.reviews.name].create_index([('author', 1), ('film_id', 1)], unique=True)
+mongo: Optional[AsyncIOMotorDatabase] = None
 
 
 async def start():
@@ -125,9 +27,7 @@ async def start():
             uuidRepresentation='standard',
         ),
     )
-    await create_users_collection()
-    await create_films_collection()
-    await create_reviews_collection()
+    await create_collections(mongo)
 
 
 async def stop():
@@ -142,3 +42,152 @@ async def get_mongo() -> AsyncIOMotorDatabase:
         AsyncIOMotorDatabase: A connection to MongoDB
     """
     return mongo
+
+
+class MongoStorage(Storage):  # noqa: WPS214 one method per storage operation
+    """Data storage executing queries in the MongoDB query language."""
+
+    def __init__(self, mongo: AsyncIOMotorDatabase):
+        """When initializing the class, it accepts the MongoDB database client.
+
+        Args:
+            mongo: MongoDB client
+        """
+        self.mongo = mongo
+
+    async def create(self, collection: MongoCollections, query: MongoQuery) -> Dict:
+        """Create a document in the collection.
+
+        Args:
+            collection: Collection with documents
+            query: MongoDB query
+
+        Returns:
+            Dict: New document
+        """
+        params = query.params
+        await self.mongo[collection.name].insert_one(**params)
+        return params['document']
+
+    async def create_many(self, collection: MongoCollections, queries: List[MongoQuery]) -> List[int]:
+        """Create documents in the collection with an unordered bulk insert, skipping duplicates.
+
+        Args:
+            collection: Collection with documents
+            queries: MongoDB queries
+
+        Raises:
+            BulkWriteError: An error if a document fails for another reason than a duplicate key
+
+        Returns:
+            List: Indexes of the queries whose documents are duplicates
+        """
+        if collection == MongoCollections.activity:
+            await self.count_activity(queries)
+            return []
+        try:
+            await self.mongo[collection.name].insert_many(
+                [query.params['document'] for query in queries], ordered=False,
+            )
+        except BulkWriteError as exc:
+            errors = exc.details['writeErrors']
+            if any(error['code'] != DUPLICATE_KEY for error in errors):
+                raise
+            return [error['index'] for error in errors]
+        return []
+
+    async def count_activity(self, queries: List[MongoQuery]):
+        """Add the activity counters to their time buckets with an unordered bulk upsert.
+
+        Args:
+            queries: MongoDB queries
+        """
+        await self.mongo[MongoCollections.activity.name].bulk_write(
+            [UpdateOne(**query.params) for query in queries], ordered=False,
+        )
+
+    async def retrieve(self, collection: MongoCollections, doc_id: UUID) -> Optional[Dict]:
+        """Read a document by ID from the collection.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+
+        Returns:
+            Optional[Dict]: Document by ID
+        """
+        return await self.mongo[collection.name].find_one(doc_id)
+
+    async def retrieve_many(self, collection: MongoCollections, doc_ids: List[UUID]) -> List[Dict]:
+        """Read documents by a list of IDs from the collection.
+
+        Args:
+            collection: Collection with documents
+            doc_ids: Document IDs
+
+        Returns:
+            List: Found documents in any order
+        """
+        return await self.mongo[collection.name].find({'_id': {'$in': doc_ids}}).to_list(None)
+
+    async def versions(self, collection: MongoCollections, filtering: Dict) -> Dict[UUID, int]:
+        """Read only the versions of the documents matching the filter.
+
+        Args:
+            collection: Collection with documents
+            filtering: Filter by document fields
+
+        Returns:
+            Dict: Document versions by ID
+        """
+        cursor = self.mongo[collection.name].find(filtering, projection={'version': True})
+        return {doc['_id']: doc.get('version', 0) async for doc in cursor}
+
+    async def search(self, collection: MongoCollections, query: MongoQuery) -> List[Dict]:
+        """Search for documents in the collection.
+
+        Args:
+            collection: Collection with documents
+            query: MongoDB query
+
+        Returns:
+            List: List of documents
+        """
+        return await self.mongo[collection.name].aggregate(**query.params).to_list(None)
+
+    async def stream(self, collection: MongoCollections, query: MongoQuery) -> AsyncIterator[Dict]:
+        """Iterate over the documents found in the collection, reading them from the cursor in batches.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Yields:
+            Dict: Found document
+        """
+        async for doc in self.mongo[collection.name].aggregate(**query.params):
+            yield doc
+
+    async def update(self, collection: MongoCollections, query: MongoQuery) -> Optional[Dict]:
+        """Update a document in the collection.
+
+        Args:
+            collection: Collection with documents
+            query: MongoDB query
+
+        Returns:
+            Optional[Dict]: Document after the update
+        """
+        return await self.mongo[collection.name].find_one_and_update(**query.params)
+
+    async def delete(self, collection: MongoCollections, query: MongoQuery) -> Optional[Dict]:
+        """Delete a document from the collection.
+
+        Args:
+            collection: Collection with documents
+            query: MongoDB query
+
+        Returns:
+            Optional[Dict]: Deleted document
+        """
+        return await self.mongo[collection.name].find_one_and_delete(**query.params)
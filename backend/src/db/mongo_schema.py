@@ -0,0 +1,170 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import TEXT, IndexModel
+from pymongo.errors import CollectionInvalid
+
+from core.config import CONFIG
+from core.enums import MongoCollections
+
+
+async def create_users_collection(mongo: AsyncIOMotorDatabase):
+    """Create a collection for users.
+
+    Args:
+        mongo: MongoDB database
+    """
+    try:
+        await mongo.create_collection(
+            name=MongoCollections.users.name,
+            validator={
+                '$jsonSchema': {
+                    'bsonType': 'object',
+                    'required': ['_id', 'bookmarks'],
+                    'properties': {
+                        '_id': {'bsonType': 'binData'},
+                        'bookmarks': {
+                            'bsonType': 'array',
+                            'items': {
+                                'bsonType': 'object',
+                                'required': ['film_id'],
+                                'properties': {
+                                    'film_id': {'bsonType': 'binData'},
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        )
+    except CollectionInvalid:
+        pass
+    await mongo[MongoCollections.users.name].create_index([('updated', 1)])
+
+
+async def create_films_collection(mongo: AsyncIOMotorDatabase):
+    """Create a collection for films and the indexes of the archive buckets of their old votes.
+
+    Args:
+        mongo: MongoDB database
+    """
+    try:
+        await mongo.create_collection(
+            name=MongoCollections.films.name,
+            validator={
+                '$jsonSchema': {
+                    'bsonType': 'object',
+                    'required': ['_id', 'rating'],
+                    'properties': {
+                        '_id': {'bsonType': 'binData'},
+                        'rating': {
+                            'bsonType': 'object',
+                            'required': ['votes'],
+                            'properties': {
+                                'votes': {
+                                    'bsonType': 'array',
+                                    'items': {
+                                        'bsonType': 'object',
+                                        'required': ['user_id', 'score'],
+                                        'properties': {
+                                            'user_id': {'bsonType': 'binData'},
+                                            'score': {'bsonType': 'number'},
+                                        },
+                                    },
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        )
+    except CollectionInvalid:
+        pass
+    await mongo[MongoCollections.films.name].create_index([('rating.votes.user_id', 1), ('_id', 1)])
+    await mongo[MongoCollections.archive.name].create_index([('rating.votes.user_id', 1), ('film_id', 1)])
+    await mongo[MongoCollections.films.name].create_index([('updated', 1)])
+    await mongo[MongoCollections.archive.name].create_index([('updated', 1)])
+
+
+async def create_reviews_collection(mongo: AsyncIOMotorDatabase):
+    """Create a collection for reviews.
+
+    Args:
+        mongo: MongoDB database
+    """
+    try:
+        await mongo.create_collection(
+            name=MongoCollections.reviews.name,
+            validator={
+                '$jsonSchema': {
+                    'bsonType': 'object',
+                    'required': ['_id', 'rating'],
+                    'properties': {
+                        '_id': {'bsonType': 'binData'},
+                        'author': {'bsonType': 'binData'},
+                        'film_id': {'bsonType': 'binData'},
+                        'pub_date': {'bsonType': 'date'},
+                        'rating': {
+                            'bsonType': 'object',
+                            'required': ['votes'],
+                            'properties': {
+                                'votes': {
+                                    'bsonType': 'array',
+                                    'items': {
+                                        'bsonType': 'object',
+                                        'required': ['user_id', 'score'],
+                                        'properties': {
+                                            'user_id': {'bsonType': 'binData'},
+                                            'score': {'bsonType': 'number'},
+                                        },
+                                    },
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        )
+    except CollectionInvalid:
+        pass
+    await mongo[MongoCollections.reviews.name].create_indexes([
+        IndexModel([('author', 1), ('film_id', 1)], unique=True),
+        IndexModel([('film_id', 1), ('_id', 1), ('version', 1)]),
+        IndexModel([('text', TEXT), ('film_id', 1)]),
+        IndexModel([('rating.votes.user_id', 1), ('_id', 1)]),
+        IndexModel([('updated', 1)]),
+    ])
+
+
+async def create_activity_collection(mongo: AsyncIOMotorDatabase):
+    """Create indexes for the activity counters of films, one per time bucket and film, expiring after the window.
+
+    Args:
+        mongo: MongoDB database
+    """
+    await mongo[MongoCollections.activity.name].create_indexes([
+        IndexModel([('bucket', 1), ('film_id', 1)], unique=True),
+        IndexModel([('bucket', 1)], expireAfterSeconds=CONFIG.trending.window),
+    ])
+
+
+async def create_leaderboard_collection(mongo: AsyncIOMotorDatabase):
+    """Create indexes for the leaderboard of top-rated films.
+
+    Args:
+        mongo: MongoDB database
+    """
+    await mongo[MongoCollections.leaderboard.name].create_index(
+        [('score', -1), ('_id', 1)], partialFilterExpression={'votes': {'$gt': 0}},
+    )
+
+
+async def create_collections(mongo: AsyncIOMotorDatabase):
+    """Create the collections and indexes of the MongoDB data store.
+
+    Args:
+        mongo: MongoDB database
+    """
+    await create_users_collection(mongo)
+    await create_films_collection(mongo)
+    await create_reviews_collection(mongo)
+    await create_activity_collection(mongo)
+    await create_leaderboard_collection(mongo)
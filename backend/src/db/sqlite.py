@@ -0,0 +1,327 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime
+from functools import partial, wraps
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Optional
+from uuid import UUID
+
+import bson
+from pymongo.errors import DuplicateKeyError
+
+from core.config import CONFIG
+from core.enums import MongoCollections
+from db.base import UnsupportedQueryError
+from db.sqlite_rankings import RANKING_UPDATES, RankingQueries
+from db.sqlite_reviews import REVIEW_UPDATES, ReviewQueries
+from db.sqlite_schema import CODEC_OPTIONS, VOTE_DELETE, create_tables, matches
+from db.sqlite_votes import VOTE_UPDATES, VoteQueries
+from models.archive_queries import FindArchivedVote, ListAuthors
+from models.base import MongoQuery
+from models.export_queries import ExportChanges, ExportFilms
+from models.queries import AddBookmark, RemoveBookmark
+from models.ranking_queries import ListLeaderboard, ListTrending
+from models.review_queries import ExportReviews, ListReview, SearchReviews
+from models.vote_queries import ListVotes
+
+sqlite: Optional[sqlite3.Connection] = None
+executor: Optional[ThreadPoolExecutor] = None
+
+
+async def start():
+    """Open the SQLite database file in write-ahead logging mode and start the thread running its statements."""
+    global sqlite, executor
+    sqlite = sqlite3.connect(
+        CONFIG.sqlite.path,
+        timeout=CONFIG.sqlite.timeout,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    sqlite.execute('PRAGMA journal_mode=WAL')
+    sqlite.execute('PRAGMA synchronous=NORMAL')
+    create_tables(sqlite)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+
+
+async def stop():
+    """Wait for the running statements and close the SQLite database file."""
+    executor.shutdown()
+    sqlite.close()
+
+
+def threaded(method: Callable) -> Callable:
+    """Run a storage method on the thread of the SQLite connection, so that it does not block the event loop.
+
+    The thread runs the statements one at a time, so the transactions of the
+    methods never interleave, and the event loop keeps serving other requests
+    while a statement waits for the database lock held by another worker.
+
+    Args:
+        method: Storage method
+
+    Returns:
+        Callable: Coroutine function awaiting the method
+    """
+    @wraps(method)
+    async def wrapper(storage: 'SQLiteStorage', *args, **kwargs):
+        call = partial(method, storage, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(storage.executor, call)
+    return wrapper
+
+
+def add_bookmark(doc: Dict, query: AddBookmark):
+    """Add a movie to the user's bookmarks unless it is already there.
+
+    Args:
+        doc: User document
+        query: Query model
+    """
+    bookmarks = doc.setdefault('bookmarks', [])
+    if {'film_id': query.film_id} not in bookmarks:
+        bookmarks.append({'film_id': query.film_id})
+
+
+def remove_bookmark(doc: Dict, query: RemoveBookmark):
+    """Remove a movie from the user's bookmarks.
+
+    Args:
+        doc: User document
+        query: Query model
+    """
+    bookmarks = doc.get('bookmarks')
+    if bookmarks is not None:
+        doc['bookmarks'] = [bookmark for bookmark in bookmarks if bookmark['film_id'] != query.film_id]
+
+
+UPDATES: Mapping[type, Callable] = MappingProxyType({
+    AddBookmark: add_bookmark,
+    RemoveBookmark: remove_bookmark,
+    **REVIEW_UPDATES,
+    **RANKING_UPDATES,
+    **VOTE_UPDATES,
+})
+
+
+class SQLiteStorage(ReviewQueries, RankingQueries, VoteQueries):  # noqa: WPS214 one method per storage operation
+    """Embedded data storage keeping BSON documents in SQLite tables.
+
+    Documents have the same shape as in MongoDB. Filters and upserts are taken
+    from the query parameters, while changes and aggregations expressed in the
+    MongoDB query language are reproduced for each query model. All statements
+    run on a single thread, so that waiting for the database lock does not
+    block the event loop.
+
+    Searches support ListReview, SearchReviews, ListVotes, ListTrending,
+    ListLeaderboard, FindArchivedVote and ListAuthors, streams support
+    ExportReviews, ExportFilms and ExportChanges, and updates support the
+    models of the UPDATES mapping. Other query models raise
+    UnsupportedQueryError.
+    """
+
+    @threaded
+    def create(self, collection: MongoCollections, query: MongoQuery) -> Dict:
+        """Create a document in the table.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Raises:
+            DuplicateKeyError: An error if the document violates a uniqueness constraint
+
+        Returns:
+            Dict: New document
+        """
+        doc = query.params['document']
+        try:
+            with self.transaction():
+                self.write(collection, doc, insert=True)
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(str(exc))
+        return doc
+
+    @threaded
+    def create_many(self, collection: MongoCollections, queries: List[MongoQuery]) -> List[int]:
+        """Create documents in the table in a single transaction, skipping duplicates.
+
+        Args:
+            collection: Collection with documents
+            queries: Query models
+
+        Returns:
+            List: Indexes of the queries whose documents are duplicates
+        """
+        if collection == MongoCollections.activity:
+            self.count_activity(queries)
+            return []
+        duplicates = []
+        with self.transaction():
+            for index, query in enumerate(queries):
+                try:
+                    self.write(collection, query.params['document'], insert=True)
+                except sqlite3.IntegrityError:
+                    duplicates.append(index)
+        return duplicates
+
+    @threaded
+    def retrieve(self, collection: MongoCollections, doc_id: UUID) -> Optional[Dict]:
+        """Read a document by ID from the table.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+
+        Returns:
+            Optional[Dict]: Document by ID
+        """
+        return self.read(collection, doc_id)
+
+    @threaded
+    def retrieve_many(self, collection: MongoCollections, doc_ids: List[UUID]) -> List[Dict]:
+        """Read documents by a list of IDs from the table.
+
+        Args:
+            collection: Collection with documents
+            doc_ids: Document IDs
+
+        Returns:
+            List: Found documents in any order
+        """
+        statement = 'SELECT doc FROM {0} WHERE _id IN ({1})'.format(collection.name, ', '.join('?' * len(doc_ids)))
+        rows = self.sqlite.execute(statement, tuple(doc_id.bytes for doc_id in doc_ids))
+        return [bson.decode(row[0], codec_options=CODEC_OPTIONS) for row in rows]
+
+    @threaded
+    def versions(self, collection: MongoCollections, filtering: Dict) -> Dict[UUID, int]:
+        """Read only the versions of the documents matching the filter on the table columns.
+
+        Args:
+            collection: Collection with documents
+            filtering: Filter by document IDs, authors or films
+
+        Returns:
+            Dict: Document versions by ID
+        """
+        statement = 'SELECT _id, version FROM {0} WHERE {1}'.format(
+            collection.name,
+            ' AND '.join('{0} = ?'.format(column) for column in filtering),
+        )
+        rows = self.sqlite.execute(statement, tuple(doc_id.bytes for doc_id in filtering.values()))
+        return {UUID(bytes=row[0]): row[1] for row in rows}
+
+    @threaded
+    def search(self, collection: MongoCollections, query: MongoQuery) -> List[Dict]:
+        """Search for documents in the table.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Raises:
+            UnsupportedQueryError: An error if the query is not supported by the storage
+
+        Returns:
+            List: List of documents
+        """
+        searches: Dict[type, Callable] = {
+            ListReview: self.list_reviews,
+            SearchReviews: self.search_reviews,
+            ListVotes: partial(self.list_votes, collection),
+            ListTrending: self.list_trending,
+            ListLeaderboard: self.list_leaderboard,
+            FindArchivedVote: self.find_archived_vote,
+            ListAuthors: self.list_authors,
+        }
+        search = searches.get(type(query))
+        if search is None:
+            raise UnsupportedQueryError(type(query).__name__)
+        return search(query)
+
+    async def stream(self, collection: MongoCollections, query: MongoQuery) -> AsyncIterator[Dict]:
+        """Iterate over the documents found in the table, reading them in batches after the last read ID.
+
+        Each batch is read on the thread of the connection.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Raises:
+            UnsupportedQueryError: An error if the query is not supported by the storage
+
+        Yields:
+            Dict: Found document
+        """
+        stream: Optional[Callable] = {
+            ExportReviews: self.scan_reviews,
+            ExportFilms: partial(self.scan_docs, collection),
+            ExportChanges: partial(self.scan_changes, collection),
+        }.get(type(query))
+        if stream is None:
+            raise UnsupportedQueryError(type(query).__name__)
+        loop = asyncio.get_running_loop()
+        batches = stream(query)
+        while (batch := await loop.run_in_executor(self.executor, next, batches, None)) is not None:
+            for doc in batch:
+                yield doc
+
+    @threaded
+    def update(self, collection: MongoCollections, query: MongoQuery) -> Optional[Dict]:
+        """Update a document matching the query filter in the table.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Raises:
+            UnsupportedQueryError: An error if the query is not supported by the storage
+            DuplicateKeyError: An error if the document with the ID does not match the filter of an upsert
+
+        Returns:
+            Optional[Dict]: Document after the update, or before it if the query asks for the previous document
+        """
+        change = UPDATES.get(type(query))
+        if change is None:
+            raise UnsupportedQueryError(type(query).__name__)
+        params = query.params
+        filtering = params['filter']
+        with self.transaction():
+            doc = self.read(collection, filtering['_id'])
+            if doc is not None and not matches(doc, filtering):
+                if params['upsert']:
+                    raise DuplicateKeyError('Document {0} does not match the filter'.format(filtering['_id']))
+                return None
+            if doc is None:
+                if not params['upsert']:
+                    return None
+                doc = dict(filtering)
+            returned = doc if params.get('return_document', True) else deepcopy(doc)
+            change(doc, query)
+            doc['version'] = doc.get('version', 0) + 1
+            doc['updated'] = datetime.utcnow()
+            self.write(collection, doc)
+        return returned
+
+    @threaded
+    def delete(self, collection: MongoCollections, query: MongoQuery) -> Optional[Dict]:
+        """Delete a document matching the query filter from the table.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            Optional[Dict]: Deleted document
+        """
+        filtering = query.params['filter']
+        with self.transaction():
+            doc = self.read(collection, filtering['_id'])
+            if doc is None or not matches(doc, filtering):
+                return None
+            self.sqlite.execute('DELETE FROM {0} WHERE _id = ?'.format(collection.name), (doc['_id'].bytes,))
+            if collection == MongoCollections.reviews:
+                self.sqlite.execute('DELETE FROM reviews_text WHERE _id = ?', (doc['_id'].bytes,))
+            self.sqlite.execute(VOTE_DELETE, (collection.name, doc['_id'].bytes))
+        return doc
@@ -0,0 +1,135 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import bson
+
+from core.enums import MongoCollections
+from db.base import Storage
+from db.sqlite_schema import CODEC_OPTIONS, VOTE_DELETE, VOTE_INSERT, VOTED, vote_rows
+from models.export_queries import ExportChanges, ExportFilms
+
+
+class SQLiteDocuments(Storage):
+    """Base class of the SQLite storage reading and writing BSON documents in the tables of their collections."""
+
+    def __init__(self, sqlite: sqlite3.Connection, executor: ThreadPoolExecutor):
+        """When initializing the class, it accepts the SQLite connection and the thread running its statements.
+
+        Args:
+            sqlite: SQLite connection
+            executor: Executor with a single thread
+        """
+        self.sqlite = sqlite
+        self.executor = executor
+
+    def read(self, collection: MongoCollections, doc_id: UUID) -> Optional[Dict]:
+        """Read and decode a document by ID.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+
+        Returns:
+            Optional[Dict]: Document by ID
+        """
+        row = self.sqlite.execute('SELECT doc FROM {0} WHERE _id = ?'.format(collection.name), (doc_id.bytes,))
+        raw = row.fetchone()
+        return bson.decode(raw[0], codec_options=CODEC_OPTIONS) if raw else None
+
+    def write(self, collection: MongoCollections, doc: Dict, insert: bool = False):
+        """Encode and save a document, replacing the previous version.
+
+        Args:
+            collection: Collection with documents
+            doc: Document
+            insert: Fail instead of replacing an existing document
+        """
+        columns = {
+            '_id': doc['_id'].bytes,
+            'version': doc.get('version', 0),
+            'doc': bson.encode(doc, codec_options=CODEC_OPTIONS),
+        }
+        if collection == MongoCollections.reviews:
+            columns.update(author=doc['author'].bytes, film_id=doc['film_id'].bytes)
+        if collection == MongoCollections.leaderboard:
+            columns.update(score=doc['score'], votes=doc['votes'])
+        statement = 'INSERT INTO {0} ({1}) VALUES ({2}) {3}'.format(
+            collection.name,
+            ', '.join(columns),
+            ', '.join('?' * len(columns)),
+            '' if insert else 'ON CONFLICT (_id) DO UPDATE SET {0}'.format(
+                ', '.join('{0} = excluded.{0}'.format(column) for column in columns if column != '_id'),
+            ),
+        )
+        self.sqlite.execute(statement, tuple(columns.values()))
+        if insert and collection == MongoCollections.reviews:
+            self.sqlite.execute('INSERT INTO reviews_text (_id, text) VALUES (?, ?)', (columns['_id'], doc['text']))
+        if collection in VOTED:
+            self.sqlite.execute(VOTE_DELETE, (collection.name, columns['_id']))
+            self.sqlite.executemany(VOTE_INSERT, vote_rows(collection, doc))
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in a write transaction, taking the database lock up front.
+
+        Yields:
+            sqlite3.Connection: SQLite connection
+        """
+        self.sqlite.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.sqlite
+        except BaseException:
+            self.sqlite.execute('ROLLBACK')
+            raise
+        self.sqlite.execute('COMMIT')
+
+    def scan(self, collection: MongoCollections, batch: int, **filtering: bytes) -> Iterator[List[Tuple]]:
+        """Read the rows matching the filter on the table columns in batches after the last read ID.
+
+        Args:
+            collection: Collection with documents
+            batch: Number of rows read at once
+            filtering: Filter by table columns
+
+        Yields:
+            List: Document IDs and encoded documents
+        """
+        statement = 'SELECT _id, doc FROM {0} WHERE {1} _id > ? ORDER BY _id LIMIT ?'.format(
+            collection.name,
+            ''.join('{0} = ? AND'.format(column) for column in filtering),
+        )
+        last_id = b''
+        while rows := self.sqlite.execute(statement, (*filtering.values(), last_id, batch)).fetchall():
+            yield rows
+            last_id = rows[-1][0]
+
+    def scan_docs(self, collection: MongoCollections, query: ExportFilms) -> Iterator[List[Dict]]:
+        """Read all documents of a table in batches.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Yields:
+            List: Documents
+        """
+        for rows in self.scan(collection, query.batch):
+            yield [bson.decode(row[1], codec_options=CODEC_OPTIONS) for row in rows]
+
+    def scan_changes(self, collection: MongoCollections, query: ExportChanges) -> Iterator[List[Dict]]:
+        """Read the documents updated since the time of the query in batches, as the index on the update time does.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Yields:
+            List: Changed documents, possibly none in a batch
+        """
+        for rows in self.scan(collection, query.batch):
+            docs = (bson.decode(row[1], codec_options=CODEC_OPTIONS) for row in rows)
+            yield [doc for doc in docs if query.since is None or doc.get('updated', datetime.min) >= query.since]
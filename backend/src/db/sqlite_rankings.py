@@ -0,0 +1,81 @@
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping
+from uuid import UUID
+
+import bson
+
+from core.config import CONFIG
+from db.sqlite_documents import SQLiteDocuments
+from db.sqlite_schema import CODEC_OPTIONS, timestamp
+from models.ranking_queries import DECAY, CountActivity, ListLeaderboard, ListTrending, ReplaceLeaderboardEntry
+
+ACTIVITY_INSERT = """
+    INSERT INTO activity (bucket, film_id, count) VALUES (?, ?, ?)
+    ON CONFLICT (bucket, film_id) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def replace_leaderboard_entry(doc: Dict, query: ReplaceLeaderboardEntry):
+    """Replace the leaderboard entry of a film unless it was computed from a newer film version.
+
+    Args:
+        doc: Leaderboard entry
+        query: Query model
+    """
+    if doc.get('film_version', 0) <= query.film_version:
+        doc.update(query.entry)
+
+
+RANKING_UPDATES: Mapping[type, Callable] = MappingProxyType({
+    ReplaceLeaderboardEntry: replace_leaderboard_entry,
+})
+
+
+class RankingQueries(SQLiteDocuments):
+    """Queries of the SQLite storage on the leaderboard and the activity counters of films."""
+
+    def list_leaderboard(self, query: ListLeaderboard) -> List[Dict]:
+        """Retrieve a page of the rated films with the index on the Bayesian average scores.
+
+        Args:
+            query: Query model
+
+        Returns:
+            List: Leaderboard entries
+        """
+        statement = 'SELECT doc FROM leaderboard WHERE votes > 0 ORDER BY score DESC, _id LIMIT ? OFFSET ?'
+        return [
+            bson.decode(row[0], codec_options=CODEC_OPTIONS)
+            for row in self.sqlite.execute(statement, (query.limit, query.offset))
+        ]
+
+    def list_trending(self, query: ListTrending) -> List[Dict]:
+        """Rank films by the activity counters in the window, decayed with their age, as the aggregation does.
+
+        Args:
+            query: Query model
+
+        Returns:
+            List: Film IDs with their trending scores
+        """
+        now = timestamp(query.now)
+        scores: Dict[bytes, float] = defaultdict(float)
+        statement = 'SELECT film_id, bucket, count FROM activity WHERE bucket >= ?'
+        for row in self.sqlite.execute(statement, (timestamp(query.since),)):
+            scores[row[0]] += row[2] * DECAY ** ((now - row[1]) / query.halflife)
+        ranked = sorted(scores, key=lambda film: (-scores[film], film))[query.offset:query.offset + query.limit]
+        return [{'_id': UUID(bytes=film), 'score': scores[film]} for film in ranked]
+
+    def count_activity(self, queries: List[CountActivity]):
+        """Add the activity counters to their time buckets and drop the buckets that left the trending window.
+
+        Args:
+            queries: Query models
+        """
+        with self.transaction():
+            self.sqlite.executemany(ACTIVITY_INSERT, (
+                (timestamp(query.bucket), query.film_id.bytes, query.count) for query in queries
+            ))
+            oldest = min(timestamp(query.bucket) for query in queries) - CONFIG.trending.window
+            self.sqlite.execute('DELETE FROM activity WHERE bucket < ?', (oldest,))
@@ -0,0 +1,107 @@
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping
+from uuid import UUID
+
+import bson
+
+from core.enums import MongoCollections
+from db.sqlite_documents import SQLiteDocuments
+from db.sqlite_schema import CODEC_OPTIONS, text_query
+from models.archive_queries import ListAuthors
+from models.documents import score_review, sort_documents
+from models.review_queries import ExportReviews, ListReview, ReplaceTopReviews, SearchReviews
+
+
+def replace_top_reviews(doc: Dict, query: ReplaceTopReviews):
+    """Replace the materialized list of the top reviews of a film.
+
+    Args:
+        doc: Top reviews document
+        query: Query model
+    """
+    doc['reviews'] = query.reviews
+    doc['complete'] = query.complete
+
+
+REVIEW_UPDATES: Mapping[type, Callable] = MappingProxyType({
+    ReplaceTopReviews: replace_top_reviews,
+})
+
+
+class ReviewQueries(SQLiteDocuments):
+    """Queries of the SQLite storage on reviews, adding their ratings as the reviews aggregation does."""
+
+    def list_reviews(self, query: ListReview) -> List[Dict]:
+        """Retrieve a page of film reviews with their ratings, as the reviews aggregation does.
+
+        Args:
+            query: Query model
+
+        Returns:
+            List: List of reviews
+        """
+        film_scores = self.film_scores(query.film_id)
+        reviews = [
+            score_review(bson.decode(row[0], codec_options=CODEC_OPTIONS), film_scores)
+            for row in self.sqlite.execute('SELECT doc FROM reviews WHERE film_id = ?', (query.film_id.bytes,))
+        ]
+        return sort_documents(reviews, query.ordering)[query.offset:query.offset + query.limit]
+
+    def search_reviews(self, query: SearchReviews) -> List[Dict]:
+        """Retrieve a page of reviews matching any of the words with the full-text index, best matches first.
+
+        Args:
+            query: Query model
+
+        Returns:
+            List: List of reviews
+        """
+        statement = 'SELECT doc FROM reviews_text JOIN reviews USING (_id) WHERE reviews_text MATCH ? {0} {1}'.format(
+            '' if query.film_id is None else 'AND film_id = ?',
+            'ORDER BY rank, _id LIMIT ? OFFSET ?',
+        )
+        params = (text_query(query.text), *([] if query.film_id is None else [query.film_id.bytes]))
+        reviews = [
+            bson.decode(row[0], codec_options=CODEC_OPTIONS)
+            for row in self.sqlite.execute(statement, (*params, query.limit, query.offset))
+        ]
+        films = {review['film_id'] for review in reviews}
+        film_scores = {film_id: self.film_scores(film_id) for film_id in films}
+        return [score_review(review, film_scores[review['film_id']]) for review in reviews]
+
+    def list_authors(self, query: ListAuthors) -> List[Dict]:
+        """Retrieve the authors of the reviews of a film with the index on film IDs.
+
+        Args:
+            query: Query model
+
+        Returns:
+            List: Review authors
+        """
+        rows = self.sqlite.execute('SELECT author FROM reviews WHERE film_id = ?', (query.film_id.bytes,))
+        return [{'author': UUID(bytes=row[0])} for row in rows]
+
+    def scan_reviews(self, query: ExportReviews) -> Iterator[List[Dict]]:
+        """Read the reviews of a film with their ratings in batches.
+
+        Args:
+            query: Query model
+
+        Yields:
+            List: Reviews
+        """
+        film_scores = self.film_scores(query.film_id)
+        for rows in self.scan(MongoCollections.reviews, query.batch, film_id=query.film_id.bytes):
+            yield [score_review(bson.decode(row[1], codec_options=CODEC_OPTIONS), film_scores) for row in rows]
+
+    def film_scores(self, film_id: UUID) -> Dict[UUID, int]:
+        """Read the scores of a film by user.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            Dict: Film scores by user ID
+        """
+        film = self.read(MongoCollections.films, film_id) or {}
+        return {vote['user_id']: vote['score'] for vote in film.get('rating', {}).get('votes', [])}
@@ -0,0 +1,180 @@
+import calendar
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import bson
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+
+from core.enums import MongoCollections
+
+CODEC_OPTIONS: CodecOptions = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+VOTED = (MongoCollections.films, MongoCollections.reviews, MongoCollections.archive)
+VOTE_DELETE = 'DELETE FROM votes WHERE source = ? AND source_id = ?'
+VOTE_INSERT = 'INSERT INTO votes (source, source_id, user_id, film_id, score) VALUES (?, ?, ?, ?, ?)'
+
+
+def create_tables(sqlite: sqlite3.Connection):
+    """Create tables for users, films, reviews, the indexes of votes and review texts, and the top reviews of films.
+
+    The activity counters of films are kept in a table of time buckets, and the shards
+    of the votes of hot films and the archive buckets of old votes in tables of their own.
+
+    Args:
+        sqlite: SQLite connection
+    """
+    sqlite.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            _id BLOB PRIMARY KEY,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS films (
+            _id BLOB PRIMARY KEY,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS reviews (
+            _id BLOB PRIMARY KEY,
+            author BLOB NOT NULL,
+            film_id BLOB NOT NULL,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL,
+            UNIQUE (author, film_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS reviews_film_id ON reviews (film_id, version);
+        CREATE INDEX IF NOT EXISTS reviews_film_id_id ON reviews (film_id, _id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS reviews_text USING fts5 (
+            _id UNINDEXED,
+            text,
+            tokenize = 'porter unicode61'
+        );
+        CREATE TABLE IF NOT EXISTS votes (
+            source TEXT NOT NULL,
+            source_id BLOB NOT NULL,
+            user_id BLOB NOT NULL,
+            film_id BLOB,
+            score INTEGER NOT NULL,
+            PRIMARY KEY (source, source_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS votes_user_id ON votes (user_id, source, source_id);
+        CREATE INDEX IF NOT EXISTS votes_user_id_film_id ON votes (user_id, source, film_id);
+        CREATE TABLE IF NOT EXISTS top_reviews (
+            _id BLOB PRIMARY KEY,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            _id BLOB PRIMARY KEY,
+            score REAL NOT NULL,
+            votes INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS leaderboard_score ON leaderboard (score DESC, _id) WHERE votes > 0;
+        CREATE TABLE IF NOT EXISTS shards (
+            _id BLOB PRIMARY KEY,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS archive (
+            _id BLOB PRIMARY KEY,
+            version INTEGER NOT NULL,
+            doc BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS activity (
+            bucket INTEGER NOT NULL,
+            film_id BLOB NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (bucket, film_id)
+        ) WITHOUT ROWID;
+        """,
+    )
+    if not sqlite.execute('SELECT 1 FROM reviews_text LIMIT 1').fetchone():
+        sqlite.executemany('INSERT INTO reviews_text (_id, text) VALUES (?, ?)', (
+            (row[0], bson.decode(row[1], codec_options=CODEC_OPTIONS).get('text', ''))
+            for row in sqlite.execute('SELECT _id, doc FROM reviews')
+        ))
+    if not sqlite.execute('SELECT 1 FROM votes LIMIT 1').fetchone():
+        for collection in VOTED:
+            sqlite.executemany(VOTE_INSERT, (
+                vote
+                for row in sqlite.execute('SELECT doc FROM {0}'.format(collection.name))
+                for vote in vote_rows(collection, bson.decode(row[0], codec_options=CODEC_OPTIONS))
+            ))
+
+
+def vote_rows(collection: MongoCollections, doc: Dict) -> List[Tuple]:
+    """Rows of the votes index for a rated document.
+
+    Args:
+        collection: Collection with documents
+        doc: Film or review document
+
+    Returns:
+        List: Rows of the votes table
+    """
+    film_id = doc['film_id'].bytes if 'film_id' in doc else None
+    return [
+        (collection.name, doc['_id'].bytes, vote['user_id'].bytes, film_id, vote['score'])
+        for vote in doc.get('rating', {}).get('votes', [])
+    ]
+
+
+def timestamp(moment: datetime) -> int:
+    """Unix time of a naive UTC datetime.
+
+    Args:
+        moment: Date and time in UTC
+
+    Returns:
+        int: Seconds since the epoch
+    """
+    return calendar.timegm(moment.utctimetuple())
+
+
+def text_query(text: str) -> str:
+    """Full-text query matching any of the words, quoted so that the query syntax is not interpreted.
+
+    Args:
+        text: Searched words
+
+    Returns:
+        str: FTS5 query
+    """
+    return ' OR '.join('"{0}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+def field_values(field: Any, path: List[str]) -> List:
+    """Values of a dotted field, taken from every element of the arrays on its path, as MongoDB filters do.
+
+    Args:
+        field: Document or a part of it
+        path: Keys of the field
+
+    Returns:
+        List: Values of the field, None if it is missing
+    """
+    if not path:
+        return [field]
+    if isinstance(field, list):
+        return [found for element in field for found in field_values(element, path)]
+    if isinstance(field, dict):
+        return field_values(field.get(path[0]), path[1:])
+    return [None]
+
+
+def matches(doc: Dict, filtering: Dict) -> bool:
+    """Check whether a document matches a filter of equalities on its fields.
+
+    Args:
+        doc: Document
+        filtering: Expected values by dotted field
+
+    Returns:
+        bool: All fields have the expected values
+    """
+    return all(expected in field_values(doc, key.split('.')) for key, expected in filtering.items())
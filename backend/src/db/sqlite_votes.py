@@ -0,0 +1,191 @@
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Tuple
+from uuid import UUID
+
+import bson
+
+from core.enums import MongoCollections
+from db.sqlite_documents import SQLiteDocuments
+from db.sqlite_schema import CODEC_OPTIONS
+from models.archive_queries import ArchiveVotes, CountArchivedVotes, FindArchivedVote, UnarchiveVote
+from models.queries import AddRating, RemoveRating
+from models.vote_queries import ListVotes, ReplaceVotes
+
+VOTES_SELECT = """
+    SELECT {0}, source, film_id, score FROM votes WHERE user_id = ? AND source = ? {1}
+    ORDER BY {0} LIMIT ?
+"""
+VOTES_UNION = 'SELECT * FROM ({0}) UNION ALL SELECT * FROM ({1}) ORDER BY 1 LIMIT ? OFFSET ?'
+
+
+def add_rating(doc: Dict, query: AddRating):
+    """Put the user's vote first in the rating, replacing the previous one.
+
+    Args:
+        doc: Film, review or shard document
+        query: Query model
+    """
+    votes = doc.setdefault('rating', {}).get('votes') or []
+    doc['rating']['votes'] = [
+        {'user_id': query.user_id, 'score': query.score.value, 'date': query.date},
+        *(vote for vote in votes if vote['user_id'] != query.user_id),
+    ]
+
+
+def remove_rating(doc: Dict, query: RemoveRating):
+    """Remove the user's vote from the rating.
+
+    Args:
+        doc: Film, review or shard document
+        query: Query model
+    """
+    votes = doc.get('rating', {}).get('votes')
+    if votes is not None:
+        doc['rating']['votes'] = [vote for vote in votes if vote['user_id'] != query.user_id]
+
+
+def replace_votes(doc: Dict, query: ReplaceVotes):
+    """Replace the votes of a film with the votes merged from its shards, adding the shard versions.
+
+    Args:
+        doc: Film document
+        query: Query model
+    """
+    doc.setdefault('rating', {})['votes'] = query.votes
+    doc['version'] = doc.get('version', 0) + query.shards_version
+
+
+def count_archived_votes(doc: Dict, query: CountArchivedVotes):
+    """Change the numbers of archived likes and dislikes of a film.
+
+    Args:
+        doc: Film document
+        query: Query model
+    """
+    rating = doc.setdefault('rating', {})
+    for field, increment in query.counters.items():
+        counter = field.split('.')[-1]
+        rating[counter] = rating.get(counter, 0) + increment
+
+
+def archive_votes(doc: Dict, query: ArchiveVotes):
+    """Remove the archived votes of a film, counting them and committing their buckets.
+
+    Args:
+        doc: Film document
+        query: Query model
+    """
+    count_archived_votes(doc, query)  # type: ignore
+    doc['rating']['votes'] = query.votes
+    doc['rating']['buckets'] = [*doc['rating'].get('buckets', []), *query.bucket_ids]
+
+
+VOTE_UPDATES: Mapping[type, Callable] = MappingProxyType({
+    AddRating: add_rating,
+    RemoveRating: remove_rating,
+    ReplaceVotes: replace_votes,
+    ArchiveVotes: archive_votes,
+    UnarchiveVote: remove_rating,
+    CountArchivedVotes: count_archived_votes,
+})
+
+
+class VoteQueries(SQLiteDocuments):
+    """Queries of the SQLite storage on the votes of users with the index of votes."""
+
+    def list_votes(self, collection: MongoCollections, query: ListVotes) -> List[Dict]:
+        """Retrieve a page of the votes of a user with the index on voter IDs.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            List: IDs of the rated documents with the scores of the user
+        """
+        if query.archived:
+            return self.list_archived_votes(collection, query)
+        statement, params = self.select_votes(collection, 'source_id', query, query.limit)
+        return self.read_votes(collection, '{0} OFFSET ?'.format(statement), (*params, query.offset))
+
+    def list_archived_votes(self, collection: MongoCollections, query: ListVotes) -> List[Dict]:
+        """Retrieve a page of the votes of a user including the archived votes on films, under the IDs of the films.
+
+        The votes in the documents and in the archive are each read in the order
+        of their index up to the end of the page, and only these are merged.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Returns:
+            List: IDs of the rated documents with the scores of the user
+        """
+        window = query.offset + query.limit
+        voted, voted_params = self.select_votes(collection, 'source_id', query, window)
+        archived, archived_params = self.select_votes(MongoCollections.archive, 'film_id', query, window)
+        return self.read_votes(
+            collection,
+            VOTES_UNION.format(voted, archived),
+            (*voted_params, *archived_params, query.limit, query.offset),
+        )
+
+    def select_votes(self, source: MongoCollections, column: str, query: ListVotes, limit: int) -> Tuple[str, Tuple]:
+        """Statement selecting the first votes of a user from a source in the order of a column.
+
+        Args:
+            source: Collection of the voted documents
+            column: Column with the IDs of the listed documents
+            query: Query model
+            limit: Number of votes
+
+        Returns:
+            Tuple: Statement and its parameters
+        """
+        statement = VOTES_SELECT.format(
+            column,
+            '' if query.source_ids is None else 'AND {0} IN ({1})'.format(
+                column, ','.join('?' * len(query.source_ids)),
+            ),
+        )
+        params = (
+            query.user_id.bytes,
+            source.name,
+            *(source_id.bytes for source_id in query.source_ids or ()),
+            limit,
+        )
+        return statement, params
+
+    def read_votes(self, collection: MongoCollections, statement: str, params: Tuple) -> List[Dict]:
+        """Read the votes of a user selected by a statement.
+
+        Args:
+            collection: Collection with documents
+            statement: SQL statement
+            params: Statement parameters
+
+        Returns:
+            List: IDs of the rated documents with the scores of the user
+        """
+        return [
+            {'_id': UUID(bytes=row[0]), 'score': row[3], **({} if row[1] != collection.name or row[2] is None else {
+                'film_id': UUID(bytes=row[2]),
+            })}
+            for row in self.sqlite.execute(statement, params)
+        ]
+
+    def find_archived_vote(self, query: FindArchivedVote) -> List[Dict]:
+        """Retrieve the buckets with the vote of a user with the index of votes.
+
+        Args:
+            query: Query model
+
+        Returns:
+            List: Bucket documents
+        """
+        statement = 'SELECT doc FROM votes JOIN archive ON source_id = _id WHERE {0} AND source_id IN ({1})'.format(
+            'source = ? AND user_id = ?',
+            ','.join('?' * len(query.bucket_ids)),
+        )
+        params = (MongoCollections.archive.name, query.user_id.bytes, *(doc_id.bytes for doc_id in query.bucket_ids))
+        return [bson.decode(row[0], codec_options=CODEC_OPTIONS) for row in self.sqlite.execute(statement, params)]
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from core.config import CONFIG
+from core.enums import StorageBackends
+from db import mongo, sqlite
+from db.base import Storage
+
+storage: Optional[Storage] = None
+
+
+async def start():
+    """Connect to the data storage chosen in the settings."""
+    global storage
+    if CONFIG.storage.backend == StorageBackends.sqlite:
+        await sqlite.start()
+        storage = sqlite.SQLiteStorage(sqlite.sqlite, sqlite.executor)
+    else:
+        await mongo.start()
+        storage = mongo.MongoStorage(mongo.mongo)
+
+
+async def stop():
+    """Disconnect from the data storage chosen in the settings."""
+    if CONFIG.storage.backend == StorageBackends.sqlite:
+        await sqlite.stop()
+    else:
+        await mongo.stop()
+
+
+async def get_storage() -> Storage:
+    """Declare the data storage, needed for dependency injection.
+
+    Returns:
+        Storage: The data storage
+    """
+    return storage
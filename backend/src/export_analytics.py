@@ -0,0 +1,141 @@
+"""Incremental export of users, films, reviews and votes to Parquet datasets for analytics.
+
+Streams the documents of users, films, reviews and archive buckets updated
+since the previous export in batches, by the index on their update time, and
+flattens them into the tables of users, bookmarks, films, reviews, buckets and
+votes, appending every batch as Parquet files to the datasets of the output
+directory, partitioned by date in the Hive layout. The start of the export
+minus the lag is kept in the state file of the output directory, so documents
+changed during an export or stamped by a server with a late clock are exported
+again by the next one. Every row carries the version of its document, and the
+rows of the latest version of a document supersede the earlier ones. Votes in
+the shards of hot films are exported once they are folded into the film.
+
+Usage:
+    python export_analytics.py /data/ugc --batch 500
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pyarrow import dataset
+
+from core.config import CONFIG
+from core.enums import MongoCollections
+from db import storage
+from models.analytics import TABLES
+from models.export_queries import ExportChanges
+
+STATE = 'since'
+RUN_FORMAT = '%Y%m%dT%H%M%S%f'
+
+
+def read_state(output: Path) -> Optional[datetime]:
+    """Time in UTC since which the documents are exported, stored by the previous export.
+
+    Args:
+        output: Output directory
+
+    Returns:
+        Optional[datetime]: Time of the previous export, or None if all documents are exported
+    """
+    state = output / STATE
+    if not state.exists():
+        return None
+    return datetime.fromisoformat(state.read_text().strip())
+
+
+def write_batch(output: Path, collection: MongoCollections, docs: List[Dict], basename: str) -> int:
+    """Flatten a batch of documents and append the tables to the datasets of the output directory.
+
+    Args:
+        output: Output directory
+        collection: Collection of the documents
+        docs: Documents
+        basename: Prefix of the names of the written files, unique for the batch
+
+    Returns:
+        int: Number of documents
+    """
+    for name, table in TABLES[collection](docs).items():
+        if table.num_rows:
+            dataset.write_dataset(
+                table,
+                output / name,
+                format='parquet',
+                partitioning=['date'],
+                partitioning_flavor='hive',
+                basename_template='{0}-{{i}}.parquet'.format(basename),
+                existing_data_behavior='overwrite_or_ignore',
+            )
+    return len(docs)
+
+
+async def export_collection(
+    output: Path, collection: MongoCollections, since: Optional[datetime], size: int, run: str,
+) -> int:
+    """Export the documents of a collection updated since a time in batches.
+
+    Args:
+        output: Output directory
+        collection: Collection with documents
+        since: Documents updated before the time in UTC are skipped, all documents are exported if None
+        size: Number of documents read and written at once
+        run: Name of the export
+
+    Returns:
+        int: Number of documents
+    """
+    total = 0
+    docs = []
+    async for doc in storage.storage.stream(collection, ExportChanges(since=since, batch=size)):
+        docs.append(doc)
+        if len(docs) >= size:
+            total += write_batch(output, collection, docs, '{0}-{1}-{2}'.format(run, collection.name, total))
+            docs = []
+    return total + write_batch(output, collection, docs, '{0}-{1}-{2}'.format(run, collection.name, total))
+
+
+async def export_analytics(output: Path, size: int, full: bool) -> Dict[str, int]:
+    """Connect to the data storage chosen in the settings and export the documents changed since the previous export.
+
+    Args:
+        output: Output directory
+        size: Number of documents read and written at once
+        full: Export all documents regardless of the previous export
+
+    Returns:
+        Dict: Numbers of exported documents by collection
+    """
+    await storage.start()
+    since = None if full else read_state(output)
+    started = datetime.utcnow()
+    counts = await asyncio.gather(*(
+        export_collection(output, collection, since, size, started.strftime(RUN_FORMAT)) for collection in TABLES
+    ))
+    await storage.stop()
+    output.mkdir(parents=True, exist_ok=True)
+    (output / STATE).write_text((started - timedelta(seconds=CONFIG.export.lag)).isoformat())
+    return {collection.name: count for collection, count in zip(TABLES, counts)}
+
+
+def main():
+    """Parse the command line and run the export."""
+    parser = argparse.ArgumentParser(description='Export the changed documents to Parquet datasets for analytics.')
+    parser.add_argument('output', type=Path, help='directory of the datasets')
+    parser.add_argument(
+        '--batch', type=int, default=CONFIG.export.batch, help='number of documents read and written at once',
+    )
+    parser.add_argument('--full', action='store_true', help='export all documents, not only the changed ones')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for name, count in asyncio.run(export_analytics(args.output, args.batch, args.full)).items():
+        logging.info('%s: %d', name, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Bulk import of legacy reviews into the UGC data storage.
+
+Reads a file of newline-delimited JSON reviews with the `author`, `film_id`,
+`text` and optional `pub_date` fields, and inserts them in unordered batches,
+so that a duplicate review of a film by the same author does not stop its
+batch. Duplicate and invalid lines are reported by line number. The top
+review lists of the films are emptied afterwards to be rebuilt.
+
+Usage:
+    python import_reviews.py reviews.ndjson --batch 1000
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from core.enums import MongoCollections
+from db import storage
+from db.base import Storage
+from models.base import OrjsonMixin
+from models.review_queries import CreateReview, ReplaceTopReviews
+
+NumberedLines = List[Tuple[int, str]]
+
+
+class LegacyReview(OrjsonMixin):
+    """Review in the import file."""
+
+    author: UUID
+    film_id: UUID
+    text: str
+    pub_date: Optional[datetime]
+
+
+def batches(lines: Iterable[str], size: int) -> Iterator[NumberedLines]:
+    """Split non-empty lines into batches, keeping their line numbers.
+
+    Args:
+        lines: Lines of the import file
+        size: Number of lines in a batch
+
+    Yields:
+        List: Line numbers and lines
+    """
+    numbered = ((number, line) for number, line in enumerate(lines, start=1) if line.strip())
+    while batch := list(islice(numbered, size)):
+        yield batch
+
+
+class ReviewImporter:
+    """Importer of reviews into the data storage in unordered batches."""
+
+    def __init__(self, storage: Storage):
+        """When initializing the class, it accepts the data storage backend.
+
+        Args:
+            storage: MongoDB or embedded data storage
+        """
+        self.storage = storage
+        self.totals = {'inserted': 0, 'duplicates': 0, 'invalid': 0}
+        self.films: Set[UUID] = set()
+
+    async def run(self, lines: Iterable[str], size: int) -> Dict[str, int]:
+        """Import the reviews and empty the top review lists of their films.
+
+        Args:
+            lines: Lines of the import file
+            size: Number of reviews inserted at once
+
+        Returns:
+            Dict: Numbers of inserted, duplicate and invalid reviews
+        """
+        for batch in batches(lines, size):
+            await self.insert(batch)  # noqa: WPS476
+        await asyncio.gather(*(
+            self.storage.update(MongoCollections.top_reviews, ReplaceTopReviews(film_id, reviews=[], complete=False))
+            for film_id in self.films
+        ))
+        return self.totals
+
+    def parse(self, batch: NumberedLines) -> Tuple[List[CreateReview], List[int]]:
+        """Parse a batch of lines into insert queries, reporting invalid lines.
+
+        Args:
+            batch: Line numbers and lines
+
+        Returns:
+            Tuple: Queries and the line numbers of their reviews
+        """
+        queries = []
+        numbers = []
+        for number, line in batch:
+            try:
+                review = LegacyReview.parse_raw(line)
+            except ValueError as exc:
+                logging.warning('line %d: invalid review: %s', number, exc)
+                self.totals['invalid'] += 1
+                continue
+            queries.append(CreateReview(**review.dict()))
+            numbers.append(number)
+        return queries, numbers
+
+    async def insert(self, batch: NumberedLines):
+        """Insert a batch of reviews, reporting invalid lines and duplicates.
+
+        Args:
+            batch: Line numbers and lines
+        """
+        queries, numbers = self.parse(batch)
+        if not queries:
+            return
+        duplicates = await self.storage.create_many(MongoCollections.reviews, queries)
+        for index in duplicates:
+            logging.warning(
+                'line %d: duplicate review of film %s by author %s',
+                numbers[index], queries[index].film_id, queries[index].author,
+            )
+        self.totals['inserted'] += len(queries) - len(duplicates)
+        self.totals['duplicates'] += len(duplicates)
+        self.films.update(query.film_id for query in queries)
+
+
+async def import_reviews(path: str, size: int) -> Dict[str, int]:
+    """Connect to the data storage chosen in the settings and import the reviews from the file.
+
+    Args:
+        path: Path to the import file
+        size: Number of reviews inserted at once
+
+    Returns:
+        Dict: Numbers of inserted, duplicate and invalid reviews
+    """
+    await storage.start()
+    with open(path, encoding='utf-8') as lines:
+        totals = await ReviewImporter(storage.storage).run(lines, size)
+    await storage.stop()
+    return totals
+
+
+def main():
+    """Parse the command line and run the import."""
+    parser = argparse.ArgumentParser(description='Import legacy reviews from a file of JSON lines.')
+    parser.add_argument('path', help='file with one JSON review per line')
+    parser.add_argument('--batch', type=int, default=1000, help='number of reviews inserted at once')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logging.info('imported: %s', asyncio.run(import_reviews(args.path, args.batch)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,26 @@
+import asyncio
 import logging
+from typing import Dict
 
-import sentry_sdk
 import uvicorn
 from fastapi import APIRouter, Depends, FastAPI, Header
 from fastapi.responses import ORJSONResponse
-from sentry_sdk.integrations.fastapi import FastApiIntegration
 
+from api.compression import CompressionMiddleware
 from api.urls import routes
+from services import invalidation
+from services.crud import CRUDService, get_crud_service
+from services.live import LiveRatingsService, get_live_ratings_service
+from services.sharding import ShardedVotesService, get_sharded_votes_service
+from services.snapshot import RatingSnapshotService, get_rating_snapshot_service
+from services.trending import get_trending_service
 from core.config import CONFIG
 from core.exceptions import exception_handlers
-from core.logger import LOGGING, RequestIdFilter
-from db import mongo
+from core.logger import LOGGING, RequestIdFilter, setup_logging, setup_sentry
+from db import storage
 
-if sentry := CONFIG.sentry.dsn:
-    sentry_sdk.init(sentry, integrations=[FastApiIntegration()])
+setup_logging()
+setup_sentry()
 
 
 async def logging_request_id(request_id: str = Header(default=None, alias='X-Request-Id')):
@@ -40,18 +47,66 @@ app = FastAPI(
 
 @app.on_event('startup')
 async def startup():
-    """Connect to the MongoDB data storage when the server starts."""
-    await mongo.start()
+    """Connect to the data storage and start the background tasks of the caches, activity, shards and ratings."""
+    await storage.start()
+    crud = get_crud_service(storage=storage.storage)
+    votes = get_sharded_votes_service(crud=crud)
+    live = get_live_ratings_service(votes=votes)
+    await invalidation.start(crud.cache, on_change=live.notify)
+    await asyncio.gather(
+        get_trending_service(crud=crud).start(),
+        votes.start(),
+        live.start(),
+        get_rating_snapshot_service(crud=crud).start(),
+    )
 
 
 @app.on_event('shutdown')
 async def shutdown():
-    """Disconnect from the MongoDB data storage when the server shuts down."""
-    await mongo.stop()
+    """Stop the background tasks, folding the shards and flushing the activity, and disconnect from the storage."""
+    crud = get_crud_service(storage=storage.storage)
+    votes = get_sharded_votes_service(crud=crud)
+    await asyncio.gather(
+        get_rating_snapshot_service(crud=crud).stop(),
+        get_live_ratings_service(votes=votes).stop(),
+        votes.stop(),
+        get_trending_service(crud=crud).stop(),
+    )
+    await invalidation.stop()
+    await storage.stop()
+
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics(
+    crud: CRUDService = Depends(get_crud_service),
+    votes: ShardedVotesService = Depends(get_sharded_votes_service),
+    live: LiveRatingsService = Depends(get_live_ratings_service),
+    snapshot: RatingSnapshotService = Depends(get_rating_snapshot_service),
+) -> Dict:
+    """Report the internal metrics of the service, which are not exposed by the NGINX proxy.
+
+    Args:
+        crud: Service for data processing in the data storage
+        votes: Service for the votes of films, spread over shards while they are hot
+        live: Service for live rating updates
+        snapshot: Snapshot of film ratings shared by the workers
+
+    Returns:
+        Dict: Metrics by component
+    """
+    return {**crud.metrics, 'sharding': votes.metrics, 'live': live.metrics, 'snapshot': snapshot.metrics}
 
 
 app.include_router(APIRouter(routes=routes), prefix='/api/v1')
 
+if CONFIG.compression.enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum=CONFIG.compression.minimum,
+        level=CONFIG.compression.gzip,
+        quality=CONFIG.compression.brotli,
+    )
+
 
 if __name__ == '__main__':
     uvicorn.run(
@@ -0,0 +1,127 @@
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping
+
+import pyarrow as pa
+
+from core.enums import MongoCollections
+from models.columns import TIMESTAMP_TYPE, dated_table, document_columns, uuid_array
+from models.responses import RatingResponse
+
+
+def votes_table(source: MongoCollections, docs: List[Dict], film_key: str) -> pa.Table:
+    """Flatten the votes of documents into a table with a row per vote, partitioned by the vote date.
+
+    Undated votes are dated by the update time of their document.
+
+    Args:
+        source: Collection of the documents
+        docs: Documents with votes
+        film_key: Key of the film ID in the documents
+
+    Returns:
+        pa.Table: Votes with the IDs and versions of their documents
+    """
+    pairs = [(doc, vote) for doc in docs for vote in doc.get('rating', {}).get('votes', [])]
+    dates = pa.array([vote.get('date') or doc.get('updated') for doc, vote in pairs], TIMESTAMP_TYPE)
+    return dated_table({
+        'source': pa.repeat(source.name, len(pairs)),
+        'source_id': uuid_array([doc['_id'] for doc, _ in pairs]),
+        'film_id': uuid_array([doc[film_key] for doc, _ in pairs]),
+        'user_id': uuid_array([vote['user_id'] for _, vote in pairs]),
+        'score': pa.array([vote['score'] for _, vote in pairs], pa.int8()),
+        'voted': dates,
+        'version': pa.array([doc.get('version', 0) for doc, _ in pairs], pa.int64()),
+    }, dates)
+
+
+def users_tables(docs: List[Dict]) -> Dict[str, pa.Table]:
+    """Flatten user documents into the tables of users and of their bookmarks.
+
+    Args:
+        docs: User documents
+
+    Returns:
+        Dict: Tables by name
+    """
+    columns = document_columns(docs, 'user_id')
+    pairs = [(doc, bookmark) for doc in docs for bookmark in doc.get('bookmarks', [])]
+    dates = pa.array([doc.get('updated') for doc, _ in pairs], TIMESTAMP_TYPE)
+    return {
+        'users': dated_table(columns, columns['updated']),
+        'bookmarks': dated_table({
+            'user_id': uuid_array([doc['_id'] for doc, _ in pairs]),
+            'film_id': uuid_array([bookmark['film_id'] for _, bookmark in pairs]),
+            'version': pa.array([doc.get('version', 0) for doc, _ in pairs], pa.int64()),
+        }, dates),
+    }
+
+
+def films_tables(docs: List[Dict]) -> Dict[str, pa.Table]:
+    """Flatten film documents into the tables of film ratings, including the archived votes, and of votes.
+
+    Args:
+        docs: Film documents
+
+    Returns:
+        Dict: Tables by name
+    """
+    columns = document_columns(docs, 'film_id')
+    ratings = [RatingResponse.prepare(doc.get('rating', {})) for doc in docs]
+    return {
+        'films': dated_table({
+            **columns,
+            'likes': pa.array([rating.get('likes', 0) for rating in ratings], pa.int64()),
+            'dislikes': pa.array([rating.get('dislikes', 0) for rating in ratings], pa.int64()),
+            'average_rating': pa.array([rating.get('average_rating') for rating in ratings], pa.int64()),
+        }, columns['updated']),
+        'votes': votes_table(MongoCollections.films, docs, '_id'),
+    }
+
+
+def reviews_tables(docs: List[Dict]) -> Dict[str, pa.Table]:
+    """Flatten review documents into the tables of reviews, partitioned by the publication date, and of votes.
+
+    Args:
+        docs: Review documents
+
+    Returns:
+        Dict: Tables by name
+    """
+    dates = pa.array([doc['pub_date'] for doc in docs], TIMESTAMP_TYPE)
+    return {
+        'reviews': dated_table({
+            **document_columns(docs, 'review_id'),
+            'film_id': uuid_array([doc['film_id'] for doc in docs]),
+            'author': uuid_array([doc['author'] for doc in docs]),
+            'text': pa.array([doc['text'] for doc in docs], pa.string()),
+            'pub_date': dates,
+        }, dates),
+        'votes': votes_table(MongoCollections.reviews, docs, 'film_id'),
+    }
+
+
+def archive_tables(docs: List[Dict]) -> Dict[str, pa.Table]:
+    """Flatten archive buckets into the tables of buckets and of votes.
+
+    Args:
+        docs: Bucket documents
+
+    Returns:
+        Dict: Tables by name
+    """
+    columns = document_columns(docs, 'bucket_id')
+    return {
+        'buckets': dated_table({
+            **columns,
+            'film_id': uuid_array([doc['film_id'] for doc in docs]),
+        }, columns['updated']),
+        'votes': votes_table(MongoCollections.archive, docs, 'film_id'),
+    }
+
+
+TABLES: Mapping[MongoCollections, Callable] = MappingProxyType({
+    MongoCollections.users: users_tables,
+    MongoCollections.films: films_tables,
+    MongoCollections.reviews: reviews_tables,
+    MongoCollections.archive: archive_tables,
+})
@@ -0,0 +1,237 @@
+from typing import Dict, List, Sequence
+from uuid import UUID
+
+from models.base import MongoQuery, VotesChoices
+
+
+class ListAuthors(MongoQuery):
+    """Model for retrieving the authors of the reviews of a film."""
+
+    __slots__ = ('film_id',)
+
+    def __init__(self, film_id: UUID):
+        """Initialize the query with the film ID.
+
+        Args:
+            film_id: Film ID
+        """
+        self.film_id = film_id
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for retrieving the review authors with the index on film IDs.
+
+        Returns:
+            Dict: Request to aggregate the authors of the reviews.
+        """
+        return self.find_operations([
+            {'$match': {'film_id': self.film_id}},
+            {'$project': {'_id': False, 'author': True}},
+        ])
+
+
+class ArchiveVotes(MongoQuery):
+    """Model for removing the archived votes of a film, counting them and committing their buckets."""
+
+    __slots__ = ('film_id', 'votes', 'version', 'buckets')
+
+    def __init__(self, film_id: UUID, votes: List[Dict], version: int, buckets: List[Dict]):
+        """Initialize the query with the remaining votes and the buckets of the archived ones.
+
+        Args:
+            film_id: Film ID
+            votes: Votes of the film that are not archived
+            version: Expected version of the film
+            buckets: Created buckets with the archived votes
+        """
+        self.film_id = film_id
+        self.votes = votes
+        self.version = version
+        self.buckets = buckets
+
+    @property
+    def bucket_ids(self) -> List[UUID]:
+        """IDs of the buckets.
+
+        Returns:
+            List: Bucket IDs
+        """
+        return [bucket['_id'] for bucket in self.buckets]
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Numbers of the archived likes and dislikes.
+
+        Returns:
+            Dict: Increments of the counters of the film rating
+        """
+        scores = [vote['score'] for bucket in self.buckets for vote in bucket['rating']['votes']]
+        return {
+            'rating.likes': scores.count(VotesChoices.like.value),
+            'rating.dislikes': scores.count(VotesChoices.dislike.value),
+        }
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for replacing the votes if the film has the expected version.
+
+        Returns:
+            Dict: Request to update the document with the movie.
+        """
+        mapping: Dict = {}
+        mapping['$set'] = {'rating.votes': self.votes}
+        mapping['$push'] = {'rating.buckets': {'$each': self.bucket_ids}}
+        params = self.update_operations(self.film_id, mapping)
+        params['filter']['version'] = self.version
+        params['update']['$inc'].update(self.counters)
+        return params
+
+
+class CreateBucket(MongoQuery):
+    """Model for creating an archive bucket with old votes of a film."""
+
+    __slots__ = ('bucket_id', 'film_id', 'votes')
+
+    def __init__(self, bucket_id: UUID, film_id: UUID, votes: List[Dict]):
+        """Initialize the query with the archived votes.
+
+        Args:
+            bucket_id: Bucket ID
+            film_id: Film ID
+            votes: Archived votes, no more than the bucket size
+        """
+        self.bucket_id = bucket_id
+        self.film_id = film_id
+        self.votes = votes
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for inserting a bucket.
+
+        Returns:
+            Dict: Request to insert a document with the bucket.
+        """
+        bucket = {'_id': self.bucket_id, 'film_id': self.film_id, 'rating': {'votes': self.votes}}
+        return self.insert_operations(bucket)
+
+
+class DestroyBucket(MongoQuery):
+    """Model for deleting an archive bucket whose votes have not been removed from the film."""
+
+    __slots__ = ('bucket_id',)
+
+    def __init__(self, bucket_id: UUID):
+        """Initialize the query with the bucket ID.
+
+        Args:
+            bucket_id: Bucket ID
+        """
+        self.bucket_id = bucket_id
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for deleting the bucket.
+
+        Returns:
+            Dict: Request to delete the document with the bucket.
+        """
+        return self.delete_operations({'_id': self.bucket_id})
+
+
+class FindArchivedVote(MongoQuery):
+    """Model for retrieving the archive buckets of a film with the vote of a user."""
+
+    __slots__ = ('bucket_ids', 'user_id')
+
+    def __init__(self, bucket_ids: Sequence[UUID], user_id: UUID):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            bucket_ids: IDs of the buckets committed to the film
+            user_id: User ID
+        """
+        self.bucket_ids = tuple(bucket_ids)
+        self.user_id = user_id
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for retrieving the buckets by ID.
+
+        Returns:
+            Dict: Request to aggregate the buckets.
+        """
+        return self.find_operations([
+            {'$match': {'_id': {'$in': self.bucket_ids}, 'rating.votes.user_id': self.user_id}},
+        ])
+
+
+class UnarchiveVote(MongoQuery):
+    """Model for removing the vote of a user from an archive bucket."""
+
+    __slots__ = ('bucket_id', 'user_id')
+
+    def __init__(self, bucket_id: UUID, user_id: UUID):
+        """Initialize the query with the bucket and the user.
+
+        Args:
+            bucket_id: Bucket ID
+            user_id: User ID
+        """
+        self.bucket_id = bucket_id
+        self.user_id = user_id
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for removing the vote if the bucket still holds it.
+
+        The filter on the vote makes the removal succeed only once, even if
+        other votes of the bucket are removed concurrently, and the bucket is
+        returned as it was before the update, with the removed vote.
+
+        Returns:
+            Dict: Request to update the document with the bucket.
+        """
+        mapping = {}
+        mapping['$pull'] = {'rating.votes': {'user_id': {'$eq': self.user_id}}}
+        params = self.update_operations(self.bucket_id, mapping)
+        params['filter']['rating.votes.user_id'] = self.user_id
+        params['return_document'] = False
+        return params
+
+
+class CountArchivedVotes(MongoQuery):
+    """Model for changing the numbers of archived likes and dislikes of a film."""
+
+    __slots__ = ('film_id', 'likes', 'dislikes')
+
+    def __init__(self, film_id: UUID, likes: int, dislikes: int):
+        """Initialize the query with the changes of the numbers.
+
+        Args:
+            film_id: Film ID
+            likes: Change of the number of archived likes
+            dislikes: Change of the number of archived dislikes
+        """
+        self.film_id = film_id
+        self.likes = likes
+        self.dislikes = dislikes
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Changes of the numbers of the archived likes and dislikes.
+
+        Returns:
+            Dict: Increments of the counters of the film rating
+        """
+        return {'rating.likes': self.likes, 'rating.dislikes': self.dislikes}
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for changing the numbers.
+
+        Returns:
+            Dict: Request to update the document with the movie.
+        """
+        params = self.update_operations(self.film_id, {})
+        params['update']['$inc'].update(self.counters)
+        return params
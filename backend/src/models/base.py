@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from enum import Enum, IntEnum
-from typing import Callable, Dict, List, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 from uuid import UUID, uuid4
 
 import orjson
@@ -47,17 +48,64 @@ class OrjsonMixin(BaseModel):
         json_dumps = orjson_dumps
 
 
-class MongoQuery(ABC, OrjsonMixin):
-    """Abstract model for a query written in the MongoDB query language."""
+class PipelineTemplate:
+    """Aggregation pipeline template for queries of the same shape.
+
+    Constant stages are built once and shared between queries, while variable
+    stages are built from the query parameters each time the template is rendered.
+    """
+
+    __slots__ = ('stages',)
+
+    def __init__(self, *stages: Union[Dict, Callable[..., Dict]]):
+        """Initialize the template with pipeline stages.
+
+        Args:
+            stages: Constant stages or functions building stages from the query parameters
+        """
+        self.stages = stages
+
+    def render(self, **params: Any) -> List[Dict]:
+        """Build the pipeline, substituting the query parameters into the variable stages.
+
+        Args:
+            params: Query parameters
+
+        Returns:
+            List: Pipeline stages
+        """
+        return [stage(**params) if callable(stage) else stage for stage in self.stages]
+
+
+class MongoQuery(ABC):
+    """Abstract model for a query written in the MongoDB query language.
+
+    Query models are lightweight builders: their parameters are validated at
+    the API boundary, so the models only keep them and render the query.
+    """
+
+    __slots__ = ()
 
     @property
     @abstractmethod
     def params(self) -> Dict:
         """The main method of the model, representing the parameters of a MongoDB query."""
 
+    @property
+    def key(self) -> Tuple:
+        """Normalized query, equal for the queries of the same model with the same parameters.
+
+        Returns:
+            Tuple: Query model and parameter values
+        """
+        slots: Tuple[str, ...] = self.__slots__
+        return (type(self), *(getattr(self, slot) for slot in slots))
+
     def insert_operations(self, new_doc: Dict) -> Dict:
         """Representation of query parameters for inserting a new document.
 
+        The document gets the first version and its update time in UTC.
+
         Args:
             new_doc: New document.
 
@@ -65,10 +113,7 @@ class MongoQuery(ABC, OrjsonMixin):
             Dict: Parameters for the insert operation.
         """
         return {
-            'filter': {'_id': uuid4()},
-            'replacement': new_doc,
-            'upsert': True,
-            'return_document': True,
+            'document': {'_id': uuid4(), **new_doc, 'version': 1, 'updated': datetime.utcnow()},
         }
 
     def find_operations(self, pipeline: List[Dict]) -> Dict:
@@ -87,14 +132,21 @@ class MongoQuery(ABC, OrjsonMixin):
     def update_operations(self, doc_id: UUID, mapping: Union[Dict, List], upsert: bool = False) -> Dict:
         """Representation of query parameters for updating a document.
 
+        The document version is incremented and its update time is set along with the changes.
+
         Args:
             doc_id: Document ID.
-            mapping: Document changes.
+            mapping: Document changes or an update pipeline.
             upsert: Perform document insertion if the document does not exist.
 
         Returns:
             Dict: Parameters for the update operation.
         """
+        if isinstance(mapping, list):
+            version = {'$add': [{'$ifNull': ['$version', 0]}, 1]}
+            mapping = [*mapping, {'$set': {'version': version, 'updated': '$$NOW'}}]
+        else:
+            mapping = {**mapping, '$inc': {'version': 1}, '$currentDate': {'updated': True}}
         return {
             'filter': {'_id': doc_id},
             'update': mapping,
@@ -118,3 +170,15 @@ class MongoQuery(ABC, OrjsonMixin):
 
 class APIResponse(ABC, OrjsonMixin):
     """Abstract model for an API response, representing data over HTTP."""
+
+    @classmethod
+    def prepare(cls, doc: Dict) -> Dict:
+        """Prepare a raw document for encoding without validation, doing the work of the root validators.
+
+        Args:
+            doc: Raw document
+
+        Returns:
+            Dict: Document with the model fields
+        """
+        return doc
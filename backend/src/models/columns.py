@@ -0,0 +1,53 @@
+from typing import Dict, List
+from uuid import UUID
+
+import pyarrow as pa
+from pyarrow import compute
+
+UUID_SIZE = 16
+UUID_TYPE = pa.binary(UUID_SIZE)
+TIMESTAMP_TYPE = pa.timestamp('ms')
+
+
+def uuid_array(ids: List[UUID]) -> pa.Array:
+    """Column of UUIDs as fixed-size binaries, converted from their raw bytes at once rather than as UUID objects.
+
+    The column owns its memory, since the dataset writer may release it from its own threads.
+
+    Args:
+        ids: UUIDs
+
+    Returns:
+        pa.Array: Column of 16-byte binaries
+    """
+    return pa.array([doc_id.bytes for doc_id in ids], UUID_TYPE)
+
+
+def dated_table(columns: Dict[str, pa.Array], dates: pa.Array) -> pa.Table:
+    """Table with the partition column of the dates of a timestamp column.
+
+    Args:
+        columns: Table columns
+        dates: Timestamps by which the rows are partitioned
+
+    Returns:
+        pa.Table: Table with the date column
+    """
+    return pa.table({**columns, 'date': compute.cast(dates, pa.date32())})
+
+
+def document_columns(docs: List[Dict], key: str) -> Dict[str, pa.Array]:
+    """Columns of the IDs, versions and update times of documents.
+
+    Args:
+        docs: Documents
+        key: Name of the ID column
+
+    Returns:
+        Dict: Table columns
+    """
+    return {
+        key: uuid_array([doc['_id'] for doc in docs]),
+        'version': pa.array([doc.get('version', 0) for doc in docs], pa.int64()),
+        'updated': pa.array([doc.get('updated') for doc in docs], TIMESTAMP_TYPE),
+    }
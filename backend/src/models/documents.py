@@ -0,0 +1,126 @@
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from models.base import VotesChoices
+
+
+def score_review(review: Dict, film_scores: Dict[UUID, int]) -> Dict:
+    """Add the author's film score and the review rating, as the reviews aggregation does.
+
+    Args:
+        review: Review document
+        film_scores: Film scores by user ID
+
+    Returns:
+        Dict: Review with its rating
+    """
+    scores = [vote['score'] for vote in review['rating']['votes']]
+    scored = {**review}
+    if (film_score := film_scores.get(review['author'])) is not None:
+        scored['film_score'] = film_score
+    scored['likes'] = scores.count(VotesChoices.like.value)
+    scored['dislikes'] = scores.count(VotesChoices.dislike.value)
+    scored['average_rating'] = sum(scores) / len(scores) if scores else None
+    return scored
+
+
+def bayesian_score(votes: int, total: float, mean: float, weight: float) -> float:
+    """Average score of a film pulled towards the prior mean, the less so the more votes it has.
+
+    Args:
+        votes: Number of votes
+        total: Sum of the vote scores
+        mean: Prior mean score
+        weight: Number of votes the prior mean counts as
+
+    Returns:
+        float: Bayesian average score
+    """
+    return (mean * weight + total) / (weight + votes)
+
+
+def film_scores(film: Dict) -> Tuple[int, int]:
+    """Number of votes of a film and their sum, including the votes moved to the archive.
+
+    Args:
+        film: Film document
+
+    Returns:
+        Tuple: Number of votes and the sum of their scores
+    """
+    rating = film.get('rating', {})
+    scores = [vote['score'] for vote in rating.get('votes', [])]
+    likes = rating.get('likes', 0)
+    archived = likes + rating.get('dislikes', 0)
+    return len(scores) + archived, sum(scores) + likes * VotesChoices.like.value
+
+
+def merge_votes(*vote_lists: List[Dict]) -> List[Dict]:
+    """Merge the votes of a film kept in several documents, keeping the latest vote of each user.
+
+    Votes without a date are older than any dated vote, and of equally dated
+    votes the one from the earlier list is kept.
+
+    Args:
+        vote_lists: Votes of the film document and of its shards
+
+    Returns:
+        List: Merged votes
+    """
+    latest: Dict[UUID, Dict] = {}
+    for votes in vote_lists:
+        for vote in votes:
+            kept = latest.get(vote['user_id'])
+            if kept is None or vote.get('date', datetime.min) > kept.get('date', datetime.min):
+                latest[vote['user_id']] = vote
+    return list(latest.values())
+
+
+def merge_shards(film: Dict, shards: List[Dict]) -> Dict:
+    """Film with the votes of its shards, versioned with the sum of the film and shard versions.
+
+    Args:
+        film: Film document
+        shards: Shard documents of the film
+
+    Returns:
+        Dict: Film document with the merged votes
+    """
+    if not shards:
+        return film
+    votes = merge_votes(film.get('rating', {}).get('votes', []), *(
+        shard.get('rating', {}).get('votes', []) for shard in shards
+    ))
+    version = film.get('version', 0) + sum(shard.get('version', 0) for shard in shards)
+    return {**film, 'rating': {**film.get('rating', {}), 'votes': votes}, 'version': version}
+
+
+def field_key(doc: Dict, field: str) -> Tuple:
+    """Sort key of a document field, with empty values lower than any other, as in MongoDB.
+
+    Args:
+        doc: Document
+        field: Field name
+
+    Returns:
+        Tuple: Sort key
+    """
+    field_value = doc.get(field)
+    return (field_value is not None, field_value)
+
+
+def sort_documents(docs: List[Dict], ordering: Dict) -> List[Dict]:
+    """Sort documents in place as the $sort stage does.
+
+    Args:
+        docs: Documents
+        ordering: Sort directions by field
+
+    Returns:
+        List: Sorted documents
+    """
+    for field, direction in reversed(ordering.items()):
+        docs.sort(key=partial(field_key, field=field), reverse=direction < 0)
+    return docs
@@ -0,0 +1,90 @@
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, get_args, get_origin
+
+from models.base import VotesChoices
+
+CONVERTERS: Mapping[type, Callable] = MappingProxyType({
+    int: int,
+    VotesChoices: lambda score: VotesChoices(score).name,
+})
+
+
+class FieldEncoding(NamedTuple):
+    """Encoding of a response model field."""
+
+    alias: str
+    key: str
+    default: Any
+    converter: Optional[Callable]
+
+
+def convert(field_value: Any, converter: Optional[Callable]) -> Any:
+    """Convert a non-empty raw value as the model field validation does.
+
+    Args:
+        field_value: Raw value
+        converter: Conversion function of the field type
+
+    Returns:
+        Any: JSON value
+    """
+    if field_value is None or converter is None:
+        return field_value
+    return converter(field_value)
+
+
+class ResponseEncoder:
+    """Precompiled encoder of raw documents into the JSON content of a response model.
+
+    Produces the same content as validating the documents with the response
+    model and serializing it, without building model instances. UUID and
+    datetime values are left as is for the ORJSON response to serialize.
+    """
+
+    def __init__(self, response_model: Any, by_alias: bool = True, exclude_none: bool = False):
+        """Compile the field converters of the response model.
+
+        Args:
+            response_model: Response model or a list of response models
+            by_alias: Use field aliases as keys of the content
+            exclude_none: Leave out fields with empty values
+        """
+        self.many = get_origin(response_model) is list
+        self.model = get_args(response_model)[0] if self.many else response_model
+        self.exclude_none = exclude_none
+        self.fields = [
+            FieldEncoding(field.alias, field.alias if by_alias else name, field.default, CONVERTERS.get(field.type_))
+            for name, field in self.model.__fields__.items()
+            if not field.field_info.exclude
+        ]
+
+    def encode(self, result: Any) -> Any:
+        """Encode a raw document or a list of raw documents.
+
+        Args:
+            result: Endpoint result
+
+        Returns:
+            Any: JSON content
+        """
+        if self.many:
+            return [self.encode_doc(doc) for doc in result]
+        return self.encode_doc(result)
+
+    def encode_doc(self, doc: Dict) -> Dict:
+        """Encode a raw document.
+
+        Args:
+            doc: Raw document
+
+        Returns:
+            Dict: JSON content
+        """
+        doc = self.model.prepare(doc)
+        result = {
+            field.key: convert(doc.get(field.alias, field.default), field.converter)
+            for field in self.fields
+        }
+        if self.exclude_none:
+            return {key: field_value for key, field_value in result.items() if field_value is not None}
+        return result
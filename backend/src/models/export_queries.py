@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from models.base import MongoQuery, PipelineTemplate
+
+
+class ExportFilms(MongoQuery):
+    """Model for streaming the ratings of all films, or of the shards of their votes, in the order of their IDs."""
+
+    __slots__ = ('batch',)
+
+    template = PipelineTemplate(
+        {'$sort': {'_id': 1}},
+        {'$project': {'film_id': True, 'rating': True, 'version': True}},
+    )
+
+    def __init__(self, batch: int):
+        """Initialize the query with the batch size.
+
+        Args:
+            batch: Number of films read from the cursor at once
+        """
+        self.batch = batch
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for streaming the film ratings.
+
+        Returns:
+            Dict: Request to aggregate documents with films read in batches.
+        """
+        return {**self.find_operations(self.template.render()), 'batchSize': self.batch}
+
+
+class ExportChanges(MongoQuery):
+    """Model for streaming all documents of a collection changed since a time, by the index on their update time."""
+
+    __slots__ = ('since', 'batch')
+
+    template = PipelineTemplate(
+        lambda since, **params: {'$match': {} if since is None else {'updated': {'$gte': since}}},
+    )
+
+    def __init__(self, since: Optional[datetime], batch: int):
+        """Initialize the query with the time of the previous export and the batch size.
+
+        Args:
+            since: Documents updated before the time in UTC are skipped, all documents are read if None
+            batch: Number of documents read from the cursor at once
+        """
+        self.since = since
+        self.batch = batch
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for streaming the changed documents.
+
+        Returns:
+            Dict: Request to aggregate documents read in batches.
+        """
+        return {**self.find_operations(self.template.render(since=self.since)), 'batchSize': self.batch}
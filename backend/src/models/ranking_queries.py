@@ -0,0 +1,190 @@
+from datetime import datetime
+from typing import Dict
+from uuid import UUID
+
+from models.base import MongoQuery, PipelineTemplate
+from models.documents import bayesian_score, film_scores
+
+MILLISECONDS_PER_SECOND = 1000
+DECAY = 0.5
+
+
+class CountActivity(MongoQuery):
+    """Model for adding the events of a film counted by a worker to a time bucket."""
+
+    __slots__ = ('film_id', 'bucket', 'count')
+
+    def __init__(self, film_id: UUID, bucket: datetime, count: int):
+        """Initialize the query with the counted events.
+
+        Args:
+            film_id: Film ID
+            bucket: Start of the time bucket
+            count: Number of rating and bookmark events
+        """
+        self.film_id = film_id
+        self.bucket = bucket
+        self.count = count
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for adding the events to the counter of the film in the time bucket.
+
+        Returns:
+            Dict: Request to increment the counter, creating it if it does not exist.
+        """
+        return {
+            'filter': {'bucket': self.bucket, 'film_id': self.film_id},
+            'update': {'$inc': {'count': self.count}},
+            'upsert': True,
+        }
+
+
+class ListTrending(MongoQuery):
+    """Model for ranking films by their recent activity, decayed with its age."""
+
+    __slots__ = ('now', 'since', 'halflife', 'offset', 'limit')
+
+    template = PipelineTemplate(
+        lambda since, **params: {'$match': {'bucket': {'$gte': since}}},
+        lambda now, halflife, **params: {'$group': {
+            '_id': '$film_id',
+            'score': {'$sum': {'$multiply': ['$count', {'$pow': [
+                DECAY,
+                {'$divide': [{'$subtract': [now, '$bucket']}, halflife * MILLISECONDS_PER_SECOND]},
+            ]}]}},
+        }},
+        {'$sort': {'score': -1, '_id': 1}},
+        lambda offset, **params: {'$skip': offset},
+        lambda limit, **params: {'$limit': limit},
+    )
+
+    def __init__(self, now: datetime, since: datetime, halflife: float, offset: int, limit: int):
+        """Initialize the query with the window and the decay of the activity.
+
+        Args:
+            now: Start of the current time bucket, where the counts are not decayed
+            since: Start of the oldest time bucket in the window
+            halflife: Age in seconds at which the counts are halved
+            offset: Number of films to skip
+            limit: Number of films on the page
+        """
+        self.now = now
+        self.since = since
+        self.halflife = halflife
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for ranking films by the counters in the window.
+
+        Each counter is halved for every half-life of its age and summed by
+        film, so the ranking reads only the counters of the window, one per
+        film and time bucket.
+
+        Returns:
+            Dict: Request to aggregate the film IDs with their trending scores.
+        """
+        pipeline = self.template.render(
+            now=self.now, since=self.since, halflife=self.halflife, offset=self.offset, limit=self.limit,
+        )
+        return self.find_operations(pipeline)
+
+
+class ReplaceLeaderboardEntry(MongoQuery):
+    """Model for replacing the leaderboard entry of a film with the scores of a film version."""
+
+    __slots__ = ('film_id', 'film_version', 'votes', 'total', 'score')
+
+    def __init__(self, film_id: UUID, film_version: int, votes: int, total: float, score: float):
+        """Initialize the query with the new entry.
+
+        Args:
+            film_id: Film ID
+            film_version: Version of the film the entry is computed from
+            votes: Number of votes
+            total: Sum of the vote scores
+            score: Bayesian average score
+        """
+        self.film_id = film_id
+        self.film_version = film_version
+        self.votes = votes
+        self.total = total
+        self.score = score
+
+    @classmethod
+    def from_film(cls, film: Dict, mean: float, weight: float) -> 'ReplaceLeaderboardEntry':
+        """Compute the leaderboard entry of a film from its votes and archived counters.
+
+        Args:
+            film: Film document
+            mean: Prior mean score
+            weight: Number of votes the prior mean counts as
+
+        Returns:
+            ReplaceLeaderboardEntry: Query model
+        """
+        votes, total = film_scores(film)
+        return cls(
+            film_id=film['_id'],
+            film_version=film.get('version', 0),
+            votes=votes,
+            total=total,
+            score=bayesian_score(votes, total, mean, weight),
+        )
+
+    @property
+    def entry(self) -> Dict:
+        """Fields of the leaderboard entry.
+
+        Returns:
+            Dict: Entry fields
+        """
+        return {'film_version': self.film_version, 'votes': self.votes, 'total': self.total, 'score': self.score}
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for replacing the entry unless it was computed from a newer film version.
+
+        Returns:
+            Dict: Request to update the document with the leaderboard entry.
+        """
+        current = {'$lte': [{'$ifNull': ['$film_version', 0]}, self.film_version]}
+        pipeline = [{'$set': {
+            field: {'$cond': [current, field_value, '${0}'.format(field)]}
+            for field, field_value in self.entry.items()
+        }}]
+        return self.update_operations(self.film_id, pipeline, upsert=True)
+
+
+class ListLeaderboard(MongoQuery):
+    """Model for retrieving a page of the rated films in the order of their Bayesian average scores."""
+
+    __slots__ = ('offset', 'limit')
+
+    template = PipelineTemplate(
+        {'$match': {'votes': {'$gt': 0}}},
+        {'$sort': {'score': -1, '_id': 1}},
+        lambda offset, **params: {'$skip': offset},
+        lambda limit, **params: {'$limit': limit},
+    )
+
+    def __init__(self, offset: int, limit: int):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            offset: Number of films to skip
+            limit: Number of films on the page
+        """
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for retrieving the leaderboard with the index on the scores.
+
+        Returns:
+            Dict: Request to aggregate documents with leaderboard entries.
+        """
+        return self.find_operations(self.template.render(offset=self.offset, limit=self.limit))
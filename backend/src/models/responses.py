@@ -20,6 +20,27 @@ class Vote(OrjsonMixin):
     score: VotesChoices
 
 
+def count_scores(scores: List[int], likes: int = 0, dislikes: int = 0) -> Dict:
+    """Count the number of likes, dislikes, and the average user rating.
+
+    Args:
+        scores: User scores
+        likes: Initial number of likes, such as the archived ones
+        dislikes: Initial number of dislikes, such as the archived ones
+
+    Returns:
+        Dict: Calculated rating
+    """
+    total = sum(scores) + likes * VotesChoices.like.value + dislikes * VotesChoices.dislike.value
+    for score in scores:
+        if score == VotesChoices.like.value:
+            likes += 1
+        elif score == VotesChoices.dislike.value:
+            dislikes += 1
+    average_rating = total // (likes + dislikes) if likes + dislikes else None
+    return {'likes': likes, 'dislikes': dislikes, 'average_rating': average_rating}
+
+
 class RatingResponse(APIResponse):
     """Response model for representing a rating."""
 
@@ -38,17 +59,26 @@ class RatingResponse(APIResponse):
         Returns:
             Dict: Calculated rating
         """
-        if votes := data.get('votes'):
-            total_scores = 0
-            for vote in votes:
-                if vote.score == VotesChoices.like.value:
-                    data['likes'] += 1
-                elif vote.score == VotesChoices.dislike.value:
-                    data['dislikes'] += 1
-                total_scores += vote.score
-            data['average_rating'] = total_scores // (data['likes'] + data['dislikes'])
+        if data.get('votes') or data.get('likes') or data.get('dislikes'):
+            scores = [vote.score for vote in data.get('votes') or []]
+            data.update(count_scores(scores, data.get('likes', 0), data.get('dislikes', 0)))
         return data
 
+    @classmethod
+    def prepare(cls, doc: Dict) -> Dict:
+        """Count the rating of raw votes for encoding without validation.
+
+        Args:
+            doc: Raw rating document
+
+        Returns:
+            Dict: Calculated rating
+        """
+        if doc.get('votes') or doc.get('likes') or doc.get('dislikes'):
+            scores = [vote['score'] for vote in doc.get('votes') or []]
+            return count_scores(scores, doc.get('likes', 0), doc.get('dislikes', 0))
+        return doc
+
 
 class ReviewResponse(APIResponse):
     """Response model for representing a film review."""
@@ -74,3 +104,19 @@ class ReviewResponse(APIResponse):
             str: Like or dislike
         """
         return film_score.name
+
+
+class TrendingFilmResponse(APIResponse):
+    """Response model for representing a trending film with the score of its recent activity."""
+
+    film_id: UUID = Field(alias='_id')
+    score: float
+
+
+class LeaderboardResponse(APIResponse):
+    """Response model for representing a film on the leaderboard of top-rated films."""
+
+    rank: int
+    film_id: UUID = Field(alias='_id')
+    score: float
+    votes: int
@@ -0,0 +1,282 @@
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+from uuid import UUID
+
+from models.base import MongoQuery, PipelineTemplate, SortChoices, VotesChoices
+from models.queries import truncate_to_milliseconds
+
+
+def rating_stages(film_match: Callable[..., Dict]) -> List:
+    """Aggregation stages adding the film score of the author and the rating to reviews.
+
+    Args:
+        film_match: Function building the filter of the reviewed film from the query parameters,
+            which can refer to the film ID of the review as `$$film_id`
+
+    Returns:
+        List: Pipeline stages
+    """
+    film_votes = [
+        {'$unwind': '$rating.votes'},
+        {'$match': {'$expr': {'$eq': ['$rating.votes.user_id', '$$author']}}},
+    ]
+    return [
+        lambda **params: {'$lookup': {
+            'from': 'films',
+            'let': {'author': '$author', 'film_id': '$film_id'},
+            'pipeline': [{'$match': film_match(**params)}, *film_votes],
+            'as': 'films',
+        }},
+        {'$addFields': {
+            'film_score': {
+                '$first': '$films.rating.votes.score',
+            },
+            'likes': {'$size': {'$filter': {
+                'input': '$rating.votes',
+                'cond': {'$eq': ['$$this.score', VotesChoices.like.value]},
+            }}},
+            'dislikes': {'$size': {'$filter': {
+                'input': '$rating.votes',
+                'cond': {'$eq': ['$$this.score', VotesChoices.dislike.value]},
+            }}},
+            'average_rating': {
+                '$avg': '$rating.votes.score',
+            },
+        }},
+    ]
+
+
+class CreateReview(MongoQuery):
+    """Model for creating a review by a user for a movie."""
+
+    __slots__ = ('author', 'film_id', 'text', 'pub_date')
+
+    def __init__(self, author: UUID, film_id: UUID, text: str, pub_date: Optional[datetime] = None):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            author: Author ID
+            film_id: Film ID
+            text: Review text
+            pub_date: Publication date in UTC, the current time by default, truncated to the milliseconds of BSON
+        """
+        pub_date = pub_date or datetime.utcnow()
+        self.author = author
+        self.film_id = film_id
+        self.text = text
+        self.pub_date = truncate_to_milliseconds(pub_date)
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for inserting a movie review.
+
+        Returns:
+            Dict: Request to insert a document with the review.
+        """
+        new_doc = {'author': self.author, 'film_id': self.film_id, 'text': self.text, 'pub_date': self.pub_date}
+        new_doc['rating'] = {'votes': []}
+        return self.insert_operations(new_doc)
+
+
+class DestroyReview(MongoQuery):
+    """Model for deleting a user's movie review."""
+
+    __slots__ = ('id', 'author')
+
+    def __init__(self, id: UUID, author: UUID):  # noqa: WPS125
+        """Initialize the query with validated request parameters.
+
+        Args:
+            id: Review ID
+            author: Author ID
+        """
+        self.id = id
+        self.author = author
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for deleting a movie review.
+
+        Returns:
+            Dict: Request to delete the document with the review.
+        """
+        filtering = {'_id': self.id, 'author': self.author}
+        return self.delete_operations(filtering)
+
+
+class ListReview(MongoQuery):
+    """Model for retrieving a list of movie reviews with flexible sorting options."""
+
+    __slots__ = ('film_id', 'sort', 'offset', 'limit')
+
+    orderings: Mapping[SortChoices, Dict] = MappingProxyType({
+        SortChoices.top: {'average_rating': -1, 'pub_date': 1, '_id': 1},
+        SortChoices.new: {'pub_date': -1},
+        SortChoices.old: {'pub_date': 1},
+    })
+
+    def __init__(self, film_id: UUID, sort: SortChoices, offset: int, limit: int):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            film_id: Film ID
+            sort: Sorting parameter
+            offset: Number of reviews to skip
+            limit: Number of reviews on the page
+        """
+        self.film_id = film_id
+        self.sort = sort
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def ordering(self) -> Dict:
+        """Sorting parameter prepared for the request.
+
+        Returns:
+            Dict: Request data with sorting.
+        """
+        return self.orderings[self.sort]
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for retrieving movie reviews.
+
+        Returns:
+            Dict: Request to find documents with reviews.
+        """
+        pipeline = self.template(self.sort).render(film_id=self.film_id, offset=self.offset, limit=self.limit)
+        return self.find_operations(pipeline)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def template(cls, sort: SortChoices) -> PipelineTemplate:
+        """Pipeline template for the sorting option, built once and cached.
+
+        Args:
+            sort: Sorting parameter
+
+        Returns:
+            PipelineTemplate: Template substituting the film ID, offset and limit.
+        """
+        return PipelineTemplate(
+            lambda film_id, **params: {'$match': {'film_id': film_id}},
+            *rating_stages(lambda film_id, **params: {'_id': film_id}),
+            {'$sort': cls.orderings[sort]},
+            lambda offset, **params: {'$skip': offset},
+            lambda limit, **params: {'$limit': limit},
+        )
+
+
+class ExportReviews(MongoQuery):
+    """Model for streaming all reviews of a film with their ratings in the order of their IDs."""
+
+    __slots__ = ('film_id', 'batch')
+
+    template = PipelineTemplate(
+        lambda film_id, **params: {'$match': {'film_id': film_id}},
+        {'$sort': {'_id': 1}},
+        *rating_stages(lambda film_id, **params: {'_id': film_id}),
+    )
+
+    def __init__(self, film_id: UUID, batch: int):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            film_id: Film ID
+            batch: Number of reviews read from the cursor at once
+        """
+        self.film_id = film_id
+        self.batch = batch
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for streaming movie reviews.
+
+        The reviews are sorted by the index on the film ID and the review ID
+        before the ratings are added, so the cursor does not block on a sort.
+
+        Returns:
+            Dict: Request to aggregate documents with reviews read in batches.
+        """
+        return {**self.find_operations(self.template.render(film_id=self.film_id)), 'batchSize': self.batch}
+
+
+class SearchReviews(MongoQuery):
+    """Model for full-text search of reviews, optionally of a single film, in the order of relevance."""
+
+    __slots__ = ('text', 'film_id', 'offset', 'limit')
+
+    template = PipelineTemplate(
+        lambda text, film_id, **params: {'$match': {
+            '$text': {'$search': text},
+            **({} if film_id is None else {'film_id': film_id}),
+        }},
+        {'$sort': {'score': {'$meta': 'textScore'}, '_id': 1}},
+        lambda offset, **params: {'$skip': offset},
+        lambda limit, **params: {'$limit': limit},
+        *rating_stages(lambda **params: {'$expr': {'$eq': ['$_id', '$$film_id']}}),
+    )
+
+    def __init__(self, text: str, film_id: Optional[UUID], offset: int, limit: int):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            text: Searched words and phrases
+            film_id: Film ID, or None to search the reviews of all films
+            offset: Number of reviews to skip
+            limit: Number of reviews on the page
+        """
+        self.text = text
+        self.film_id = film_id
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for searching movie reviews with the text index.
+
+        The page is cut before the ratings are added, so they are only looked
+        up for the reviews on the page.
+
+        Returns:
+            Dict: Request to aggregate documents with reviews.
+        """
+        pipeline = self.template.render(text=self.text, film_id=self.film_id, offset=self.offset, limit=self.limit)
+        return self.find_operations(pipeline)
+
+
+class ReplaceTopReviews(MongoQuery):
+    """Model for replacing the materialized list of the top reviews of a film."""
+
+    __slots__ = ('film_id', 'reviews', 'complete', 'version')
+
+    def __init__(self, film_id: UUID, reviews: List[Dict], complete: bool, version: Optional[int] = None):
+        """Initialize the query with the new list.
+
+        Args:
+            film_id: Film ID
+            reviews: Top reviews with their IDs, publication dates and average ratings
+            complete: The list contains all the reviews of the film
+            version: Expected version of the list, or None to replace any version
+        """
+        self.film_id = film_id
+        self.reviews = reviews
+        self.complete = complete
+        self.version = version
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for replacing the list if it has the expected version.
+
+        Returns:
+            Dict: Request to update the document with the top reviews.
+        """
+        mapping = {}
+        mapping['$set'] = {'reviews': self.reviews, 'complete': self.complete}
+        params = self.update_operations(self.film_id, mapping, upsert=True)
+        if self.version is not None:
+            params['filter']['version'] = self.version
+        return params
@@ -0,0 +1,189 @@
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from models.base import MongoQuery, PipelineTemplate
+
+
+class ListVotes(MongoQuery):
+    """Model for retrieving the votes of a user on films or reviews in the order of their IDs."""
+
+    __slots__ = ('user_id', 'source_ids', 'offset', 'limit', 'archived')
+
+    template = PipelineTemplate(
+        lambda user_id, source_ids, **params: {'$match': {
+            'rating.votes.user_id': user_id,
+            **({} if source_ids is None else {'_id': {'$in': source_ids}}),
+        }},
+        {'$sort': {'_id': 1}},
+        lambda offset, **params: {'$skip': offset},
+        lambda limit, **params: {'$limit': limit},
+        lambda user_id, **params: {'$project': {
+            'film_id': True,
+            'score': {'$first': {'$filter': {
+                'input': '$rating.votes',
+                'cond': {'$eq': ['$$this.user_id', user_id]},
+            }}},
+        }},
+        {'$set': {'score': '$score.score'}},
+    )
+    archived_template = PipelineTemplate(
+        lambda user_id, source_ids, **params: {'$match': {
+            'rating.votes.user_id': user_id,
+            **({} if source_ids is None else {'_id': {'$in': source_ids}}),
+        }},
+        {'$sort': {'_id': 1}},
+        lambda offset, limit, **params: {'$limit': offset + limit},
+        lambda user_id, **params: {'$project': {
+            'score': {'$first': {'$filter': {
+                'input': '$rating.votes',
+                'cond': {'$eq': ['$$this.user_id', user_id]},
+            }}},
+        }},
+        lambda user_id, source_ids, offset, limit, **params: {'$unionWith': {
+            'coll': 'archive',
+            'pipeline': [
+                {'$match': {
+                    'rating.votes.user_id': user_id,
+                    **({} if source_ids is None else {'film_id': {'$in': source_ids}}),
+                }},
+                {'$sort': {'film_id': 1}},
+                {'$limit': offset + limit},
+                {'$project': {
+                    '_id': '$film_id',
+                    'score': {'$first': {'$filter': {
+                        'input': '$rating.votes',
+                        'cond': {'$eq': ['$$this.user_id', user_id]},
+                    }}},
+                }},
+            ],
+        }},
+        {'$set': {'score': '$score.score'}},
+        {'$sort': {'_id': 1}},
+        lambda offset, **params: {'$skip': offset},
+        lambda limit, **params: {'$limit': limit},
+    )
+
+    def __init__(
+        self,
+        user_id: UUID,
+        source_ids: Optional[Sequence[UUID]],
+        offset: int,
+        limit: int,
+        archived: bool = False,
+    ):
+        """Initialize the query with validated request parameters.
+
+        Args:
+            user_id: User ID
+            source_ids: Film or review IDs to look up, or None to list all the votes
+            offset: Number of votes to skip
+            limit: Number of votes on the page
+            archived: Add the votes of the user on films that have been moved to the archive
+        """
+        self.user_id = user_id
+        self.source_ids = None if source_ids is None else tuple(source_ids)
+        self.offset = offset
+        self.limit = limit
+        self.archived = archived
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for retrieving the votes of a user with the index on voter IDs.
+
+        With the archived votes, the votes in the documents and in the archive
+        are each read in the order of the index up to the end of the page, and
+        only these are merged and sorted.
+
+        Returns:
+            Dict: Request to aggregate the IDs of the rated documents with the scores of the user.
+        """
+        template = self.archived_template if self.archived else self.template
+        pipeline = template.render(
+            user_id=self.user_id, source_ids=self.source_ids, offset=self.offset, limit=self.limit,
+        )
+        return self.find_operations(pipeline)
+
+
+class CreateShard(MongoQuery):
+    """Model for creating an empty shard of the votes of a hot film."""
+
+    __slots__ = ('shard_id', 'film_id')
+
+    def __init__(self, shard_id: UUID, film_id: UUID):
+        """Initialize the query with the shard ID.
+
+        Args:
+            shard_id: Shard ID
+            film_id: Film ID
+        """
+        self.shard_id = shard_id
+        self.film_id = film_id
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for inserting a shard.
+
+        Returns:
+            Dict: Request to insert a document with the shard.
+        """
+        return self.insert_operations({'_id': self.shard_id, 'film_id': self.film_id, 'rating': {'votes': []}})
+
+
+class ReplaceVotes(MongoQuery):
+    """Model for replacing the votes of a film with the votes merged from its shards."""
+
+    __slots__ = ('film_id', 'votes', 'version', 'shards_version')
+
+    def __init__(self, film_id: UUID, votes: List[Dict], version: int, shards_version: int):
+        """Initialize the query with the merged votes.
+
+        Args:
+            film_id: Film ID
+            votes: Merged votes of the film
+            version: Expected version of the film
+            shards_version: Sum of the versions of the merged shards, added to the film version
+                so that the version of the film with its shards keeps growing after they are deleted
+        """
+        self.film_id = film_id
+        self.votes = votes
+        self.version = version
+        self.shards_version = shards_version
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for replacing the votes if the film has the expected version.
+
+        Returns:
+            Dict: Request to update the document with the movie.
+        """
+        mapping = {}
+        mapping['$set'] = {'rating.votes': self.votes}
+        params = self.update_operations(self.film_id, mapping)
+        params['filter']['version'] = self.version
+        params['update']['$inc']['version'] += self.shards_version
+        return params
+
+
+class DestroyShard(MongoQuery):
+    """Model for deleting a shard of the votes of a film after they are merged into the film."""
+
+    __slots__ = ('shard_id', 'version')
+
+    def __init__(self, shard_id: UUID, version: int):
+        """Initialize the query with the merged shard version.
+
+        Args:
+            shard_id: Shard ID
+            version: Version of the merged shard
+        """
+        self.shard_id = shard_id
+        self.version = version
+
+    @property
+    def params(self) -> Dict:
+        """Request parameters for deleting the shard unless it has been changed since it was merged.
+
+        Returns:
+            Dict: Request to delete the document with the shard.
+        """
+        return self.delete_operations({'_id': self.shard_id, 'version': self.version})
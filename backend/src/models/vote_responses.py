@@ -0,0 +1,36 @@
+from uuid import UUID
+
+from pydantic import Field, validator
+
+from models.base import APIResponse, VotesChoices
+
+
+class VoteResponse(APIResponse):
+    """Base response model for representing a vote of the user."""
+
+    @validator('score', check_fields=False)
+    def get_vote(cls, score: VotesChoices) -> str:
+        """Convert the score of the user to a like or dislike.
+
+        Args:
+            score: User's rating
+
+        Returns:
+            str: Like or dislike
+        """
+        return score.name
+
+
+class FilmVoteResponse(VoteResponse):
+    """Response model for representing a vote of the user on a film."""
+
+    film_id: UUID = Field(alias='_id')
+    score: VotesChoices
+
+
+class ReviewVoteResponse(VoteResponse):
+    """Response model for representing a vote of the user on a review."""
+
+    review_id: UUID = Field(alias='_id')
+    film_id: UUID
+    score: VotesChoices
@@ -0,0 +1,73 @@
+"""Full rebuild of the leaderboard of top-rated films.
+
+Streams the ratings of all films and replaces their leaderboard entries in
+concurrent batches, e.g. after the prior of the Bayesian average has been
+changed or the leaderboard has been lost. An entry is not replaced if it was
+computed from a newer film version, so the rebuild can run while films are rated.
+
+Usage:
+    python rebuild_leaderboard.py --batch 500
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import List
+
+from core.config import CONFIG
+from core.enums import MongoCollections
+from db import storage
+from db.base import Storage
+from models.export_queries import ExportFilms
+from models.ranking_queries import ReplaceLeaderboardEntry
+
+
+async def replace_entries(storage: Storage, queries: List[ReplaceLeaderboardEntry]) -> int:
+    """Replace the leaderboard entries concurrently.
+
+    Args:
+        storage: MongoDB or embedded data storage
+        queries: Query models
+
+    Returns:
+        int: Number of replaced entries
+    """
+    await asyncio.gather(*(storage.update(MongoCollections.leaderboard, query) for query in queries))
+    return len(queries)
+
+
+async def rebuild_leaderboard(size: int) -> int:
+    """Connect to the data storage chosen in the settings and replace the leaderboard entries of all films.
+
+    Args:
+        size: Number of films read and replaced at once
+
+    Returns:
+        int: Number of films
+    """
+    await storage.start()
+    total = 0
+    queries = []
+    async for film in storage.storage.stream(MongoCollections.films, ExportFilms(batch=size)):
+        queries.append(ReplaceLeaderboardEntry.from_film(film, CONFIG.leaderboard.mean, CONFIG.leaderboard.weight))
+        if len(queries) >= size:
+            total += await replace_entries(storage.storage, queries)
+            queries = []
+    total += await replace_entries(storage.storage, queries)
+    await storage.stop()
+    return total
+
+
+def main():
+    """Parse the command line and run the rebuild."""
+    parser = argparse.ArgumentParser(description='Rebuild the leaderboard of top-rated films.')
+    parser.add_argument(
+        '--batch', type=int, default=CONFIG.export.batch, help='number of films read and replaced at once',
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logging.info('films: %d', asyncio.run(rebuild_leaderboard(args.batch)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from functools import lru_cache
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from core.config import CONFIG
+from core.exceptions import OverloadedError
+
+
+class Limiter:
+    """Admission control of data storage operations.
+
+    At most the given number of operations run at once, a bounded number of
+    operations wait for a slot for a limited time, and the others are rejected
+    at once, so that the data storage is not overloaded and latency stays bounded.
+    """
+
+    def __init__(self, concurrency: int, queue: int, timeout: float):
+        """Initialize the limiter with its budget.
+
+        Args:
+            concurrency: Maximum number of running operations
+            queue: Maximum number of waiting operations
+            timeout: Maximum wait for a slot in seconds
+        """
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queue = queue
+        self.timeout = timeout
+        self.waiting = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run the operation when a slot is free.
+
+        Args:
+            func: Data storage operation
+            args: Operation arguments
+
+        Returns:
+            Any: Operation result
+        """
+        async with self:
+            return await func(*args)
+
+    async def __aenter__(self):
+        """Take a slot, waiting in the queue if there are none free."""
+        if self.semaphore.locked():
+            await self.wait()
+        else:
+            await self.semaphore.acquire()
+
+    async def __aexit__(self, *exc_info):
+        """Free the slot.
+
+        Args:
+            exc_info: Exception raised by the operation, if any
+        """
+        self.semaphore.release()
+
+    async def wait(self):
+        """Wait in the queue for a slot.
+
+        Raises:
+            OverloadedError: 503 error if the queue is full or the wait times out
+        """
+        if self.waiting >= self.queue:
+            self.rejected += 1
+            raise OverloadedError(status_code=HTTPStatus.SERVICE_UNAVAILABLE, retry_after=CONFIG.limits.retry)
+        self.waiting += 1
+        acquire = asyncio.ensure_future(self.semaphore.acquire())
+        try:
+            done, _ = await asyncio.wait((acquire,), timeout=self.timeout)
+        except asyncio.CancelledError:
+            self.abandon(acquire)
+            raise
+        finally:
+            self.waiting -= 1
+        if not done:
+            self.abandon(acquire)
+            self.rejected += 1
+            raise OverloadedError(status_code=HTTPStatus.SERVICE_UNAVAILABLE, retry_after=CONFIG.limits.retry)
+
+    def abandon(self, acquire: asyncio.Future):
+        """Stop waiting for a slot, freeing the slot if it has been taken meanwhile.
+
+        Unlike a timeout of wait_for, this never loses a slot taken while the wait is cancelled.
+
+        Args:
+            acquire: Task taking a slot
+        """
+        if not acquire.done():
+            acquire.cancel()
+        elif not acquire.cancelled():
+            self.semaphore.release()
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Numbers of waiting and rejected operations.
+
+        Returns:
+            Dict: Metrics
+        """
+        return {'waiting': self.waiting, 'rejected': self.rejected}
+
+
+class TokenBuckets:
+    """Token bucket rate limits by key, e.g. by user.
+
+    Each bucket holds up to a burst of tokens and is refilled at a constant
+    rate. The least recently used buckets are evicted when there are too many.
+    """
+
+    def __init__(self, rate: float, burst: int, size: int):
+        """Initialize the buckets with the limits.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens in a bucket
+            size: Maximum number of buckets
+        """
+        self.rate = rate
+        self.burst = burst
+        self.size = size
+        self.buckets: Dict[Hashable, Tuple[float, float]] = {}
+
+    def take(self, key: Hashable) -> float:
+        """Take a token from the bucket.
+
+        Args:
+            key: Bucket key
+
+        Returns:
+            float: Zero if the token is taken, otherwise the time until the next token in seconds
+        """
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+        if len(self.buckets) >= self.size:
+            self.buckets.pop(next(iter(self.buckets)))
+        self.buckets[key] = (tokens if wait else tokens - 1, now)
+        return wait
+
+
+@lru_cache()
+def get_write_buckets() -> TokenBuckets:
+    """Create a TokenBuckets object with the write limits of users as a singleton.
+
+    Returns:
+        TokenBuckets: Rate limits of writes by user
+    """
+    return TokenBuckets(rate=CONFIG.limits.rate, burst=CONFIG.limits.burst, size=CONFIG.limits.size)
@@ -0,0 +1,195 @@
+import asyncio
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from fastapi import Depends
+from pymongo.errors import DuplicateKeyError
+
+from services.crud import CRUDService, get_crud_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from models.archive_queries import (
+    ArchiveVotes,
+    CountArchivedVotes,
+    CreateBucket,
+    DestroyBucket,
+    FindArchivedVote,
+    ListAuthors,
+    UnarchiveVote,
+)
+from models.base import VotesChoices
+from models.queries import AddRating
+
+
+class VoteArchiveService:
+    """Class moving the old votes of films out of the film documents into archive buckets.
+
+    A film document keeps every vote it has ever received, so the documents of
+    long-rated films keep growing. Compaction moves the votes older than the
+    archive age into buckets of a fixed size and counts them in the archived
+    likes and dislikes of the film, so that ratings stay exact without reading
+    the buckets. The remaining votes, the counters and the IDs of the new buckets
+    are written at once, unless the film has changed since it was read, in which
+    case the buckets are deleted and the film is compacted by the next run.
+    When a user rates a film again, the archived vote of the user is taken out
+    of its bucket and the counters are decreased.
+
+    The votes of review authors stay in the film, since reviews show them as
+    the film scores of their authors, and the votes of reviews are not archived.
+    """
+
+    def __init__(self, crud: CRUDService, size: int):
+        """When initializing the class, it accepts the data processing service and the bucket size.
+
+        Args:
+            crud: Service for data processing in the data storage
+            size: Maximum number of votes in a bucket
+        """
+        self.crud = crud
+        self.size = size
+
+    async def select(self, film: Dict, before: datetime) -> Tuple[List[Dict], List[Dict]]:
+        """Split the votes of a film into the kept ones and the ones to archive.
+
+        Undated votes are older than any date, and the votes of review authors are always kept.
+
+        Args:
+            film: Film document
+            before: Votes older than the time in UTC are archived
+
+        Returns:
+            Tuple: Kept votes and archived votes
+        """
+        reviews = await self.crud.search(collection=MongoCollections.reviews, query=ListAuthors(film_id=film['_id']))
+        authors = {review['author'] for review in reviews}
+        kept: List[Dict] = []
+        archived: List[Dict] = []
+        for vote in film.get('rating', {}).get('votes', []):
+            if vote.get('date', datetime.min) < before and vote['user_id'] not in authors:
+                archived.append(vote)
+            else:
+                kept.append(vote)
+        return kept, archived
+
+    async def compact(self, film: Dict, before: datetime) -> int:
+        """Move the votes of a film older than the date into new buckets.
+
+        Args:
+            film: Film document
+            before: Votes older than the time in UTC are archived
+
+        Returns:
+            int: Number of archived votes, zero if the film has changed concurrently
+        """
+        kept, archived = await self.select(film, before)
+        if not archived:
+            return 0
+        queries = [
+            CreateBucket(bucket_id=uuid4(), film_id=film['_id'], votes=archived[start:start + self.size])
+            for start in range(0, len(archived), self.size)
+        ]
+        await self.crud.create_many(collection=MongoCollections.archive, queries=queries)
+        if await self.commit(ArchiveVotes(
+            film_id=film['_id'],
+            votes=kept,
+            version=film.get('version', 0),
+            buckets=[query.params['document'] for query in queries],
+        )):
+            return len(archived)
+        await asyncio.gather(*(
+            self.crud.delete(collection=MongoCollections.archive, query=DestroyBucket(bucket_id=query.bucket_id))
+            for query in queries
+        ))
+        return 0
+
+    async def commit(self, query: ArchiveVotes) -> bool:
+        """Remove the archived votes from a film unless its version has changed.
+
+        Args:
+            query: Query model
+
+        Returns:
+            bool: The votes are archived
+        """
+        try:
+            return bool(await self.crud.update(collection=MongoCollections.films, query=query))
+        except DuplicateKeyError:
+            return False
+
+    async def unarchive(self, film: Dict, user_id: UUID) -> Optional[Dict]:
+        """Take the archived vote of a user out of the buckets of a film, decreasing the archived counters.
+
+        Args:
+            film: Film document
+            user_id: User ID
+
+        Returns:
+            Optional[Dict]: Archived vote, or None if the user has no vote in the archive
+        """
+        bucket_ids = film.get('rating', {}).get('buckets')
+        if not bucket_ids:
+            return None
+        buckets = await self.crud.search(
+            collection=MongoCollections.archive,
+            query=FindArchivedVote(bucket_ids=bucket_ids, user_id=user_id),
+        )
+        pulled = await asyncio.gather(*(self.pull(bucket['_id'], user_id) for bucket in buckets))
+        votes = [vote for vote in pulled if vote is not None]
+        if not votes:
+            return None
+        scores = [vote['score'] for vote in votes]
+        await self.crud.update(collection=MongoCollections.films, query=CountArchivedVotes(
+            film_id=film['_id'],
+            likes=-scores.count(VotesChoices.like.value),
+            dislikes=-scores.count(VotesChoices.dislike.value),
+        ))
+        return max(votes, key=lambda vote: vote.get('date', datetime.min))
+
+    async def pull(self, bucket_id: UUID, user_id: UUID) -> Optional[Dict]:
+        """Remove the vote of a user from a bucket unless it has been removed concurrently.
+
+        Args:
+            bucket_id: Bucket ID
+            user_id: User ID
+
+        Returns:
+            Optional[Dict]: Removed vote, or None if it has been removed concurrently
+        """
+        try:
+            bucket = await self.crud.update(
+                collection=MongoCollections.archive,
+                query=UnarchiveVote(bucket_id=bucket_id, user_id=user_id),
+            )
+        except DuplicateKeyError:
+            return None
+        votes = bucket.get('rating', {}).get('votes', [])
+        return next((vote for vote in votes if vote['user_id'] == user_id), None)
+
+    async def restore(self, film_id: UUID, user_id: UUID):
+        """Put the archived vote of a user back into the film, with its original date.
+
+        Args:
+            film_id: Film ID
+            user_id: User ID
+        """
+        film = await self.crud.retrieve(collection=MongoCollections.films, doc_id=film_id)
+        vote = await self.unarchive(film, user_id)
+        if vote is not None:
+            await self.crud.update(collection=MongoCollections.films, query=AddRating(
+                user_id=user_id, source_id=film_id, score=VotesChoices(vote['score']), date=vote.get('date'),
+            ))
+
+
+@lru_cache()
+def get_vote_archive_service(crud: CRUDService = Depends(get_crud_service)) -> VoteArchiveService:
+    """Create a VoteArchiveService object as a singleton.
+
+    Args:
+        crud: Service for data processing in the data storage
+
+    Returns:
+        VoteArchiveService: Service for the archive of old votes of films
+    """
+    return VoteArchiveService(crud, size=CONFIG.archive.size)
@@ -41,7 +41,11 @@ class AuthService:
         if not (user_id := claims.get('user_id')):
             logging.critical('Problem with user identification: No user ID in the token!')
             raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
-        return user_id
+        try:
+            return UUID(user_id)
+        except ValueError:
+            logging.critical('Problem with user identification: Invalid user ID in the token!')
+            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
 
     def decode_token(self) -> Dict:
         """Decode the JWT token.
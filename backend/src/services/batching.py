@@ -0,0 +1,117 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from core.enums import MongoCollections
+
+RetrieveMany = Callable[[MongoCollections, List[UUID]], Awaitable[List[Dict]]]
+
+
+class BatchLoader:  # noqa: WPS230 the loader keeps the state of the pending batch
+    """Micro-batching of point reads of documents by ID.
+
+    Reads of a collection made within a short window, or until the batch is
+    full, are executed as a single query for all the IDs, and the documents
+    are handed back to the waiting callers. The loader keeps the tasks of the
+    running queries, so that they are not collected before they finish.
+    """
+
+    def __init__(
+        self,
+        retrieve_many: RetrieveMany,
+        window: float,
+        size: int,
+    ):
+        """Initialize the loader with the batch query and the batch limits.
+
+        Args:
+            retrieve_many: Function reading documents by a list of IDs
+            window: Time to collect a batch in seconds
+            size: Maximum number of IDs in a batch
+        """
+        self.retrieve_many = retrieve_many
+        self.window = window
+        self.size = size
+        self.batches: Dict[MongoCollections, Dict[UUID, asyncio.Future]] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.queries = 0
+
+    async def load(self, collection: MongoCollections, doc_id: UUID) -> Optional[Dict]:
+        """Read a document by ID as part of the current batch of the collection.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+
+        Returns:
+            Optional[Dict]: Document by ID
+        """
+        self.calls += 1
+        batch = self.batches.get(collection)
+        if batch is None:
+            batch = {}
+            self.batches[collection] = batch
+            asyncio.get_running_loop().call_later(self.window, self.dispatch, collection, batch)
+        future = batch.get(doc_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            batch[doc_id] = future
+        if len(batch) >= self.size:
+            self.dispatch(collection, batch)
+        return await asyncio.shield(future)
+
+    def dispatch(self, collection: MongoCollections, batch: Dict[UUID, asyncio.Future]):
+        """Close the batch unless it is already closed and start its query.
+
+        Args:
+            collection: Collection with documents
+            batch: Futures of the documents by ID
+        """
+        if self.batches.get(collection) is batch:
+            self.batches.pop(collection)
+            self.queries += 1
+            task = asyncio.create_task(self.execute(collection, batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def execute(self, collection: MongoCollections, batch: Dict[UUID, asyncio.Future]):
+        """Read the documents of the batch and hand them out to the callers, failing them if the query fails.
+
+        The futures still pending when the query is cancelled are cancelled,
+        so that no caller waits forever.
+
+        Args:
+            collection: Collection with documents
+            batch: Futures of the documents by ID
+        """
+        try:
+            await self.resolve(collection, batch)
+        except Exception as exc:
+            for failed in batch.values():
+                if not failed.done():
+                    failed.set_exception(exc)
+        finally:
+            for future in batch.values():
+                future.cancel()
+
+    async def resolve(self, collection: MongoCollections, batch: Dict[UUID, asyncio.Future]):
+        """Read the documents of the batch and set them as the results of their futures.
+
+        Args:
+            collection: Collection with documents
+            batch: Futures of the documents by ID
+        """
+        docs = await self.retrieve_many(collection, list(batch))
+        found = {doc['_id']: doc for doc in docs}
+        for doc_id, future in batch.items():
+            future.set_result(found.get(doc_id))
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Number of reads and of the batch queries executing them.
+
+        Returns:
+            Dict: Metrics
+        """
+        return {'calls': self.calls, 'queries': self.queries}
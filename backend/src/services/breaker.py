@@ -0,0 +1,110 @@
+import logging
+import math
+import time
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import pymongo
+from pymongo.errors import (
+    ConnectionFailure,
+    ExecutionTimeout,
+    PyMongoError,
+    ServerSelectionTimeoutError,
+    WaitQueueTimeoutError,
+    WTimeoutError,
+)
+
+from core.config import CONFIG
+from core.exceptions import StorageTimeoutError, StorageUnavailableError, UGCException
+
+FAILURES = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+
+def storage_error(exc: PyMongoError) -> UGCException:
+    """HTTP error for a failed data storage operation.
+
+    Args:
+        exc: Connection error or exceeded deadline
+
+    Returns:
+        UGCException: 504 error if the operation timed out, otherwise 503 error
+    """
+    logging.error(exc)
+    if exc.timeout and not isinstance(exc, (ServerSelectionTimeoutError, WaitQueueTimeoutError)):
+        return StorageTimeoutError(status_code=HTTPStatus.GATEWAY_TIMEOUT)
+    return StorageUnavailableError(status_code=HTTPStatus.SERVICE_UNAVAILABLE, retry_after=CONFIG.limits.retry)
+
+
+class CircuitBreaker:
+    """Circuit breaker of data storage operations.
+
+    After a number of consecutive connection errors or exceeded deadlines the
+    circuit opens, and operations fail at once instead of waiting for server
+    selection. After the reset time a single operation is let through as a
+    probe, and the circuit closes when an operation succeeds.
+    """
+
+    def __init__(self, failures: int, reset: float):
+        """Initialize the breaker with its thresholds.
+
+        Args:
+            failures: Number of consecutive failures opening the circuit
+            reset: Time before a probe in seconds
+        """
+        self.threshold = failures
+        self.reset = reset
+        self.failures = 0
+        self.opened: Optional[float] = None
+        self.rejected = 0
+
+    async def run(self, deadline: float, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run the operation with a deadline, which MongoDB receives as maxTimeMS, unless the circuit is open.
+
+        Args:
+            deadline: Time limit of the operation in seconds
+            func: Data storage operation
+            args: Operation arguments
+
+        Raises:
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
+
+        Returns:
+            Any: Operation result
+        """
+        self.check()
+        try:
+            with pymongo.timeout(deadline):
+                result = await func(*args)
+        except FAILURES as exc:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened = time.monotonic()
+            raise storage_error(exc)
+        self.failures = 0
+        self.opened = None
+        return result
+
+    def check(self):
+        """Let the operation through if the circuit is closed or it is time for a probe.
+
+        Raises:
+            StorageUnavailableError: 503 error if the circuit is open
+        """
+        if self.opened is None:
+            return
+        elapsed = time.monotonic() - self.opened
+        if elapsed < self.reset:
+            self.rejected += 1
+            raise StorageUnavailableError(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE, retry_after=math.ceil(self.reset - elapsed),
+            )
+        self.opened = time.monotonic()
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """State of the circuit and numbers of consecutive failures and rejected operations.
+
+        Returns:
+            Dict: Metrics
+        """
+        return {'open': self.opened is not None, 'failures': self.failures, 'rejected': self.rejected}
@@ -0,0 +1,68 @@
+import time
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from core.enums import MongoCollections
+
+
+class VersionCache:
+    """In-process cache of document versions.
+
+    Entries expire after the time to live, since documents can be changed by
+    other workers, and the oldest entries are evicted when the cache is full.
+    Versions only grow, so a cached version is never replaced by an older one.
+    """
+
+    def __init__(self, ttl: float, size: int):
+        """Initialize the cache with its limits.
+
+        Args:
+            ttl: Time to live of an entry in seconds
+            size: Maximum number of entries
+        """
+        self.ttl = ttl
+        self.size = size
+        self.entries: Dict[Tuple[MongoCollections, UUID], Tuple[float, int]] = {}
+
+    def get(self, collection: MongoCollections, doc_id: UUID) -> Optional[int]:
+        """Get the cached version of a document.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+
+        Returns:
+            Optional[int]: Document version unless it is missing or expired
+        """
+        entry = self.entries.get((collection, doc_id))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, collection: MongoCollections, doc_id: UUID, version: int):
+        """Cache the version of a document.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+            version: Document version
+        """
+        entry = self.entries.pop((collection, doc_id), None)
+        if entry is not None and entry[0] >= time.monotonic():
+            version = max(version, entry[1])
+        if len(self.entries) >= self.size:
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[(collection, doc_id)] = (time.monotonic() + self.ttl, version)
+
+    def invalidate(self, collection: MongoCollections, doc_id: UUID):
+        """Remove the version of a document from the cache.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+        """
+        self.entries.pop((collection, doc_id), None)
+
+    def clear(self):
+        """Remove all versions from the cache."""
+        self.entries.clear()
@@ -0,0 +1,58 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalescing of identical concurrent reads into a single storage query.
+
+    The first call with a key starts the query, and the calls with the same key
+    made before it completes wait for its result instead of querying again.
+    The result is shared by all the callers, so it must not be changed.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """Initialize the class with empty metrics.
+
+        Args:
+            enabled: Coalesce calls, otherwise only count them
+        """
+        self.enabled = enabled
+        self.flights: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self.calls: Counter = Counter()
+        self.coalesced: Counter = Counter()
+
+    async def run(self, operation: str, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the query or join the one in flight with the same key.
+
+        Args:
+            operation: Name of the operation for the metrics
+            key: Normalized query parameters
+            func: Function starting the query
+
+        Returns:
+            Any: Query result
+        """
+        self.calls[operation] += 1
+        if not self.enabled:
+            return await func()
+        flight = self.flights.get((operation, key))
+        if flight is None:
+            flight = asyncio.ensure_future(func())
+            self.flights[(operation, key)] = flight
+            flight.add_done_callback(lambda _: self.flights.pop((operation, key), None))
+        else:
+            self.coalesced[operation] += 1
+        return await asyncio.shield(flight)
+
+    @property
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """Number of calls and of calls that joined a query in flight, by operation.
+
+        Returns:
+            Dict: Metrics by operation
+        """
+        return {
+            operation: {'calls': calls, 'coalesced': self.coalesced[operation]}
+            for operation, calls in self.calls.items()
+        }
@@ -1,49 +1,138 @@
-import logging
-from functools import lru_cache
-from http import HTTPStatus
-from typing import Dict, List
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import Depends, HTTPException
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo.errors import ServerSelectionTimeoutError
+from fastapi import Depends
 
+from services.admission import Limiter
+from services.batching import BatchLoader
+from services.breaker import FAILURES, CircuitBreaker, storage_error
+from services.cache import VersionCache
+from services.coalescing import SingleFlight
+from core.config import CONFIG, DeadlinesConfig
 from core.enums import MongoCollections
-from db.mongo import get_mongo
+from db.base import Storage
+from db.storage import get_storage
 from models.base import MongoQuery
 
 
-class CRUDService:
-    """Class for performing basic data processing operations in MongoDB."""
+class CRUDService:  # noqa: WPS214, WPS230 the service implements the storage operations with their caches
+    """Class for performing basic data processing operations in the data storage.
 
-    def __init__(self, mongo: AsyncIOMotorDatabase):
-        """When initializing the class, it accepts the MongoDB database client.
+    Versions of created and updated documents are kept in a version cache,
+    so that conditional requests can be answered without reading the documents.
+    Identical concurrent reads are coalesced into a single storage query, and
+    reads by ID can be batched into queries for many documents. Storage queries
+    are admitted with separate concurrency budgets for reads and writes, run
+    with per-operation deadlines, and fail fast while the circuit breaker is open.
+    """
+
+    def __init__(  # noqa: WPS211 one argument per setting of the service
+        self,
+        storage: Storage,
+        cache: VersionCache,
+        flights: SingleFlight,
+        reads: Limiter,
+        writes: Limiter,
+        breaker: CircuitBreaker,
+        deadlines: DeadlinesConfig,
+        loader: Optional[BatchLoader] = None,
+    ):
+        """When initializing the class, it accepts the data storage backend and the read optimizations.
+
+        Args:
+            storage: MongoDB or embedded data storage
+            cache: Cache of document versions
+            flights: Coalescing of identical reads
+            reads: Admission control of reads
+            writes: Admission control of writes
+            breaker: Circuit breaker of the data storage
+            deadlines: Deadlines of operations
+            loader: Batching of reads by ID, if enabled
+        """
+        self.storage = storage
+        self.cache = cache
+        self.flights = flights
+        self.reads = reads
+        self.writes = writes
+        self.breaker = breaker
+        self.deadlines = deadlines
+        self.loader = loader
+
+    @property
+    def metrics(self) -> Dict:
+        """Internal metrics of the service.
+
+        Returns:
+            Dict: Metrics by component
+        """
+        metrics = {
+            'singleflight': self.flights.metrics,
+            'admission': {'reads': self.reads.metrics, 'writes': self.writes.metrics},
+            'breaker': self.breaker.metrics,
+        }
+        if self.loader:
+            metrics['batching'] = self.loader.metrics
+        return metrics
+
+    async def read(self, deadline: float, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run a read query with its deadline, under admission control and the circuit breaker.
 
         Args:
-            mongo: MongoDB client
+            deadline: Time limit of the query in seconds
+            func: Data storage operation
+            args: Operation arguments
+
+        Returns:
+            Any: Query result
+        """
+        return await self.breaker.run(deadline, self.reads.run, func, *args)
+
+    async def write(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run a write query with its deadline, under admission control and the circuit breaker.
+
+        Args:
+            func: Data storage operation
+            args: Operation arguments
+
+        Returns:
+            Any: Query result
         """
-        self.mongo = mongo
+        return await self.breaker.run(self.deadlines.write, self.writes.run, func, *args)
 
     async def create(self, collection: MongoCollections, query: MongoQuery) -> Dict:
         """Create a document in the collection.
 
         Args:
             collection: Collection with documents
-            query: MongoDB query
+            query: Query model
 
         Raises:
-            HTTPException: An error if the MongoDB server is unavailable for the operation
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
 
         Returns:
             Dict: New document
         """
-        try:
-            result = await self.mongo[collection.name].find_one_and_replace(**query.params)
-        except ServerSelectionTimeoutError as exc:
-            logging.error(exc)
-            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
+        result = await self.write(self.storage.create, collection, query)
+        if result:
+            self.cache.set(collection, result['_id'], result.get('version', 0))
         return result or {}
 
+    async def create_many(self, collection: MongoCollections, queries: List[MongoQuery]) -> List[int]:
+        """Create documents in the collection at once, skipping duplicates.
+
+        Args:
+            collection: Collection with documents
+            queries: Query models
+
+        Raises:
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
+
+        Returns:
+            List: Indexes of the queries whose documents are duplicates
+        """
+        return await self.write(self.storage.create_many, collection, queries)
+
     async def retrieve(self, collection: MongoCollections, doc_id: UUID) -> Dict:
         """Read a document by ID from the collection.
 
@@ -52,56 +141,137 @@ class CRUDService:
             doc_id: Document ID
 
         Raises:
-            HTTPException: An error if the MongoDB server is unavailable for the operation
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
 
         Returns:
             Dict: Document by ID
         """
-        try:
-            result = await self.mongo[collection.name].find_one(doc_id)
-        except ServerSelectionTimeoutError as exc:
-            logging.error(exc)
-            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
+        if self.loader:
+            read = partial(self.loader.load, collection, doc_id)
+        else:
+            read = partial(self.read, self.deadlines.read, self.storage.retrieve, collection, doc_id)
+        result = await self.flights.run('retrieve', (collection, doc_id), read)
         return result or {}
 
+    async def retrieve_many(self, collection: MongoCollections, doc_ids: List[UUID]) -> List[Dict]:
+        """Read documents by a list of IDs from the collection.
+
+        Args:
+            collection: Collection with documents
+            doc_ids: Document IDs
+
+        Raises:
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
+
+        Returns:
+            List: Found documents in the order of the IDs
+        """
+        result = await self.flights.run(
+            'retrieve_many',
+            (collection, *doc_ids),
+            partial(self.read, self.deadlines.read, self.storage.retrieve_many, collection, doc_ids),
+        )
+        found = {doc['_id']: doc for doc in result}
+        return [found[doc_id] for doc_id in doc_ids if doc_id in found]
+
+    async def version(self, collection: MongoCollections, doc_id: UUID, read: bool = True) -> Optional[int]:
+        """Get the version of a document from the cache or by reading only the version.
+
+        Args:
+            collection: Collection with documents
+            doc_id: Document ID
+            read: Read the version from the data storage if it is not cached
+
+        Returns:
+            Optional[int]: Document version if the document exists and, unless read, is cached
+        """
+        version = self.cache.get(collection, doc_id)
+        if version is None and read:
+            version = (await self.versions(collection, {'_id': doc_id})).get(doc_id)
+            if version is not None:
+                self.cache.set(collection, doc_id, version)
+        return version
+
+    async def versions(self, collection: MongoCollections, filtering: Dict) -> Dict[UUID, int]:
+        """Read only the versions of the documents matching the filter.
+
+        Args:
+            collection: Collection with documents
+            filtering: Filter by document fields
+
+        Raises:
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
+
+        Returns:
+            Dict: Document versions by ID
+        """
+        result = await self.flights.run(
+            'versions',
+            (collection, *sorted(filtering.items())),
+            partial(self.read, self.deadlines.read, self.storage.versions, collection, filtering),
+        )
+        return result
+
     async def search(self, collection: MongoCollections, query: MongoQuery) -> List[Dict]:
         """Search for documents in the collection.
 
         Args:
             collection: Collection with documents
-            query: MongoDB query
+            query: Query model
 
         Raises:
-            HTTPException: An error if the MongoDB server is unavailable for the operation
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
 
         Returns:
             List: List of documents
         """
-        try:
-            result = await self.mongo[collection.name].aggregate(**query.params).to_list(None)
-        except ServerSelectionTimeoutError as exc:
-            logging.error(exc)
-            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
+        result = await self.flights.run(
+            'search',
+            (collection, query.key),
+            partial(self.read, self.deadlines.search, self.storage.search, collection, query),
+        )
         return result
 
+    async def stream(self, collection: MongoCollections, query: MongoQuery) -> AsyncIterator[Dict]:
+        """Stream the documents found in the collection without reading them all into memory.
+
+        The stream is not admitted with the read budget and has no deadline,
+        since it lasts as long as the client reads it, but it fails fast while
+        the circuit breaker is open.
+
+        Args:
+            collection: Collection with documents
+            query: Query model
+
+        Raises:
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
+
+        Yields:
+            Dict: Found document
+        """
+        self.breaker.check()
+        try:
+            async for doc in self.storage.stream(collection, query):
+                yield doc
+        except FAILURES as exc:
+            raise storage_error(exc)
+
     async def update(self, collection: MongoCollections, query: MongoQuery) -> Dict:
         """Update a document in the collection.
 
         Args:
             collection: Collection with documents
-            query: MongoDB query
+            query: Query model
 
         Raises:
-            HTTPException: An error if the MongoDB server is unavailable for the operation
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
 
         Returns:
-            Dict: Document after the update
+            Dict: Document after the update, or before it if the query asks for the previous document
         """
-        try:
-            result = await self.mongo[collection.name].find_one_and_update(**query.params)
-        except ServerSelectionTimeoutError as exc:
-            logging.error(exc)
-            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
+        result = await self.write(self.storage.update, collection, query)
+        if result and query.params.get('return_document', True):
+            self.cache.set(collection, result['_id'], result.get('version', 0))
         return result or {}
 
     async def delete(self, collection: MongoCollections, query: MongoQuery) -> Dict:
@@ -109,30 +279,43 @@ class CRUDService:
 
         Args:
             collection: Collection with documents
-            query: MongoDB query
+            query: Query model
 
         Raises:
-            HTTPException: An error if the MongoDB server is unavailable for the operation
+            UGCException: 503 error if the data storage is unavailable, 504 error if the operation timed out
 
         Returns:
             Dict: Document to be deleted
         """
-        try:
-            result = await self.mongo[collection.name].find_one_and_delete(**query.params)
-        except ServerSelectionTimeoutError as exc:
-            logging.error(exc)
-            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
+        result = await self.write(self.storage.delete, collection, query)
+        if result:
+            self.cache.invalidate(collection, result['_id'])
         return result
 
 
 @lru_cache()
-def get_crud_service(mongo: AsyncIOMotorDatabase = Depends(get_mongo)) -> CRUDService:
+def get_crud_service(storage: Storage = Depends(get_storage)) -> CRUDService:
     """Create a CRUDService object as a singleton.
 
     Args:
-        mongo: MongoDB connection
+        storage: Data storage chosen in the settings
 
     Returns:
-        CRUDService: Service for data processing in MongoDB
+        CRUDService: Service for data processing in the data storage
     """
-    return CRUDService(mongo)
+    reads = Limiter(concurrency=CONFIG.limits.reads, queue=CONFIG.limits.queue, timeout=CONFIG.limits.timeout)
+    breaker = CircuitBreaker(failures=CONFIG.breaker.failures, reset=CONFIG.breaker.reset)
+    return CRUDService(
+        storage=storage,
+        cache=VersionCache(ttl=CONFIG.cache.ttl, size=CONFIG.cache.size),
+        flights=SingleFlight(enabled=CONFIG.cache.coalesce),
+        reads=reads,
+        writes=Limiter(concurrency=CONFIG.limits.writes, queue=CONFIG.limits.queue, timeout=CONFIG.limits.timeout),
+        breaker=breaker,
+        deadlines=CONFIG.deadlines,
+        loader=BatchLoader(
+            retrieve_many=partial(breaker.run, CONFIG.deadlines.read, reads.run, storage.retrieve_many),
+            window=CONFIG.batch.window,
+            size=CONFIG.batch.size,
+        ) if CONFIG.batch.enabled else None,
+    )
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import Callable, Dict, Optional
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+from services.cache import VersionCache
+from core.config import CONFIG
+from core.enums import MongoCollections, StorageBackends
+from db import mongo
+
+TOKENS_COLLECTION = 'resume_tokens'
+NOT_REPLICA_SET = 40573
+
+ChangeCallback = Callable[[MongoCollections, UUID], None]
+
+
+class CacheInvalidator:  # noqa: WPS230 the invalidator keeps the state of its subscription
+    """Class keeping the version cache coherent with changes made by all workers and replicas.
+
+    Tails a MongoDB change stream on the data collections, refreshing cached
+    versions of updated documents and invalidating deleted ones. The resume
+    token is kept in memory to resume the stream after errors and is saved
+    periodically, so that the stream is resumed from it when the worker restarts.
+    Other components can be notified of the changed documents as well.
+    """
+
+    def __init__(
+        self,
+        mongo: AsyncIOMotorDatabase,
+        cache: VersionCache,
+        name: str,
+        interval: float,
+        on_change: Optional[ChangeCallback] = None,
+    ):
+        """When initializing the class, it accepts the MongoDB database and the version cache.
+
+        Args:
+            mongo: MongoDB client
+            cache: Cache of document versions
+            name: Name of the saved resume token
+            interval: Time between saves of the resume token and reconnections in seconds
+            on_change: Function called with the collection and ID of each changed document
+        """
+        self.mongo = mongo
+        self.cache = cache
+        self.name = name
+        self.interval = interval
+        self.on_change = on_change
+        self.token: Optional[Dict] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Load the saved resume token and start tailing the change stream in the background."""
+        try:
+            saved = await self.mongo[TOKENS_COLLECTION].find_one({'_id': self.name})
+        except PyMongoError as exc:
+            logging.error(exc)
+            saved = None
+        self.token = saved['token'] if saved else None
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop tailing the change stream and save the resume token."""
+        if self.task:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+        try:
+            await self.save()
+        except PyMongoError as exc:
+            logging.error(exc)
+
+    async def run(self):
+        """Tail the change stream, reconnecting after errors.
+
+        If the stream cannot be resumed from the token, changes might have been
+        missed, so the cache is cleared.
+        """
+        while True:
+            try:
+                await self.watch()
+            except OperationFailure as exc:
+                logging.error(exc)
+                if exc.code == NOT_REPLICA_SET:
+                    return
+                self.token = None
+                self.cache.clear()
+            except PyMongoError as exc:
+                logging.error(exc)
+            await asyncio.sleep(self.interval)
+
+    async def watch(self):
+        """Apply the changes of the data collections to the version cache.
+
+        Raises:
+            OperationFailure: An error if the stream cannot be opened or resumed
+        """
+        pipeline = [{'$match': {'ns.coll': {'$in': [collection.value for collection in MongoCollections]}}}]
+        saved = time.monotonic()
+        async with self.mongo.watch(pipeline, resume_after=self.token, max_await_time_ms=1000) as stream:
+            while stream.alive:
+                change = await stream.try_next()
+                if change:
+                    self.apply(change)
+                self.token = stream.resume_token
+                if time.monotonic() - saved > self.interval:
+                    await self.save()
+                    saved = time.monotonic()
+
+    def apply(self, change: Dict):
+        """Refresh or invalidate the cached version of the changed document and notify about the change.
+
+        Args:
+            change: Change event
+        """
+        collection = MongoCollections(change['ns']['coll'])
+        doc_id = change['documentKey']['_id']
+        version = (change.get('fullDocument') or {}).get('version')
+        if version is None:
+            version = change.get('updateDescription', {}).get('updatedFields', {}).get('version')
+        if version is None:
+            self.cache.invalidate(collection, doc_id)
+        else:
+            self.cache.set(collection, doc_id, version)
+        if self.on_change:
+            self.on_change(collection, doc_id)
+
+    async def save(self):
+        """Save the resume token."""
+        if self.token is not None:
+            await self.mongo[TOKENS_COLLECTION].replace_one({'_id': self.name}, {'token': self.token}, upsert=True)
+
+
+invalidator: Optional[CacheInvalidator] = None
+
+
+async def start(cache: VersionCache, on_change: Optional[ChangeCallback] = None):
+    """Start keeping the version cache coherent, if the data storage has change streams.
+
+    Args:
+        cache: Cache of document versions
+        on_change: Function called with the collection and ID of each changed document
+    """
+    global invalidator  # noqa: WPS420 the invalidator lives as long as the application
+    if CONFIG.storage.backend == StorageBackends.mongo and CONFIG.stream.enabled:
+        invalidator = CacheInvalidator(
+            mongo.mongo, cache, name=CONFIG.stream.name, interval=CONFIG.stream.interval, on_change=on_change,
+        )
+        await invalidator.start()
+
+
+async def stop():
+    """Stop keeping the version cache coherent."""
+    if invalidator:
+        await invalidator.stop()
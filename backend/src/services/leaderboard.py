@@ -0,0 +1,73 @@
+from functools import lru_cache
+from typing import Dict, List
+
+from fastapi import Depends
+
+from services.crud import CRUDService, get_crud_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from models.ranking_queries import ListLeaderboard, ReplaceLeaderboardEntry
+
+
+class LeaderboardService:
+    """Class for serving the leaderboard of top-rated films from precomputed scores.
+
+    Each film has an entry with its number of votes, their sum and the Bayesian
+    average score, which pulls the average of a film with few votes towards
+    the prior mean. The entry is replaced from the film returned by every
+    rating change, unless it was already computed from a newer film version,
+    so the leaderboard is read with the index on the scores and the votes of
+    films are never aggregated.
+    """
+
+    def __init__(self, crud: CRUDService, mean: float, weight: float):
+        """When initializing the class, it accepts the data processing service and the prior.
+
+        Args:
+            crud: Service for data processing in the data storage
+            mean: Prior mean score
+            weight: Number of votes the prior mean counts as
+        """
+        self.crud = crud
+        self.mean = mean
+        self.weight = weight
+
+    async def search(self, offset: int, limit: int) -> List[Dict]:
+        """Retrieve a page of the leaderboard with the ranks of the films.
+
+        Args:
+            offset: Number of films to skip
+            limit: Number of films on the page
+
+        Returns:
+            List: Leaderboard entries
+        """
+        entries = await self.crud.search(
+            collection=MongoCollections.leaderboard,
+            query=ListLeaderboard(offset=offset, limit=limit),
+        )
+        return [{**entry, 'rank': rank} for rank, entry in enumerate(entries, start=offset + 1)]
+
+    async def save(self, film: Dict):
+        """Replace the leaderboard entry of a film after its rating has changed.
+
+        Args:
+            film: Film document
+        """
+        await self.crud.update(
+            collection=MongoCollections.leaderboard,
+            query=ReplaceLeaderboardEntry.from_film(film, mean=self.mean, weight=self.weight),
+        )
+
+
+@lru_cache()
+def get_leaderboard_service(crud: CRUDService = Depends(get_crud_service)) -> LeaderboardService:
+    """Create a LeaderboardService object as a singleton.
+
+    Args:
+        crud: Service for data processing in the data storage
+
+    Returns:
+        LeaderboardService: Service for the leaderboard of top-rated films
+    """
+    return LeaderboardService(crud, mean=CONFIG.leaderboard.mean, weight=CONFIG.leaderboard.weight)
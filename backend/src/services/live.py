@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from contextlib import suppress
+from functools import lru_cache
+from http import HTTPStatus
+from typing import AsyncIterator, Dict, Optional, Set
+from uuid import UUID
+
+import orjson
+from fastapi import Depends
+
+from services.sharding import ShardedVotesService, get_sharded_votes_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from core.exceptions import OverloadedError
+from models.encoders import ResponseEncoder
+from models.responses import RatingResponse
+
+KEEPALIVE = b': keepalive\n\n'
+
+rating_encoder = ResponseEncoder(RatingResponse)
+
+
+def rating_event(film: Dict) -> bytes:
+    """Server-sent event with the rating of a film, identified by the film version.
+
+    Args:
+        film: Film document
+
+    Returns:
+        bytes: Encoded event
+    """
+    rating = orjson.dumps(rating_encoder.encode_doc(film.get('rating', {})))
+    return b''.join((b'id: ', str(film.get('version', 0)).encode(), b'\nevent: rating\ndata: ', rating, b'\n\n'))
+
+
+class RatingChannel:
+    """Latest rating event of a film, shared by all its subscribers in the worker."""
+
+    def __init__(self):
+        """Initialize the channel without an event."""
+        self.subscribers = 0
+        self.event: Optional[bytes] = None
+        self.changed = asyncio.Event()
+
+    def publish(self, event: bytes):
+        """Replace the latest event and wake up the subscribers.
+
+        Args:
+            event: Encoded event
+        """
+        self.event = event
+        changed = self.changed
+        self.changed = asyncio.Event()
+        changed.set()
+
+
+class Subscription:
+    """Context of a subscriber of a film channel, removing the channel after its last subscriber leaves."""
+
+    def __init__(self, live: 'LiveRatingsService', film_id: UUID):
+        """Initialize the subscription.
+
+        Args:
+            live: Service with the channels by film ID and the number of open streams
+            film_id: Film ID
+        """
+        self.live = live
+        self.film_id = film_id
+
+    def __enter__(self) -> RatingChannel:
+        """Join the channel of the film, opening it for the first subscriber.
+
+        Returns:
+            RatingChannel: Channel of the film
+        """
+        channel = self.live.channels.setdefault(self.film_id, RatingChannel())
+        channel.subscribers += 1
+        self.live.subscribers += 1
+        return channel
+
+    def __exit__(self, *exc_info):
+        """Leave the channel of the film.
+
+        Args:
+            exc_info: Exception raised by the subscriber, if any
+        """
+        self.live.subscribers -= 1
+        channel = self.live.channels[self.film_id]
+        channel.subscribers -= 1
+        if not channel.subscribers:
+            self.live.channels.pop(self.film_id)
+
+
+class LiveRatingsService:  # noqa: WPS214, WPS230 the service keeps the state of the open streams
+    """Class pushing live rating updates of films to subscribers as server-sent events.
+
+    Rating changes made by the worker, or seen on the change stream of films and
+    their shards when it is enabled, mark a film as changed. Once per interval, every changed film with
+    subscribers is read once and its encoded rating is shared by all of them,
+    so a burst of votes produces a single update, and a slow subscriber skips
+    straight to the latest one. The number of open streams of the worker is
+    capped, since they are held for as long as the clients stay connected.
+    """
+
+    def __init__(self, votes: ShardedVotesService, interval: float, keepalive: float, capacity: int):
+        """When initializing the class, it accepts the service reading films with their votes and the update intervals.
+
+        Args:
+            votes: Service for the votes of films, spread over shards while they are hot
+            interval: Time between updates of a changed film in seconds
+            keepalive: Time between keepalive comments of an idle stream in seconds
+            capacity: Maximum number of open streams of the worker
+        """
+        self.votes = votes
+        self.interval = interval
+        self.keepalive = keepalive
+        self.capacity = capacity
+        self.subscribers = 0
+        self.channels: Dict[UUID, RatingChannel] = {}
+        self.changed: Set[UUID] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Numbers of subscribed films and their subscribers.
+
+        Returns:
+            Dict: Metrics
+        """
+        return {'films': len(self.channels), 'subscribers': self.subscribers}
+
+    def admit(self):
+        """Check that the worker can open another stream.
+
+        Raises:
+            OverloadedError: 503 error if the worker has the maximum number of open streams
+        """
+        if self.subscribers >= self.capacity:
+            raise OverloadedError(status_code=HTTPStatus.SERVICE_UNAVAILABLE, retry_after=CONFIG.limits.retry)
+
+    def notify(self, collection: MongoCollections, doc_id: UUID):
+        """Mark a film as changed if it has subscribers, including when one of its shards is changed.
+
+        Args:
+            collection: Collection of the changed document
+            doc_id: Document ID
+        """
+        if collection == MongoCollections.shards:
+            film_id = self.votes.film_of(doc_id)
+        elif collection == MongoCollections.films:
+            film_id = doc_id
+        else:
+            return
+        if film_id in self.channels:
+            self.changed.add(film_id)
+
+    async def subscribe(self, film: Dict) -> AsyncIterator[bytes]:
+        """Stream the current rating of a film and then its updates, with keepalive comments while it is idle.
+
+        Args:
+            film: Film document, read when the stream is requested
+
+        Yields:
+            bytes: Encoded event or comment
+        """
+        with Subscription(self, film['_id']) as channel:
+            if channel.event is None:
+                channel.publish(rating_event(film))
+            changed = channel.changed
+            yield channel.event or KEEPALIVE
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                changed = channel.changed
+                yield channel.event or KEEPALIVE
+
+    async def update(self):
+        """Read the changed films with subscribers at once and publish their ratings.
+
+        If the read fails, the films are updated at the next interval.
+        """
+        changed = [film_id for film_id in self.changed if film_id in self.channels]
+        self.changed = set()
+        if not changed:
+            return
+        try:
+            films = await self.votes.retrieve_many(changed)
+        except Exception as exc:
+            logging.error(exc)
+            self.changed.update(changed)
+            return
+        for film in films:
+            if channel := self.channels.get(film['_id']):
+                channel.publish(rating_event(film))
+
+    async def run(self):
+        """Publish the updates of changed films periodically."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.update()
+
+    async def start(self):
+        """Start publishing updates in the background."""
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop publishing updates."""
+        if self.task:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+
+
+@lru_cache()
+def get_live_ratings_service(votes: ShardedVotesService = Depends(get_sharded_votes_service)) -> LiveRatingsService:
+    """Create a LiveRatingsService object as a singleton.
+
+    Args:
+        votes: Service for the votes of films, spread over shards while they are hot
+
+    Returns:
+        LiveRatingsService: Service for live rating updates
+    """
+    return LiveRatingsService(
+        votes,
+        interval=CONFIG.live.interval,
+        keepalive=CONFIG.live.keepalive,
+        capacity=CONFIG.live.capacity,
+    )
@@ -0,0 +1,464 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid5
+
+from fastapi import Depends
+from pymongo.errors import DuplicateKeyError
+
+from services.archive import VoteArchiveService, get_vote_archive_service
+from services.crud import CRUDService, get_crud_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from models.base import VotesChoices
+from models.documents import merge_shards
+from models.queries import AddRating, RemoveRating
+from models.vote_queries import CreateShard, DestroyShard, ReplaceVotes
+
+
+class ShardedVotesService:  # noqa: WPS214, WPS230 the service keeps the state of the shards of hot films
+    """Class spreading the votes of hot films over several shard documents during vote storms.
+
+    Every vote of a film updates the same film document, so a storm of votes
+    on one film serializes on it. Each worker counts the rating writes of films,
+    and while a film is written faster than the promotion rate, the worker puts
+    its votes into shards chosen by the user ID, so that concurrent votes update
+    different documents. Votes are dated, and reads merge the votes of a film
+    with those of its shards, keeping the latest vote of each user, whichever
+    worker wrote it. Merged films are cached briefly. When a film is written
+    slower than the demotion rate, its shards are folded back into it.
+
+    Only the ratings of films see the votes in shards. The film scores of review
+    authors and the votes of a user include them once the shards are folded.
+    The archived vote of a user who rates a film again is taken out of the
+    archive, and films with shards are not compacted.
+    """
+
+    def __init__(  # noqa: WPS211 one argument per setting of the service
+        self,
+        crud: CRUDService,
+        archive: VoteArchiveService,
+        shards: int,
+        promote: float,
+        demote: float,
+        interval: float,
+        ttl: float,
+        size: int,
+        enabled: bool = True,
+    ):
+        """When initializing the class, it accepts the data processing service and the sharding settings.
+
+        Args:
+            crud: Service for data processing in the data storage
+            archive: Service for the archive of old votes of films
+            shards: Number of shards of a hot film
+            promote: Rate of rating writes of a film per second making it hot
+            demote: Rate of rating writes of a hot film per second folding its shards
+            interval: Time between checks of the write rates in seconds
+            ttl: Time to live of a cached film with the votes of its shards in seconds
+            size: Maximum number of cached films
+            enabled: Spread the votes of hot films, otherwise keep all votes in the film documents
+        """
+        self.crud = crud
+        self.archive = archive
+        self.shards = shards
+        self.promote = promote
+        self.demote = demote
+        self.interval = interval
+        self.ttl = ttl
+        self.size = size
+        self.enabled = enabled
+        self.writes: Dict[UUID, int] = {}
+        self.hot: Set[UUID] = set()
+        self.cold: Set[UUID] = set()
+        self.merged: Dict[UUID, Tuple[float, Dict]] = {}
+        self.films: Dict[UUID, UUID] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Numbers of hot films, films waiting for their shards to be folded and cached films.
+
+        Returns:
+            Dict: Metrics
+        """
+        return {'hot': len(self.hot), 'folding': len(self.cold), 'cached': len(self.merged)}
+
+    def shard_ids(self, film_id: UUID) -> List[UUID]:
+        """IDs of the shards of a film, remembering the film of each shard.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            List: Shard IDs
+        """
+        shard_ids = [uuid5(film_id, str(index)) for index in range(self.shards)]
+        for shard_id in shard_ids:
+            if len(self.films) >= self.size and shard_id not in self.films:
+                self.films.pop(next(iter(self.films)))
+            self.films[shard_id] = film_id
+        return shard_ids
+
+    def shard_id(self, film_id: UUID, user_id: UUID) -> UUID:
+        """ID of the shard keeping the votes of a user for a film.
+
+        Args:
+            film_id: Film ID
+            user_id: User ID
+
+        Returns:
+            UUID: Shard ID
+        """
+        return uuid5(film_id, str(user_id.int % self.shards))
+
+    def film_of(self, shard_id: UUID) -> Optional[UUID]:
+        """Film of a shard whose IDs have been computed recently.
+
+        Args:
+            shard_id: Shard ID
+
+        Returns:
+            Optional[UUID]: Film ID
+        """
+        return self.films.get(shard_id)
+
+    def count(self, film_id: UUID):
+        """Count a rating write of a film.
+
+        Args:
+            film_id: Film ID
+        """
+        self.writes[film_id] = self.writes.get(film_id, 0) + 1
+        self.merged.pop(film_id, None)
+
+    def remember(self, film: Dict) -> Dict:
+        """Cache a film with the votes of its shards.
+
+        Args:
+            film: Film document with the merged votes
+
+        Returns:
+            Dict: Cached film
+        """
+        self.merged.pop(film['_id'], None)
+        if len(self.merged) >= self.size:
+            self.merged.pop(next(iter(self.merged)))
+        self.merged[film['_id']] = (time.monotonic() + self.ttl, film)
+        return film
+
+    async def retrieve(self, film_id: UUID) -> Dict:
+        """Read a film with the votes of its shards, from the cache if it has not expired.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            Dict: Film document with the merged votes
+        """
+        if not self.enabled:
+            return await self.crud.retrieve(collection=MongoCollections.films, doc_id=film_id)
+        entry = self.merged.get(film_id)
+        if entry is not None and entry[0] >= time.monotonic():
+            return entry[1]
+        films = await self.retrieve_many([film_id])
+        return films[0] if films else {}
+
+    async def retrieve_many(self, film_ids: List[UUID]) -> List[Dict]:
+        """Read films with the votes of their shards, caching them.
+
+        Args:
+            film_ids: Film IDs
+
+        Returns:
+            List: Found films with the merged votes in the order of the IDs
+        """
+        if not self.enabled:
+            return await self.crud.retrieve_many(collection=MongoCollections.films, doc_ids=film_ids)
+        owners = {shard_id: film_id for film_id in film_ids for shard_id in self.shard_ids(film_id)}
+        films, shards = await asyncio.gather(
+            self.crud.retrieve_many(collection=MongoCollections.films, doc_ids=film_ids),
+            self.crud.retrieve_many(collection=MongoCollections.shards, doc_ids=list(owners)),
+        )
+        film_shards: Dict[UUID, List[Dict]] = {}
+        for shard in shards:
+            film_shards.setdefault(owners[shard['_id']], []).append(shard)
+        return [self.remember(merge_shards(film, film_shards.get(film['_id'], []))) for film in films]
+
+    async def version(self, film_id: UUID) -> Optional[int]:
+        """Get the version of a film with its shards.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            Optional[int]: Version of the film if it exists
+        """
+        if not self.enabled:
+            return await self.crud.version(collection=MongoCollections.films, doc_id=film_id)
+        return (await self.retrieve(film_id)).get('version')
+
+    async def attach(self, film: Dict) -> Dict:
+        """Add the votes of its shards to a film that has just been written.
+
+        Args:
+            film: Film document
+
+        Returns:
+            Dict: Film document with the merged votes
+        """
+        if not film:
+            return film
+        shards = await self.crud.retrieve_many(collection=MongoCollections.shards, doc_ids=self.shard_ids(film['_id']))
+        return self.remember(merge_shards(film, shards))
+
+    async def rate(self, user_id: UUID, film_id: UUID, score: VotesChoices) -> Dict:
+        """Set the user's rating for a film, replacing the archived vote of the user.
+
+        Args:
+            user_id: User ID
+            film_id: Film ID
+            score: User's rating
+
+        Returns:
+            Dict: Film document with all its votes, empty if the film is not found
+        """
+        return await self.unarchive(await self.add(user_id, film_id, score), user_id)
+
+    async def unrate(self, user_id: UUID, film_id: UUID) -> Dict:
+        """Remove the user's rating for a film, including the archived vote of the user.
+
+        Args:
+            user_id: User ID
+            film_id: Film ID
+
+        Returns:
+            Dict: Film document with all its votes, empty if the film is not found
+        """
+        return await self.unarchive(await self.remove(user_id, film_id), user_id)
+
+    async def unarchive(self, film: Dict, user_id: UUID) -> Dict:
+        """Take the archived vote of a user out of the archive of a film the user has just rated.
+
+        Args:
+            film: Film document with all its votes
+            user_id: User ID
+
+        Returns:
+            Dict: Film document with all its votes and the archived counters without the vote
+        """
+        if not film or not await self.archive.unarchive(film, user_id):
+            return film
+        self.merged.pop(film['_id'], None)
+        return await self.retrieve(film['_id'])
+
+    async def compact(self, film: Dict, before: datetime) -> int:
+        """Move the votes of a film older than the date into the archive, unless the film has shards.
+
+        Args:
+            film: Film document
+            before: Votes older than the time in UTC are archived
+
+        Returns:
+            int: Number of archived votes
+        """
+        if self.enabled and await self.crud.retrieve_many(
+            collection=MongoCollections.shards, doc_ids=self.shard_ids(film['_id']),
+        ):
+            return 0
+        return await self.archive.compact(film, before)
+
+    async def add(self, user_id: UUID, film_id: UUID, score: VotesChoices) -> Dict:
+        """Write the user's vote for a film, in the shard of the user while the film is hot.
+
+        Args:
+            user_id: User ID
+            film_id: Film ID
+            score: User's rating
+
+        Returns:
+            Dict: Film document with all its votes, empty if the film is not found
+        """
+        query = AddRating(user_id=user_id, source_id=film_id, score=score)
+        if not self.enabled:
+            return await self.crud.update(collection=MongoCollections.films, query=query)
+        self.count(film_id)
+        if film_id in self.hot:
+            shard = await self.crud.update(
+                collection=MongoCollections.shards,
+                query=AddRating(
+                    user_id=user_id, source_id=self.shard_id(film_id, user_id), score=score, date=query.date,
+                ),
+            )
+            if shard:
+                return await self.retrieve(film_id)
+            self.hot.discard(film_id)
+        return await self.attach(await self.crud.update(collection=MongoCollections.films, query=query))
+
+    async def remove(self, user_id: UUID, film_id: UUID) -> Dict:
+        """Remove the user's vote for a film, both from the film and from the shard of the user.
+
+        Args:
+            user_id: User ID
+            film_id: Film ID
+
+        Returns:
+            Dict: Film document with all its votes, empty if the film is not found
+        """
+        query = RemoveRating(user_id=user_id, source_id=film_id)
+        if not self.enabled:
+            return await self.crud.update(collection=MongoCollections.films, query=query)
+        self.count(film_id)
+        film, _ = await asyncio.gather(
+            self.crud.update(collection=MongoCollections.films, query=query),
+            self.crud.update(
+                collection=MongoCollections.shards,
+                query=RemoveRating(user_id=user_id, source_id=self.shard_id(film_id, user_id)),
+            ),
+        )
+        return await self.attach(film)
+
+    async def split(self, film_id: UUID):
+        """Create the shards of a film and start writing its votes into them.
+
+        Args:
+            film_id: Film ID
+        """
+        try:
+            await self.crud.create_many(
+                collection=MongoCollections.shards,
+                queries=[CreateShard(shard_id=shard_id, film_id=film_id) for shard_id in self.shard_ids(film_id)],
+            )
+        except Exception as exc:
+            logging.error(exc)
+            return
+        self.hot.add(film_id)
+        self.cold.discard(film_id)
+
+    async def fold(self, film_id: UUID) -> bool:
+        """Fold the shards of a film into the film, logging the errors.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            bool: The shards are folded, otherwise the film or the storage is busy and it is retried later
+        """
+        try:
+            return await self.merge(film_id)
+        except Exception as exc:
+            logging.error(exc)
+            return False
+
+    async def merge(self, film_id: UUID) -> bool:
+        """Merge the votes of the shards of a film into the film and delete the unchanged shards.
+
+        A shard changed after it is read is left for the next fold, its votes
+        already merged into the film are merged again without duplicates.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            bool: The shards are merged, otherwise the film has been changed concurrently
+        """
+        shards = await self.crud.retrieve_many(collection=MongoCollections.shards, doc_ids=self.shard_ids(film_id))
+        film = await self.crud.retrieve(collection=MongoCollections.films, doc_id=film_id)
+        if not shards or not film:
+            return True
+        if not await self.replace(ReplaceVotes(
+            film_id=film_id,
+            votes=merge_shards(film, shards)['rating']['votes'],
+            version=film.get('version', 0),
+            shards_version=sum(shard.get('version', 0) for shard in shards),
+        )):
+            return False
+        await asyncio.gather(*(
+            self.crud.delete(
+                collection=MongoCollections.shards,
+                query=DestroyShard(shard_id=shard['_id'], version=shard.get('version', 0)),
+            )
+            for shard in shards
+        ))
+        return True
+
+    async def replace(self, query: ReplaceVotes) -> bool:
+        """Replace the votes of a film unless its version has changed.
+
+        Args:
+            query: Query model
+
+        Returns:
+            bool: The votes are replaced
+        """
+        try:
+            return bool(await self.crud.update(collection=MongoCollections.films, query=query))
+        except DuplicateKeyError:
+            return False
+
+    async def rebalance(self):
+        """Split the films written faster than the promotion rate and fold the hot films that have calmed down."""
+        writes = self.writes
+        self.writes = {}
+        await asyncio.gather(*(
+            self.split(film_id)
+            for film_id, count in writes.items()
+            if film_id not in self.hot and count >= self.promote * self.interval
+        ))
+        self.cold.update(hot for hot in self.hot if writes.get(hot, 0) < self.demote * self.interval)
+        self.hot -= self.cold
+        await self.fold_all()
+
+    async def fold_all(self):
+        """Fold the shards of the films that are no longer hot, keeping the busy ones for the next check."""
+        cold = list(self.cold)
+        folded = await asyncio.gather(*(self.fold(film_id) for film_id in cold))
+        self.cold.difference_update(film_id for film_id, done in zip(cold, folded) if done)
+
+    async def run(self):
+        """Check the write rates periodically."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.rebalance()
+
+    async def start(self):
+        """Start checking the write rates in the background."""
+        if self.enabled:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop checking the write rates and fold the shards of the hot films."""
+        if self.task:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+        self.cold.update(self.hot)
+        self.hot.clear()
+        await self.fold_all()
+
+
+@lru_cache()
+def get_sharded_votes_service(crud: CRUDService = Depends(get_crud_service)) -> ShardedVotesService:
+    """Create a ShardedVotesService object as a singleton.
+
+    Args:
+        crud: Service for data processing in the data storage
+
+    Returns:
+        ShardedVotesService: Service for the votes of hot films spread over shards
+    """
+    return ShardedVotesService(
+        crud,
+        archive=get_vote_archive_service(crud=crud),
+        shards=CONFIG.sharding.shards,
+        promote=CONFIG.sharding.promote,
+        demote=CONFIG.sharding.demote,
+        interval=CONFIG.sharding.interval,
+        ttl=CONFIG.sharding.ttl,
+        size=CONFIG.cache.size,
+        enabled=CONFIG.sharding.enabled,
+    )
@@ -0,0 +1,329 @@
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from contextlib import suppress
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Depends
+
+from services.crud import CRUDService, get_crud_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from models.documents import merge_shards
+from models.export_queries import ExportFilms
+from models.responses import RatingResponse
+
+MAGIC = b'UGCR'
+HEADER = struct.Struct('<4sId')  # magic, number of films, refresh time
+RECORD = struct.Struct('<16sQIIi')  # film ID, film version, likes, dislikes, average rating
+UUID_SIZE = 16
+NO_AVERAGE = -1
+LOCK_MODE = 0o644
+
+
+class SnapshotKeys:
+    """Film IDs of the records of a mapped snapshot, as a sorted sequence for binary search."""
+
+    def __init__(self, snapshot: mmap.mmap, count: int):
+        """Initialize the sequence over the mapped file.
+
+        Args:
+            snapshot: Mapped snapshot file
+            count: Number of records
+        """
+        self.snapshot = snapshot
+        self.count = count
+
+    def __len__(self) -> int:
+        """Number of records.
+
+        Returns:
+            int: Number of records
+        """
+        return self.count
+
+    def __getitem__(self, index: int) -> bytes:
+        """Film ID of a record.
+
+        Args:
+            index: Record index
+
+        Returns:
+            bytes: Film ID
+        """
+        offset = HEADER.size + index * RECORD.size
+        return self.snapshot[offset:offset + UUID_SIZE]
+
+
+def pack_rating(film: Dict) -> bytes:
+    """Record of the rating of a film in the snapshot.
+
+    Args:
+        film: Film document with the votes of its shards
+
+    Returns:
+        bytes: Packed record
+    """
+    rating = RatingResponse.prepare(film.get('rating', {}))
+    average_rating = rating.get('average_rating')
+    return RECORD.pack(
+        film['_id'].bytes,
+        film.get('version', 0),
+        rating.get('likes', 0),
+        rating.get('dislikes', 0),
+        NO_AVERAGE if average_rating is None else average_rating,
+    )
+
+
+class RatingSnapshotService:  # noqa: WPS214, WPS230 the service keeps the state of the mapped snapshot
+    """Class sharing a snapshot of the ratings of all films between the workers of a node in a memory-mapped file.
+
+    Every worker would otherwise cache ratings on its own, multiplying the memory
+    and the cold misses. The worker holding the lock file next to the snapshot
+    reads the ratings of all films with the votes of their shards every interval,
+    and replaces the snapshot with an array of fixed-size records sorted by film ID.
+    The other workers map the file and find a rating by binary search over the
+    mapped records, without reading the file into memory, and map it again once
+    it has been replaced. If the lock holder exits, another worker takes the lock.
+
+    A snapshot older than the staleness bound is not used, and neither is the
+    rating of a film changed by the worker since the snapshot was taken, so such
+    ratings are read from the storage.
+    """
+
+    def __init__(  # noqa: WPS211 one argument per setting of the service
+        self, crud: CRUDService, path: str, interval: float, staleness: float, batch: int, enabled: bool,
+    ):
+        """When initializing the class, it accepts the data processing service and the snapshot settings.
+
+        Args:
+            crud: Service for data processing in the data storage
+            path: Path of the snapshot file, preferably in shared memory
+            interval: Time between refreshes of the snapshot in seconds
+            staleness: Maximum age of a used snapshot in seconds
+            batch: Number of films read from the storage at once
+            enabled: Serve ratings from the snapshot
+        """
+        self.crud = crud
+        self.path = path
+        self.interval = interval
+        self.staleness = staleness
+        self.batch = batch
+        self.enabled = enabled
+        self.lock: Optional[int] = None
+        self.snapshot: Optional[mmap.mmap] = None
+        self.inode = 0
+        self.count = 0
+        self.refreshed: float = 0
+        self.checked: float = 0
+        self.changed: Dict[UUID, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def metrics(self) -> Dict:
+        """Lock holding, number of films and age of the snapshot, and the numbers of ratings served from it.
+
+        Returns:
+            Dict: Metrics
+        """
+        return {
+            'leader': self.lock is not None,
+            'films': self.count,
+            'age': round(time.time() - self.refreshed, 3) if self.snapshot else None,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def lookup(self, film_id: UUID) -> Optional[Tuple[int, Dict]]:
+        """Version and rating of a film from the snapshot.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            Optional[Tuple]: Film version and rating, or None if the snapshot is stale or has no current rating
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        if now - max(self.refreshed, self.checked) >= self.interval:
+            self.checked = now
+            self.load()
+        found = None
+        if now - self.refreshed <= self.staleness and self.changed.get(film_id, 0) < self.refreshed:
+            found = self.find(film_id)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def invalidate(self, film_id: UUID):
+        """Stop serving the rating of a film changed by the worker until the next snapshot.
+
+        Args:
+            film_id: Film ID
+        """
+        if self.enabled:
+            self.changed[film_id] = time.time()
+
+    def find(self, film_id: UUID) -> Optional[Tuple[int, Dict]]:
+        """Find the record of a film by binary search over the mapped snapshot.
+
+        Args:
+            film_id: Film ID
+
+        Returns:
+            Optional[Tuple]: Film version and rating, or None if the film is not in the snapshot
+        """
+        if self.snapshot is None:
+            return None
+        keys = SnapshotKeys(self.snapshot, self.count)
+        index = bisect_left(keys, film_id.bytes)
+        if index == self.count or keys[index] != film_id.bytes:
+            return None
+        record = RECORD.unpack_from(self.snapshot, HEADER.size + index * RECORD.size)
+        return record[1], {
+            'likes': record[2],
+            'dislikes': record[3],
+            'average_rating': None if record[4] == NO_AVERAGE else record[4],
+        }
+
+    def load(self):
+        """Map the snapshot file if it has been replaced since it was mapped."""
+        with suppress(FileNotFoundError):
+            with open(self.path, 'rb') as snapshot_file:
+                self.map(snapshot_file)
+
+    def map(self, snapshot_file: BinaryIO):
+        """Map a new snapshot file, unmapping the previous one.
+
+        Args:
+            snapshot_file: Snapshot file open for reading
+        """
+        inode = os.fstat(snapshot_file.fileno()).st_ino
+        if inode == self.inode:
+            return
+        snapshot = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, refreshed = HEADER.unpack_from(snapshot)
+        if magic != MAGIC or len(snapshot) < HEADER.size + count * RECORD.size:
+            snapshot.close()
+            return
+        if self.snapshot is not None:
+            self.snapshot.close()
+        self.snapshot = snapshot
+        self.inode = inode
+        self.count = count
+        self.refreshed = refreshed
+        self.prune()
+
+    def prune(self):
+        """Forget the films changed by the worker before the mapped snapshot was taken."""
+        self.changed = {film_id: changed for film_id, changed in self.changed.items() if changed >= self.refreshed}
+
+    def elect(self) -> bool:
+        """Take the lock of the snapshot file, unless another worker holds it.
+
+        Returns:
+            bool: The worker holds the lock and refreshes the snapshot
+        """
+        if self.lock is not None:
+            return True
+        lock = os.open('{0}.lock'.format(self.path), os.O_RDWR | os.O_CREAT, LOCK_MODE)
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock)
+            return False
+        self.lock = lock
+        return True
+
+    async def refresh(self):
+        """Read the ratings of all films with the votes of their shards and replace the snapshot file.
+
+        The snapshot is dated by the start of the reading, so its age bounds the staleness of the ratings.
+        """
+        refreshed = time.time()
+        shards: Dict[UUID, List[Dict]] = {}
+        async for shard in self.crud.stream(collection=MongoCollections.shards, query=ExportFilms(batch=self.batch)):
+            shards.setdefault(shard.get('film_id'), []).append(shard)
+        records = [
+            pack_rating(merge_shards(film, shards.get(film['_id'], [])))
+            async for film in self.crud.stream(collection=MongoCollections.films, query=ExportFilms(batch=self.batch))
+        ]
+        self.write(b''.join(records), refreshed)
+        self.load()
+
+    def write(self, records: bytes, refreshed: float):
+        """Replace the snapshot file at once, so that the workers never map a partly written one.
+
+        Args:
+            records: Packed records in the order of film IDs
+            refreshed: Time of the snapshot
+        """
+        path = '{0}.{1}'.format(self.path, os.getpid())
+        with open(path, 'wb') as snapshot_file:
+            snapshot_file.write(HEADER.pack(MAGIC, len(records) // RECORD.size, refreshed))
+            snapshot_file.write(records)
+        os.replace(path, self.path)
+
+    async def update(self):
+        """Refresh the snapshot if the worker holds the lock, logging the errors."""
+        try:
+            await self.refresh()
+        except Exception as exc:
+            logging.error(exc)
+
+    async def run(self):
+        """Refresh the snapshot periodically while the worker holds the lock, trying to take it otherwise."""
+        while True:
+            if self.elect():
+                await self.update()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        """Start refreshing the snapshot in the background."""
+        if self.enabled:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop refreshing the snapshot, release the lock and unmap the snapshot."""
+        if self.task:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+        if self.lock is not None:
+            os.close(self.lock)
+            self.lock = None
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+
+@lru_cache()
+def get_rating_snapshot_service(crud: CRUDService = Depends(get_crud_service)) -> RatingSnapshotService:
+    """Create a RatingSnapshotService object as a singleton.
+
+    Args:
+        crud: Service for data processing in the data storage
+
+    Returns:
+        RatingSnapshotService: Service for the snapshot of film ratings shared by the workers
+    """
+    return RatingSnapshotService(
+        crud,
+        path=CONFIG.snapshot.path,
+        interval=CONFIG.snapshot.interval,
+        staleness=CONFIG.snapshot.staleness,
+        batch=CONFIG.export.batch,
+        enabled=CONFIG.snapshot.enabled,
+    )
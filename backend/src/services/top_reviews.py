@@ -0,0 +1,214 @@
+import asyncio
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Depends
+from pymongo.errors import DuplicateKeyError
+
+from services.crud import CRUDService, get_crud_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from models.base import SortChoices
+from models.documents import score_review, sort_documents
+from models.review_queries import ListReview, ReplaceTopReviews
+
+ORDERING = ListReview.orderings[SortChoices.top]
+RETRIES = 3
+
+
+def top_entry(review: Dict) -> Dict:
+    """Entry of a scored review in the top list: its ID and the fields it is sorted by.
+
+    Args:
+        review: Review with its rating
+
+    Returns:
+        Dict: List entry
+    """
+    return {field: review.get(field) for field in ORDERING}
+
+
+class TopReviewsService:  # noqa: WPS214 the service implements the storage operations of the lists
+    """Class for serving the first pages of the top reviews of films from materialized lists.
+
+    The list of a film keeps the IDs and sort fields of its top reviews and is
+    always a prefix of the reviews in the top order. It is updated incrementally
+    when a review is created, deleted or rated, replacing it only if its version
+    has not changed, and is rebuilt with the reviews aggregation when it is too
+    short for the requested page. Deeper pages are served by the aggregation.
+    Since every change of a review replaces the list, even when the lists are
+    disabled, its version is the version of all the reviews of the film.
+    """
+
+    def __init__(self, crud: CRUDService, size: int, enabled: bool = True):
+        """When initializing the class, it accepts the data processing service and the list size.
+
+        Args:
+            crud: Service for data processing in the data storage
+            size: Maximum number of reviews in a list
+            enabled: Use the lists, otherwise serve all pages by the aggregation
+        """
+        self.crud = crud
+        self.size = size
+        self.enabled = enabled
+
+    async def search(self, film_id: UUID, offset: int, limit: int) -> List[Dict]:
+        """Retrieve a page of the top reviews of a film.
+
+        Args:
+            film_id: Film ID
+            offset: Number of reviews to skip
+            limit: Number of reviews on the page
+
+        Returns:
+            List: List of reviews
+        """
+        if not self.enabled or offset + limit > self.size:
+            return await self.crud.search(
+                collection=MongoCollections.reviews,
+                query=ListReview(film_id=film_id, sort=SortChoices.top, offset=offset, limit=limit),
+            )
+        top = await self.crud.retrieve(collection=MongoCollections.top_reviews, doc_id=film_id)
+        entries = top.get('reviews', [])
+        if top.get('complete') or offset + limit <= len(entries):
+            return await self.fetch(film_id, entries[offset:offset + limit])
+        reviews = await self.crud.search(
+            collection=MongoCollections.reviews,
+            query=ListReview(film_id=film_id, sort=SortChoices.top, offset=0, limit=self.size),
+        )
+        await self.replace(ReplaceTopReviews(
+            film_id=film_id,
+            reviews=[top_entry(review) for review in reviews],
+            complete=len(reviews) < self.size,
+            version=top.get('version', 0),
+        ))
+        return reviews[offset:offset + limit]
+
+    async def version(self, film_id: UUID, read: bool = True) -> Optional[int]:
+        """Get the version of the list of a film, which changes with any review of the film.
+
+        Args:
+            film_id: Film ID
+            read: Read the version from the data storage if it is not cached
+
+        Returns:
+            Optional[int]: List version if the list exists and, unless read, is cached
+        """
+        return await self.crud.version(collection=MongoCollections.top_reviews, doc_id=film_id, read=read)
+
+    async def save(self, review: Dict):
+        """Add a new review to the list of its film or move it there after its rating has changed.
+
+        Args:
+            review: Review document
+        """
+        await self.change(review, top_entry(score_review(review, {})))
+
+    async def remove(self, review: Dict):
+        """Remove a review from the list of its film.
+
+        Args:
+            review: Review document
+        """
+        await self.change(review, None)
+
+    async def change(self, review: Dict, entry: Optional[Dict], retries: int = RETRIES):
+        """Place a review in the list of its film, retrying if the list is changed concurrently.
+
+        Every change replaces the list, even if the review is not in it, so that
+        a list rebuilt from reviews read before the change is not saved. If the
+        list keeps changing, it is emptied to be rebuilt. If the lists are
+        disabled, the list is kept empty and only its version is incremented.
+
+        Args:
+            review: Review document
+            entry: New list entry of the review, or None to remove it
+            retries: Number of attempts left
+        """
+        if review.get('film_id') is None:
+            return
+        if not self.enabled:
+            await self.replace(ReplaceTopReviews(film_id=review['film_id'], reviews=[], complete=False))
+            return
+        top = await self.crud.retrieve(collection=MongoCollections.top_reviews, doc_id=review['film_id'])
+        entries, complete = self.place(top.get('reviews', []), top.get('complete', False), review['_id'], entry)
+        if await self.replace(ReplaceTopReviews(
+            film_id=review['film_id'], reviews=entries, complete=complete, version=top.get('version', 0),
+        )):
+            return
+        if retries > 1:
+            await self.change(review, entry, retries - 1)
+        else:
+            await self.replace(ReplaceTopReviews(film_id=review['film_id'], reviews=[], complete=False))
+
+    def place(self, entries: List[Dict], complete: bool, review_id: UUID, entry: Optional[Dict]) -> Tuple[List, bool]:
+        """Place a review entry in the list, keeping it a prefix of the top order.
+
+        Unless the list contains all the reviews of the film, a review that would
+        be the last one is left out, since other reviews might rank above it.
+
+        Args:
+            entries: List entries
+            complete: The list contains all the reviews of the film
+            review_id: Review ID
+            entry: New list entry of the review, or None to remove it
+
+        Returns:
+            Tuple: New list entries and whether the list is complete
+        """
+        placed = [listed for listed in entries if listed['_id'] != review_id]
+        if entry is not None:
+            placed.append(entry)
+            sort_documents(placed, ORDERING)
+            if not complete and placed[-1] is entry:
+                placed.pop()
+        if len(placed) > self.size:
+            return placed[:self.size], False
+        return placed, complete
+
+    async def fetch(self, film_id: UUID, entries: List[Dict]) -> List[Dict]:
+        """Read the reviews of the list entries and add their ratings, as the reviews aggregation does.
+
+        Args:
+            film_id: Film ID
+            entries: List entries
+
+        Returns:
+            List: List of reviews
+        """
+        if not entries:
+            return []
+        film, reviews = await asyncio.gather(
+            self.crud.retrieve(collection=MongoCollections.films, doc_id=film_id),
+            self.crud.retrieve_many(collection=MongoCollections.reviews, doc_ids=[entry['_id'] for entry in entries]),
+        )
+        film_scores = {vote['user_id']: vote['score'] for vote in film.get('rating', {}).get('votes', [])}
+        return [score_review(review, film_scores) for review in reviews]
+
+    async def replace(self, query: ReplaceTopReviews) -> bool:
+        """Replace a list unless its version has changed.
+
+        Args:
+            query: Query model
+
+        Returns:
+            bool: The list is replaced
+        """
+        try:
+            return bool(await self.crud.update(collection=MongoCollections.top_reviews, query=query))
+        except DuplicateKeyError:
+            return False
+
+
+@lru_cache()
+def get_top_reviews_service(crud: CRUDService = Depends(get_crud_service)) -> TopReviewsService:
+    """Create a TopReviewsService object as a singleton.
+
+    Args:
+        crud: Service for data processing in the data storage
+
+    Returns:
+        TopReviewsService: Service for the top reviews of films
+    """
+    return TopReviewsService(crud, size=CONFIG.top.size, enabled=CONFIG.top.enabled)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Depends
+
+from services.crud import CRUDService, get_crud_service
+from core.config import CONFIG
+from core.enums import MongoCollections
+from models.ranking_queries import CountActivity, ListTrending
+
+
+class TrendingService:  # noqa: WPS214, WPS230 the service keeps the state of the activity counters
+    """Class for ranking films by their recent activity from time-bucketed counters.
+
+    Rating and bookmark events are counted in memory by film and time bucket
+    and flushed periodically to the activity collection, incrementing a single
+    counter per film and time bucket, so that an event costs no storage write.
+    Films are ranked by the sum of their counters in the window, each halved
+    for every half-life of its age, so that a ranking reads only the counters
+    and never the votes. Rankings are cached until the current bucket ends.
+    """
+
+    def __init__(self, crud: CRUDService, bucket: int, window: int, halflife: float, interval: float):
+        """When initializing the class, it accepts the data processing service and the counter settings.
+
+        Args:
+            crud: Service for data processing in the data storage
+            bucket: Length of a time bucket in seconds
+            window: Age of the oldest counted events in seconds
+            halflife: Age in seconds at which the counts are halved
+            interval: Time between flushes of the counters in seconds
+        """
+        self.crud = crud
+        self.bucket = bucket
+        self.window = window
+        self.halflife = halflife
+        self.interval = interval
+        self.counts: Dict[Tuple[datetime, UUID], int] = {}
+        self.rankings: Dict[Tuple[datetime, int, int], List[Dict]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def current(self) -> datetime:
+        """Start of the current time bucket.
+
+        Returns:
+            datetime: Date and time in UTC
+        """
+        now = int(time.time())
+        return datetime.utcfromtimestamp(now - now % self.bucket)
+
+    def record(self, film_id: UUID):
+        """Count a rating or bookmark event of a film in the current time bucket.
+
+        Args:
+            film_id: Film ID
+        """
+        key = (self.current(), film_id)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    async def search(self, offset: int, limit: int) -> List[Dict]:
+        """Retrieve a page of the films with the most recent activity.
+
+        The time is rounded down to the current bucket, so that a page is
+        ranked by a single storage query per bucket and kept until the bucket
+        ends, when the pages of the previous buckets are dropped.
+
+        Args:
+            offset: Number of films to skip
+            limit: Number of films on the page
+
+        Returns:
+            List: Film IDs with their trending scores
+        """
+        now = self.current()
+        key = (now, offset, limit)
+        if key not in self.rankings:
+            ranking = await self.crud.search(
+                collection=MongoCollections.activity,
+                query=ListTrending(
+                    now=now,
+                    since=now - timedelta(seconds=self.window),
+                    halflife=self.halflife,
+                    offset=offset,
+                    limit=limit,
+                ),
+            )
+            self.rankings = {cached: page for cached, page in self.rankings.items() if cached[0] >= now}
+            self.rankings[key] = ranking
+        return self.rankings[key]
+
+    async def flush(self):
+        """Write the counters to the data storage, keeping them for the next flush if the write fails."""
+        counts = self.counts
+        self.counts = {}
+        if not counts:
+            return
+        try:
+            await self.crud.create_many(
+                collection=MongoCollections.activity,
+                queries=[CountActivity(film_id, bucket, count) for (bucket, film_id), count in counts.items()],
+            )
+        except Exception as exc:
+            logging.error(exc)
+            self.restore(counts)
+
+    def restore(self, counts: Dict[Tuple[datetime, UUID], int]):
+        """Add back the counters of a failed flush, except for the time buckets that have left the window.
+
+        Args:
+            counts: Counters by time bucket and film ID
+        """
+        since = self.current() - timedelta(seconds=self.window)
+        for key, count in counts.items():
+            if key[0] >= since:
+                self.counts[key] = self.counts.get(key, 0) + count
+
+    async def run(self):
+        """Flush the counters periodically."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def start(self):
+        """Start flushing the counters in the background."""
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop flushing the counters in the background and flush the remaining ones."""
+        if self.task:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+        await self.flush()
+
+
+@lru_cache()
+def get_trending_service(crud: CRUDService = Depends(get_crud_service)) -> TrendingService:
+    """Create a TrendingService object as a singleton.
+
+    Args:
+        crud: Service for data processing in the data storage
+
+    Returns:
+        TrendingService: Service for the trending films
+    """
+    return TrendingService(
+        crud,
+        bucket=CONFIG.trending.bucket,
+        window=CONFIG.trending.window,
+        halflife=CONFIG.trending.halflife,
+        interval=CONFIG.trending.interval,
+    )
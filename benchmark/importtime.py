@@ -0,0 +1,116 @@
+"""Import time budget of the UGC API worker.
+
+Imports the API application in fresh interpreters with `-X importtime`, which
+is what a worker does before serving its first request, and reports the total
+import time and the slowest modules as JSON. Exits with an error if the median
+total exceeds the budget, so that slower worker boots are noticed.
+
+Usage:
+    python importtime.py --repeat 5 --budget 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess  # noqa: S404
+import sys
+from typing import Dict, List
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'src')
+IMPORT_PREFIX = 'import time:'
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Parse the cumulative import times of modules from the `-X importtime` output.
+
+    Args:
+        stderr: Standard error of the interpreter
+
+    Returns:
+        Dict: Cumulative import time in microseconds by module
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith(IMPORT_PREFIX):
+            continue
+        _, total, module = line[len(IMPORT_PREFIX):].split('|')
+        if total.strip().isdigit():
+            cumulative[module.strip()] = int(total)
+    return cumulative
+
+
+def measure_import(module: str) -> Dict[str, int]:
+    """Import a module in a fresh interpreter.
+
+    Args:
+        module: Imported module
+
+    Raises:
+        RuntimeError: An error if the import fails
+
+    Returns:
+        Dict: Cumulative import time in microseconds by module
+    """
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', 'import {0}'.format(module)],
+        cwd=SOURCE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.splitlines()[-1])
+    return parse_importtime(completed.stderr)
+
+
+def report(runs: List[Dict[str, int]], module: str, top: int, budget: float) -> Dict:
+    """Summarize the import times of the runs.
+
+    Args:
+        runs: Cumulative import times of the runs
+        module: Imported module
+        top: Number of the slowest modules to report
+        budget: Budget of the median total import time in milliseconds
+
+    Returns:
+        Dict: Total import time and the slowest modules in milliseconds
+    """
+    totals = [run[module] / 1e3 for run in runs]
+    slowest = {
+        name: round(statistics.median(run.get(name, 0) for run in runs) / 1e3, 3)
+        for name in sorted(runs[0], key=runs[0].get, reverse=True)[1:top + 1]
+    }
+    return {
+        'runs': len(runs),
+        'min_ms': round(min(totals), 3),
+        'median_ms': round(statistics.median(totals), 3),
+        'max_ms': round(max(totals), 3),
+        'budget_ms': budget,
+        'within_budget': statistics.median(totals) <= budget,
+        'slowest_ms': slowest,
+    }
+
+
+def main():
+    """Measure the import time and print the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='main', help='Module imported by a worker')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Number of the slowest modules to report')
+    parser.add_argument('--budget', type=float, default=500, help='Budget of the median import time in ms')
+    parser.add_argument('--output', help='File for the JSON report (stdout by default)')
+    args = parser.parse_args()
+    runs = [measure_import(args.module) for _ in range(args.repeat)]
+    results = report(runs, args.module, args.top, args.budget)
+    output = json.dumps({'params': vars(args), 'importtime': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            report_file.write(output)
+    else:
+        print(output)
+    if not results['within_budget']:
+        sys.exit('Import time {0} ms exceeds the budget of {1} ms'.format(results['median_ms'], args.budget))
+
+
+if __name__ == '__main__':
+    main()
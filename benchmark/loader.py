@@ -0,0 +1,371 @@
+"""Parallel loader of synthetic benchmark data into the UGC MongoDB.
+
+Generates users with bookmarks, films with votes and reviews with votes
+matching the collections created by `backend/src/db/mongo.py`. Identifiers
+are generated as UUID bytes with NumPy, film popularity follows a Zipf
+distribution, and documents are inserted by a pool of processes with
+unordered bulk inserts. The identifiers are written to a manifest directory
+for load generators to sample from.
+
+Usage:
+    python loader.py --users 10000000 --films 100000 --reviews 1000000 --processes 8 --manifest manifest
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from bson.binary import UUID_SUBTYPE, Binary
+from pymongo import MongoClient
+from pymongo.database import Database
+
+LIKE, DISLIKE = 10, 0
+EPOCH = datetime(2020, 1, 1)
+
+arrays: Dict[str, np.ndarray] = {}
+settings: Dict = {}
+database: Optional[Database] = None
+
+
+def gen_uuids(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Generate random version 4 UUIDs as a byte matrix.
+
+    Args:
+        rng: Random generator
+        size: Number of UUIDs
+
+    Returns:
+        np.ndarray: Array of shape (size, 16) with UUID bytes
+    """
+    uuids = rng.integers(0, 256, size=(size, 16), dtype=np.uint8)
+    uuids[:, 6] = (uuids[:, 6] & 0x0F) | 0x40
+    uuids[:, 8] = (uuids[:, 8] & 0x3F) | 0x80
+    return uuids
+
+
+def to_binaries(uuids: np.ndarray) -> List[Binary]:
+    """Convert a UUID byte matrix to BSON binaries in the standard representation.
+
+    Args:
+        uuids: Array of shape (size, 16) with UUID bytes
+
+    Returns:
+        List: BSON binaries
+    """
+    raw = uuids.tobytes()
+    return [Binary(raw[index:index + 16], UUID_SUBTYPE) for index in range(0, len(raw), 16)]
+
+
+def zipf_weights(rng: np.random.Generator, size: int, exponent: float) -> np.ndarray:
+    """Assign Zipf-distributed popularity to items in random order.
+
+    Args:
+        rng: Random generator
+        size: Number of items
+        exponent: Zipf exponent, the larger it is the hotter the top items are
+
+    Returns:
+        np.ndarray: Probabilities of the items
+    """
+    weights = 1 / np.arange(1, size + 1) ** exponent
+    weights /= weights.sum()
+    return rng.permutation(weights)
+
+
+def split(counts: np.ndarray, values: np.ndarray) -> List[np.ndarray]:
+    """Split a flat array of values into groups of the given sizes.
+
+    Args:
+        counts: Group sizes
+        values: Flat values
+
+    Returns:
+        List: Groups of values
+    """
+    return np.split(values, np.cumsum(counts)[:-1])
+
+
+def gen_votes(rng: np.random.Generator, count: int) -> List[Dict]:
+    """Generate unique votes of random users.
+
+    Args:
+        rng: Random generator
+        count: Expected number of votes
+
+    Returns:
+        List: Votes as stored in the rating of a film or review
+    """
+    voters = np.unique(rng.integers(0, len(arrays['users']), size=count))
+    scores = np.where(rng.random(len(voters)) < settings['like_ratio'], LIKE, DISLIKE).tolist()
+    return [
+        {'user_id': user_id, 'score': score}
+        for user_id, score in zip(to_binaries(arrays['users'][voters]), scores)
+    ]
+
+
+def vote_counts(weights: np.ndarray, mean: float) -> np.ndarray:
+    """Distribute votes over documents in proportion to their popularity.
+
+    Args:
+        weights: Popularity of the documents
+        mean: Mean number of votes per document
+
+    Returns:
+        np.ndarray: Number of votes per document
+    """
+    counts = np.rint(weights * mean * len(weights)).astype(np.int64)
+    return np.clip(counts, 0, min(settings['max_votes'], len(arrays['users'])))
+
+
+def users_docs(rng: np.random.Generator, start: int, stop: int) -> List[Dict]:
+    """Generate users with bookmarks of popular films.
+
+    Args:
+        rng: Random generator
+        start: First user index
+        stop: Last user index (exclusive)
+
+    Returns:
+        List: User documents
+    """
+    counts = rng.poisson(settings['bookmarks'], size=stop - start)
+    films = rng.choice(len(arrays['films']), size=counts.sum(), p=arrays['popularity'])
+    bookmarks = [to_binaries(arrays['films'][np.unique(group)]) for group in split(counts, films)]
+    return [
+        {'_id': user_id, 'bookmarks': [{'film_id': film_id} for film_id in group]}
+        for user_id, group in zip(to_binaries(arrays['users'][start:stop]), bookmarks)
+    ]
+
+
+def films_docs(rng: np.random.Generator, start: int, stop: int) -> List[Dict]:
+    """Generate films with votes proportional to their popularity.
+
+    Args:
+        rng: Random generator
+        start: First film index
+        stop: Last film index (exclusive)
+
+    Returns:
+        List: Film documents
+    """
+    counts = vote_counts(arrays['popularity'], settings['film_votes'])[start:stop]
+    return [
+        {'_id': film_id, 'rating': {'votes': gen_votes(rng, count)}}
+        for film_id, count in zip(to_binaries(arrays['films'][start:stop]), counts.tolist())
+    ]
+
+
+def reviews_docs(rng: np.random.Generator, start: int, stop: int) -> List[Dict]:
+    """Generate reviews of popular films with votes.
+
+    Args:
+        rng: Random generator
+        start: First review index
+        stop: Last review index (exclusive)
+
+    Returns:
+        List: Review documents
+    """
+    size = stop - start
+    counts = rng.poisson(settings['review_votes'], size=size).tolist()
+    pub_dates = rng.integers(0, settings['days'] * 86400, size=size).tolist()
+    docs = zip(
+        to_binaries(arrays['reviews'][start:stop]),
+        to_binaries(arrays['users'][arrays['review_authors'][start:stop]]),
+        to_binaries(arrays['films'][arrays['review_films'][start:stop]]),
+        pub_dates,
+        counts,
+    )
+    return [
+        {
+            '_id': review_id,
+            'author': author,
+            'film_id': film_id,
+            'text': 'Synthetic review',
+            'pub_date': EPOCH + timedelta(seconds=seconds),
+            'rating': {'votes': gen_votes(rng, count)},
+        }
+        for review_id, author, film_id, seconds, count in docs
+    ]
+
+
+GENERATORS = {
+    'users': users_docs,
+    'films': films_docs,
+    'reviews': reviews_docs,
+}
+
+
+def init_worker(manifest: str, options: Dict):
+    """Open the manifest arrays and a MongoDB connection in a worker process.
+
+    Args:
+        manifest: Manifest directory
+        options: Generation settings
+    """
+    global database
+    settings.update(options)
+    database = MongoClient(options['host'], options['port'], uuidRepresentation='standard')[options['db']]
+    for name in ('users', 'films', 'popularity', 'reviews', 'review_films', 'review_authors'):
+        arrays[name] = np.load(os.path.join(manifest, '{0}.npy'.format(name)), mmap_mode='r')
+
+
+def insert_chunk(task: Tuple[str, int, int]) -> Tuple[str, int]:
+    """Generate a chunk of documents and insert them with an unordered bulk insert.
+
+    Args:
+        task: Collection name, first and last (exclusive) document index
+
+    Returns:
+        Tuple: Collection name and number of inserted documents
+    """
+    collection, start, stop = task
+    rng = np.random.default_rng([settings['seed'], list(GENERATORS).index(collection), start])
+    docs = GENERATORS[collection](rng, start, stop)
+    database[collection].insert_many(docs, ordered=False, bypass_document_validation=settings['bypass_validation'])
+    return collection, len(docs)
+
+
+def write_manifest(args: argparse.Namespace) -> Dict[str, int]:
+    """Generate identifiers of all documents and save them to the manifest directory.
+
+    Args:
+        args: Command line arguments
+
+    Returns:
+        Dict: Number of documents per collection
+    """
+    rng = np.random.default_rng(args.seed)
+    os.makedirs(args.manifest, exist_ok=True)
+    popularity = zipf_weights(rng, args.films, args.zipf)
+    review_films = rng.choice(args.films, size=args.reviews, p=popularity)
+    review_authors = rng.integers(0, args.users, size=args.reviews)
+    pairs = np.unique(review_films.astype(np.int64) * args.users + review_authors, return_index=True)[1]
+    review_films, review_authors = review_films[np.sort(pairs)], review_authors[np.sort(pairs)]
+    manifest = {
+        'users': gen_uuids(rng, args.users),
+        'films': gen_uuids(rng, args.films),
+        'popularity': popularity,
+        'reviews': gen_uuids(rng, len(review_films)),
+        'review_films': review_films.astype(np.int32),
+        'review_authors': review_authors.astype(np.int32),
+    }
+    for name, array in manifest.items():
+        np.save(os.path.join(args.manifest, '{0}.npy'.format(name)), array)
+    counts = {name: len(manifest[name]) for name in GENERATORS}
+    with open(os.path.join(args.manifest, 'manifest.json'), 'w') as output:
+        json.dump({'created': datetime.now().isoformat(), 'counts': counts, 'params': vars(args)}, output, indent=2)
+    return counts
+
+
+def create_collections(args: argparse.Namespace) -> str:
+    """Create the collections with validators and indexes exactly as the API does on startup.
+
+    Args:
+        args: Command line arguments
+
+    Returns:
+        str: Database name
+    """
+    os.environ['MONGO_HOST'] = args.host
+    os.environ['MONGO_PORT'] = str(args.port)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'src'))
+    from db import mongo  # noqa: WPS433
+
+    if args.drop:
+        client = MongoClient(args.host, args.port)
+        for name in GENERATORS:
+            client['ugc_database'].drop_collection(name)
+        client.close()
+
+    async def prepare() -> str:
+        await mongo.start()
+        await mongo.stop()
+        return mongo.mongo.name
+
+    return asyncio.run(prepare())
+
+
+def tasks(counts: Dict[str, int], chunk: int) -> Iterator[Tuple[str, int, int]]:
+    """Split the collections into chunks for the worker processes.
+
+    Args:
+        counts: Number of documents per collection
+        chunk: Number of documents per bulk insert
+
+    Yields:
+        Tuple: Collection name, first and last (exclusive) document index
+    """
+    for collection, count in counts.items():
+        for start in range(0, count, chunk):
+            yield collection, start, min(start + chunk, count)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=27017)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--films', type=int, default=10000)
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--bookmarks', type=float, default=5, help='Mean number of bookmarks per user')
+    parser.add_argument('--film-votes', type=float, default=100, help='Mean number of votes per film')
+    parser.add_argument('--review-votes', type=float, default=5, help='Mean number of votes per review')
+    parser.add_argument('--max-votes', type=int, default=100000, help='Votes limit per document')
+    parser.add_argument('--like-ratio', type=float, default=0.7)
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of film popularity')
+    parser.add_argument('--days', type=int, default=365, help='Period of review publication dates')
+    parser.add_argument('--chunk', type=int, default=1000, help='Documents per bulk insert')
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--manifest', default='manifest', help='Directory for the ID manifest')
+    parser.add_argument('--drop', action='store_true', help='Drop the collections before loading')
+    parser.add_argument('--bypass-validation', action='store_true', help='Skip the collections validators')
+    return parser.parse_args()
+
+
+def main():
+    """Generate the manifest and load the documents in parallel."""
+    args = parse_args()
+    started = time.perf_counter()
+    counts = write_manifest(args)
+    options = {
+        'host': args.host,
+        'port': args.port,
+        'db': create_collections(args),
+        'seed': args.seed,
+        'bookmarks': args.bookmarks,
+        'film_votes': args.film_votes,
+        'review_votes': args.review_votes,
+        'max_votes': args.max_votes,
+        'like_ratio': args.like_ratio,
+        'days': args.days,
+        'bypass_validation': args.bypass_validation,
+    }
+    inserted = dict.fromkeys(counts, 0)
+    with Pool(args.processes, initializer=init_worker, initargs=(args.manifest, options)) as pool:
+        for collection, count in pool.imap_unordered(insert_chunk, tasks(counts, args.chunk)):
+            inserted[collection] += count
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'inserted': inserted,
+        'seconds': round(elapsed, 2),
+        'docs_per_second': round(sum(inserted.values()) / elapsed, 2),
+        'manifest': os.path.abspath(args.manifest),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,483 @@
+"""HTTP load test for every route of the UGC API.
+
+Drives each route declared in `backend/src/api/urls.py` with a fixed number
+of concurrent clients against a database seeded by `loader.py`, sampling
+users, films and reviews from its ID manifest, and reports throughput and
+latency percentiles as JSON. Live rating streams never end, so their latency
+is the time to the first event, after which the stream is closed.
+
+Usage:
+    python loadtest.py --manifest manifest --concurrency 32 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import httpx
+import jwt
+import numpy as np
+
+
+class Dataset:
+    """Identifiers of the loaded documents, sampled from the manifest written by `loader.py`."""
+
+    def __init__(self, manifest: str, secret_key: str, seed: int):
+        """Open the manifest arrays without reading them into memory.
+
+        Args:
+            manifest: Manifest directory
+            secret_key: Key for signing user tokens
+            seed: Random seed
+        """
+        self.secret_key = secret_key
+        self.rng = np.random.default_rng(seed)
+        self.tokens: Dict[UUID, str] = {}
+        arrays = {
+            name: np.load(os.path.join(manifest, '{0}.npy'.format(name)), mmap_mode='r')
+            for name in ('users', 'films', 'popularity', 'reviews', 'review_films', 'review_authors')
+        }
+        self.users, self.films, self.reviews = arrays['users'], arrays['films'], arrays['reviews']
+        self.review_films, self.review_authors = arrays['review_films'], arrays['review_authors']
+        self.popularity = np.cumsum(arrays['popularity'])
+        self.deleted = 0
+
+    def user(self) -> UUID:
+        """Pick a random user.
+
+        Returns:
+            UUID: User ID
+        """
+        return UUID(bytes=self.users[self.rng.integers(len(self.users))].tobytes())
+
+    def film(self) -> UUID:
+        """Pick a film with the probability of its popularity.
+
+        Returns:
+            UUID: Film ID
+        """
+        index = min(int(np.searchsorted(self.popularity, self.rng.random())), len(self.films) - 1)
+        return UUID(bytes=self.films[index].tobytes())
+
+    def review(self, index: Optional[int] = None) -> Tuple[UUID, UUID, UUID]:
+        """Pick a random review, not yet deleted by the load test.
+
+        Args:
+            index: Review index, random by default
+
+        Returns:
+            Tuple: Review ID, film ID and author ID
+        """
+        if index is None:
+            index = int(self.rng.integers(len(self.reviews) - self.deleted))
+        return (
+            UUID(bytes=self.reviews[index].tobytes()),
+            UUID(bytes=self.films[self.review_films[index]].tobytes()),
+            UUID(bytes=self.users[self.review_authors[index]].tobytes()),
+        )
+
+    def pop_review(self) -> Tuple[UUID, UUID, UUID]:
+        """Take the last not deleted review out of the sampled ones.
+
+        Returns:
+            Tuple: Review ID, film ID and author ID
+        """
+        self.deleted += 1
+        return self.review(len(self.reviews) - self.deleted)
+
+    @property
+    def has_reviews(self) -> bool:
+        """Check whether there are reviews left to delete.
+
+        Returns:
+            bool: Whether any review is left
+        """
+        return self.deleted < len(self.reviews)
+
+    def token(self, user_id: UUID) -> str:
+        """Get a signed JWT token for the user, the same as the auth service expects.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            str: JWT token
+        """
+        if user_id not in self.tokens:
+            self.tokens[user_id] = jwt.encode({'user_id': str(user_id)}, key=self.secret_key, algorithm='HS256')
+        return self.tokens[user_id]
+
+
+@dataclass
+class Scenario:
+    """Load scenario for one API route."""
+
+    name: str
+    method: str
+    build: Callable[[Dataset], Tuple[str, UUID, Optional[Dict]]]
+    expected: Tuple[int, ...] = (200,)
+    consumes_reviews: bool = False
+    first_chunk: bool = False
+
+
+def random_vote(data: Dataset) -> Dict:
+    """Generate a random film or review vote payload.
+
+    Args:
+        data: Loaded dataset
+
+    Returns:
+        Dict: Request body
+    """
+    return {'score': int(data.rng.choice([0, 10]))}
+
+
+def review_url(review: Tuple[UUID, UUID, UUID], suffix: str = '') -> str:
+    """Build the URL of a review.
+
+    Args:
+        review: Review ID, film ID and author ID
+        suffix: Path after the review ID
+
+    Returns:
+        str: Review URL
+    """
+    review_id, film_id, _ = review
+    return '/films/{0}/reviews/{1}{2}'.format(film_id, review_id, suffix)
+
+
+def search_url(data: Dataset) -> str:
+    """Build the URL of a text search of reviews, of a film for every other search.
+
+    Args:
+        data: Loaded dataset
+
+    Returns:
+        str: Search URL
+    """
+    url = '/reviews/search?text={0}'.format(data.rng.choice(['synthetic', 'review']))
+    if data.rng.random() < 0.5:
+        return '{0}&film_id={1}'.format(url, data.film())
+    return url
+
+
+def votes_url(path: str, key: str, ids: List[UUID]) -> str:
+    """Build the URL of the own votes of a user, looked up by IDs when any are given.
+
+    Args:
+        path: Route path
+        key: Name of the ID parameter
+        ids: Looked up IDs
+
+    Returns:
+        str: Votes URL
+    """
+    if not ids:
+        return path
+    return '{0}?{1}'.format(path, '&'.join('{0}={1}'.format(key, doc_id) for doc_id in ids))
+
+
+def delete_review(data: Dataset) -> Tuple[str, UUID, Optional[Dict]]:
+    """Take a review out of the dataset to delete it on behalf of its author.
+
+    Args:
+        data: Loaded dataset
+
+    Returns:
+        Tuple: Review URL, author ID and an empty body
+    """
+    review = data.pop_review()
+    return review_url(review), review[2], None
+
+
+SCENARIOS = [
+    Scenario(
+        name='GET /bookmarks',
+        method='GET',
+        build=lambda data: ('/bookmarks', data.user(), None),
+    ),
+    Scenario(
+        name='POST /films/{film_id}/bookmarks',
+        method='POST',
+        build=lambda data: ('/films/{0}/bookmarks'.format(data.film()), data.user(), None),
+    ),
+    Scenario(
+        name='DELETE /films/{film_id}/bookmarks',
+        method='DELETE',
+        build=lambda data: ('/films/{0}/bookmarks'.format(data.film()), data.user(), None),
+    ),
+    Scenario(
+        name='GET /films/{film_id}/ratings',
+        method='GET',
+        build=lambda data: ('/films/{0}/ratings'.format(data.film()), data.user(), None),
+    ),
+    Scenario(
+        name='POST /films/{film_id}/ratings',
+        method='POST',
+        build=lambda data: ('/films/{0}/ratings'.format(data.film()), data.user(), random_vote(data)),
+    ),
+    Scenario(
+        name='DELETE /films/{film_id}/ratings',
+        method='DELETE',
+        build=lambda data: ('/films/{0}/ratings'.format(data.film()), data.user(), None),
+    ),
+    Scenario(
+        name='GET /films/{film_id}/reviews',
+        method='GET',
+        build=lambda data: (
+            '/films/{0}/reviews?sort={1}'.format(data.film(), data.rng.choice(['top', 'new', 'old'])),
+            data.user(),
+            None,
+        ),
+    ),
+    Scenario(
+        name='POST /films/{film_id}/reviews',
+        method='POST',
+        build=lambda data: (
+            '/films/{0}/reviews'.format(data.film()), data.user(), {'text': 'Load test review {0}'.format(uuid4())},
+        ),
+        expected=(200, 403),
+    ),
+    Scenario(
+        name='GET /films/{film_id}/reviews/{review_id}/ratings',
+        method='GET',
+        build=lambda data: (review_url(data.review(), '/ratings'), data.user(), None),
+    ),
+    Scenario(
+        name='POST /films/{film_id}/reviews/{review_id}/ratings',
+        method='POST',
+        build=lambda data: (review_url(data.review(), '/ratings'), data.user(), random_vote(data)),
+    ),
+    Scenario(
+        name='DELETE /films/{film_id}/reviews/{review_id}/ratings',
+        method='DELETE',
+        build=lambda data: (review_url(data.review(), '/ratings'), data.user(), None),
+    ),
+    Scenario(
+        name='GET /films/{film_id}/reviews/export',
+        method='GET',
+        build=lambda data: ('/films/{0}/reviews/export'.format(data.film()), data.user(), None),
+    ),
+    Scenario(
+        name='GET /films/{film_id}/ratings/live',
+        method='GET',
+        build=lambda data: ('/films/{0}/ratings/live'.format(data.film()), data.user(), None),
+        first_chunk=True,
+    ),
+    Scenario(
+        name='GET /reviews/search',
+        method='GET',
+        build=lambda data: (search_url(data), data.user(), None),
+    ),
+    Scenario(
+        name='GET /films/trending',
+        method='GET',
+        build=lambda data: ('/films/trending', data.user(), None),
+    ),
+    Scenario(
+        name='GET /films/leaderboard',
+        method='GET',
+        build=lambda data: ('/films/leaderboard?page_number={0}'.format(data.rng.integers(1, 5)), data.user(), None),
+    ),
+    Scenario(
+        name='GET /ratings/films',
+        method='GET',
+        build=lambda data: (
+            votes_url('/ratings/films', 'film_id', [data.film() for _ in range(data.rng.integers(0, 3))]),
+            data.user(),
+            None,
+        ),
+    ),
+    Scenario(
+        name='GET /ratings/reviews',
+        method='GET',
+        build=lambda data: (
+            votes_url('/ratings/reviews', 'review_id', [data.review()[0] for _ in range(data.rng.integers(0, 3))]),
+            data.user(),
+            None,
+        ),
+    ),
+    Scenario(
+        name='DELETE /films/{film_id}/reviews/{review_id}',
+        method='DELETE',
+        build=delete_review,
+        expected=(204,),
+        consumes_reviews=True,
+    ),
+]
+
+
+def percentile(latencies: List[float], rank: float) -> float:
+    """Calculate a percentile of sorted latencies with the nearest-rank method.
+
+    Args:
+        latencies: Sorted latencies
+        rank: Percentile rank from 0 to 100
+
+    Returns:
+        float: Latency value
+    """
+    if not latencies:
+        return 0
+    index = max(0, min(len(latencies) - 1, round(rank / 100 * len(latencies)) - 1))
+    return latencies[index]
+
+
+def summarize(name: str, latencies: List[float], statuses: Dict[int, int], errors: int, elapsed: float) -> Dict:
+    """Build a machine-readable report for a route.
+
+    Args:
+        name: Route name
+        latencies: Latencies of successful requests in seconds
+        statuses: Count of responses by status code
+        errors: Number of unexpected responses and transport errors
+        elapsed: Wall-clock time of the run in seconds
+
+    Returns:
+        Dict: Route report
+    """
+    latencies = sorted(latencies)
+    total = sum(statuses.values()) + errors
+    return {
+        'route': name,
+        'requests': total,
+        'errors': errors,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0,
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3) if latencies else 0,
+        },
+    }
+
+
+async def send(client: httpx.AsyncClient, scenario: Scenario, url: str, body: Optional[Dict], headers: Dict) -> int:
+    """Send a scenario request and read the response, or only its first chunk for endless streams.
+
+    Args:
+        client: HTTP client
+        scenario: Route scenario
+        url: Request URL
+        body: Request body
+        headers: Request headers
+
+    Returns:
+        int: Response status code
+    """
+    if not scenario.first_chunk:
+        response = await client.request(scenario.method, url, json=body, headers=headers)
+        return response.status_code
+    async with client.stream(scenario.method, url, json=body, headers=headers) as stream:
+        async for _ in stream.aiter_raw():
+            break
+        return stream.status_code
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, data: Dataset, args: argparse.Namespace) -> Dict:
+    """Send the scenario requests with the configured number of concurrent clients.
+
+    Args:
+        client: HTTP client
+        scenario: Route scenario
+        data: Loaded dataset
+        args: Command line arguments
+
+    Returns:
+        Dict: Route report
+    """
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+    remaining = args.requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0 and (data.has_reviews or not scenario.consumes_reviews):
+            remaining -= 1
+            url, user_id, body = scenario.build(data)
+            headers = {'Authorization': 'Bearer {0}'.format(data.token(user_id))}
+            started = time.perf_counter()
+            try:
+                status = await send(client, scenario, url, body, headers)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latency = time.perf_counter() - started
+            if status in scenario.expected:
+                latencies.append(latency)
+                statuses[status] = statuses.get(status, 0) + 1
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return summarize(scenario.name, latencies, statuses, errors, time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace, data: Dataset) -> List[Dict]:
+    """Run all selected scenarios one after another.
+
+    Args:
+        args: Command line arguments
+        data: Loaded dataset
+
+    Returns:
+        List: Reports for every route
+    """
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        reports = []
+        for scenario in SCENARIOS:
+            if args.routes and not any(route in scenario.name for route in args.routes):
+                continue
+            reports.append(await run_scenario(client, scenario, data, args))
+            print(json.dumps(reports[-1]), file=sys.stderr)
+        return reports
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000/api/v1')
+    parser.add_argument('--manifest', default='manifest', help='ID manifest directory written by loader.py')
+    parser.add_argument('--secret-key', default='secret_key')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per route')
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--routes', nargs='*', help='Run only routes containing these substrings')
+    parser.add_argument('--random-seed', type=int, default=0)
+    parser.add_argument('--output', help='File for the JSON report (stdout by default)')
+    return parser.parse_args()
+
+
+def main():
+    """Run the load test and write the report."""
+    args = parse_args()
+    data = Dataset(args.manifest, args.secret_key, args.random_seed)
+    reports = asyncio.run(run(args, data))
+    with open(os.path.join(args.manifest, 'manifest.json')) as manifest:
+        dataset = json.load(manifest)['counts']
+    params = {key: getattr(args, key) for key in ('base_url', 'concurrency', 'requests')}
+    report = json.dumps({'params': params, 'dataset': dataset, 'routes': reports}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
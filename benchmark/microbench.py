@@ -0,0 +1,211 @@
+"""Micro-benchmarks of the CPU-bound parts of the UGC API request path.
+
+Measures rating scoring, building the reviews aggregation pipeline and
+serializing route responses exactly as FastAPI does it, or with the fast path
+encoders, without network or database, and reports the timings as JSON.
+
+Usage:
+    python microbench.py --repeat 5 --number 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'src'))
+
+from fastapi.responses import ORJSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+
+from api.urls import routes  # noqa: E402
+from models.base import SortChoices  # noqa: E402
+from models.encoders import ResponseEncoder  # noqa: E402
+from models.responses import RatingResponse  # noqa: E402
+from models.review_queries import ListReview  # noqa: E402
+
+
+def gen_votes(size: int) -> List[Dict]:
+    """Generate raw votes as they are stored in MongoDB.
+
+    Args:
+        size: Number of votes
+
+    Returns:
+        List: Votes
+    """
+    return [{'user_id': uuid4(), 'score': random.choice([0, 10])} for _ in range(size)]
+
+
+def gen_reviews(size: int) -> List[Dict]:
+    """Generate reviews as they are returned by the reviews aggregation.
+
+    Args:
+        size: Number of reviews
+
+    Returns:
+        List: Reviews
+    """
+    film_id = uuid4()
+    reviews = [
+        {
+            '_id': uuid4(),
+            'author': uuid4(),
+            'film_id': film_id,
+            'text': 'Benchmark review text ' * 10,
+            'pub_date': datetime.utcnow(),
+            'rating': {'votes': gen_votes(10)},
+            'likes': random.randrange(100),
+            'dislikes': random.randrange(100),
+            'average_rating': random.choice([0, 5, 10]),
+        }
+        for _ in range(size)
+    ]
+    for review in reviews:
+        if (author_vote := random.choice([0, 10, None])) is not None:
+            review['film_score'] = author_vote
+    return reviews
+
+
+def find_route(path: str, method: str) -> APIRoute:
+    """Find a route of the API by its path and method.
+
+    Args:
+        path: Route path
+        method: HTTP method
+
+    Returns:
+        APIRoute: Route
+    """
+    return next(route for route in routes if route.path == path and method in route.methods)
+
+
+def serializer(route: APIRoute, content: object) -> Callable[[], bytes]:
+    """Build a callable rendering the content through the route response model.
+
+    Args:
+        route: API route
+        content: Endpoint return value
+
+    Returns:
+        Callable: Function returning the response body
+    """
+    loop = asyncio.new_event_loop()
+
+    def render() -> bytes:
+        serialized = loop.run_until_complete(serialize_response(
+            field=route.response_field,
+            response_content=content,
+            by_alias=route.response_model_by_alias,
+            exclude_none=route.response_model_exclude_none,
+        ))
+        return ORJSONResponse(serialized).body
+
+    return render
+
+
+def fast_serializer(route: APIRoute, content: object) -> Callable[[], bytes]:
+    """Build a callable rendering the content with the fast path encoder of the route.
+
+    Args:
+        route: API route
+        content: Endpoint return value
+
+    Returns:
+        Callable: Function returning the response body
+    """
+    encoder = ResponseEncoder(
+        response_model=route.response_model,
+        by_alias=route.response_model_by_alias,
+        exclude_none=route.response_model_exclude_none,
+    )
+    return lambda: ORJSONResponse(encoder.encode(content)).body
+
+
+def measure(func: Callable, repeat: int, number: int) -> Dict:
+    """Time a function and report per-call statistics.
+
+    Args:
+        func: Function to be measured
+        repeat: Number of measurement rounds
+        number: Number of calls per round
+
+    Returns:
+        Dict: Timings in microseconds per call
+    """
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - started) / number * 1e6)
+    return {
+        'calls': repeat * number,
+        'min_us': round(min(rounds), 3),
+        'median_us': round(statistics.median(rounds), 3),
+        'max_us': round(max(rounds), 3),
+    }
+
+
+def benchmarks(votes: int, page_size: int) -> Dict[str, Callable]:
+    """Prepare the benchmarked functions.
+
+    Args:
+        votes: Number of votes in a rating
+        page_size: Number of reviews on a page
+
+    Returns:
+        Dict: Benchmarks by name
+    """
+    rating = {'votes': gen_votes(votes)}
+    reviews = gen_reviews(page_size)
+    film_id = uuid4()
+    ratings_route = find_route('/films/{film_id}/ratings', 'GET')
+    reviews_route = find_route('/films/{film_id}/reviews', 'GET')
+    return {
+        'RatingResponse.scoring[votes={0}]'.format(votes): lambda: RatingResponse(**rating),
+        'ListReview.params[sort=top]': lambda: ListReview(
+            film_id=film_id, sort=SortChoices.top, offset=0, limit=page_size,
+        ).params,
+        'serialize GET /films/{{film_id}}/ratings[votes={0}]'.format(votes): serializer(ratings_route, rating),
+        'fastpath GET /films/{{film_id}}/ratings[votes={0}]'.format(votes): fast_serializer(ratings_route, rating),
+        'serialize GET /films/{{film_id}}/reviews[page_size={0}]'.format(page_size): serializer(reviews_route, reviews),
+        'fastpath GET /films/{{film_id}}/reviews[page_size={0}]'.format(page_size): fast_serializer(
+            reviews_route, reviews,
+        ),
+    }
+
+
+def main():
+    """Run the micro-benchmarks and print the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=1000)
+    parser.add_argument('--votes', type=int, default=1000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--filter', help='Run only benchmarks containing this substring')
+    parser.add_argument('--output', help='File for the JSON report (stdout by default)')
+    args = parser.parse_args()
+    random.seed(0)
+    results = {
+        name: measure(func, args.repeat, args.number)
+        for name, func in benchmarks(args.votes, args.page_size).items()
+        if not args.filter or args.filter in name
+    }
+    report = json.dumps({'params': vars(args), 'benchmarks': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()